@@ -1,34 +1,118 @@
 # flows/full_pipeline_flow.py
-from prefect import flow, task
-from src.data_ingestion.entsoe_load import fetch_with_retries
-from src.data_ingestion.ingest_date import main as ingest_date_main
-from src.data_processing.entsoe_dataprocessing import conn as entsoe_processing
-from src.data_master.build_master_observed import build_master as build_observed
-from src.data_master.build_master_predictions import build_master as build_predictions
+# Ingest -> transform -> master -> training set -> models as one dependency-aware DAG.
+# Independent sources (ENTSO-E, NED, Open-Meteo) run concurrently and every
+# downstream stage is skipped when its input tables did not change.
+import sys
+import importlib
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SRC_ROOT = PROJECT_ROOT / "src"
+if str(SRC_ROOT) not in sys.path:
+    sys.path.insert(0, str(SRC_ROOT))
+
+from utils.pipeline_dag import PipelineDAG, Stage
+
+try:
+    from prefect import flow, task
+except ImportError:  # prefect is optional; the DAG runner does the scheduling
+    def flow(func=None, **kwargs):
+        return func if func is not None else (lambda f: f)
+    task = flow
+
+DB_PATH = SRC_ROOT / "data" / "WARP.db"
+
+
+def _call(module_name, func_name, *args, **kwargs):
+    """Import lazily so a stage's module-level setup only happens when it actually runs"""
+    def run():
+        module = importlib.import_module(module_name)
+        return getattr(module, func_name)(*args, **kwargs)
+    return run
+
+
+def _build_training_set():
+    from config.experiment_config import ExperimentConfig
+    from utils.build_training_set import build_training_set
+
+    config = ExperimentConfig()
+    # build_training_set logs and returns None on errors; the DAG needs an exception
+    if build_training_set(config.train_start, config.train_end, config.forecast_start) is None:
+        raise RuntimeError("build_training_set failed, see the log above")
+
+
+def _run_models():
+    from config.experiment_config import ExperimentConfig
+    from core.data_manager import DataManager
+    from core.experiment import TimeSeriesExperiment
+    from core.logging_manager import ExperimentLogger
+
+    config_path = SRC_ROOT / "config" / "experiment_config.yaml"
+    config = ExperimentConfig.from_file(str(config_path)) if config_path.exists() else ExperimentConfig()
+    experiment = TimeSeriesExperiment(config, DataManager(config), ExperimentLogger(config.logs_database_path))
+    experiment.run_full_experiment(experiment_name="full_pipeline_flow")
+
+
+def build_stages(include_models=True):
+    stages = [
+        # --- ingest (external sources, always run) ---
+        Stage("ingest_date", _call("data_ingestion.ingest_date", "main"),
+              outputs=["dim_datetime"], always_run=True),
+        Stage("ingest_entsoe", _call("data_ingestion.ingest_entsoe", "ingest_entsoe"),
+              outputs=["raw_entsoe_obs"], always_run=True),
+        Stage("ingest_ned", _call("data_ingestion.ingest_ned", "main"),
+              outputs=["raw_ned_obs_2"], always_run=True),
+        Stage("ingest_meteo_obs", _call("data_ingestion.ingest_meteo_obs", "ingest_meteo_obs"),
+              outputs=["raw_meteo_obs"], always_run=True),
+        Stage("ingest_meteo_stations", _call("data_ingestion.ingest_meteo_stations", "ingest_meteo_stations"),
+              outputs=["raw_meteo_stations"], always_run=True),
+        Stage("ingest_meteo_preds", _call("data_ingestion.ingest_meteo_historical_pred", "ingest"),
+              outputs=["raw_weather_preds"], always_run=True),
+        Stage("ingest_meteo_forecast_now", _call("data_ingestion.ingest_meteo_forecast_now", "ingest_forecast_now"),
+              outputs=["raw_meteo_forecast_now"], always_run=True),
+
+        # --- transform ---
+        Stage("transform_entsoe", _call("data_processing.entsoe_dataprocessing", "transform_entsoe"),
+              inputs=["raw_entsoe_obs"], outputs=["transform_entsoe_obs"]),
+        Stage("transform_ned", _call("data_processing.transform_ned", "transform_ned_pipeline"),
+              inputs=["raw_ned_obs_2"], outputs=["transform_ned_obs"]),
+        Stage("transform_meteo_obs", _call("data_processing.transform_meteo_obs", "transform"),
+              inputs=["raw_meteo_obs"], outputs=["transform_weather_obs"]),
+        Stage("transform_weather_stations", _call("data_processing.transform_weather_stations", "transform"),
+              inputs=["raw_meteo_stations"], outputs=["transform_weather_national"]),
+        Stage("transform_meteo_preds", _call("data_processing.transform_meteo_preds_history", "transform"),
+              inputs=["raw_weather_preds"], outputs=["process_weather_preds"]),
+        Stage("transform_meteo_forecast_now", _call("data_processing.transform_meteo_forecast_now", "transform"),
+              inputs=["raw_meteo_forecast_now", "raw_meteo_obs"], outputs=["transform_meteo_forecast_now"]),
+
+        # --- master ---
+        Stage("master_observed", _call("data_master.build_master_observed", "build_master"),
+              inputs=["dim_datetime", "transform_weather_obs", "transform_entsoe_obs"],
+              outputs=["master_warp"]),
+        Stage("master_predictions", _call("data_master.build_master_predictions", "build_master"),
+              inputs=["dim_datetime", "process_weather_preds", "transform_meteo_forecast_now"],
+              outputs=["master_predictions"]),
+
+        # --- training set ---
+        Stage("training_set", _build_training_set,
+              inputs=["master_warp", "master_predictions"], outputs=["training_set"]),
+    ]
+    if include_models:
+        stages.append(Stage("models", _run_models, inputs=["training_set"]))
+    return stages
+
 
 @task
-def ingest_and_process():
-    # Run date ingestion
-    ingest_date_main()
-    
-    # ENTSOE data is processed automatically when imported
-    # Weather data needs to be run manually from notebooks for now
-    print("⚠️ Run weather notebooks manually:")
-    print("1. API_open_meteo_historical.ipynb")
-    print("2. API_open_meteo_preds.ipynb") 
-    print("3. transform_weather_obs.ipynb")
-    print("4. transform_weather_preds.ipynb")
-
-@task  
-def build_masters():
-    master_observed = build_observed()
-    master_predictions = build_predictions()
-    return master_observed, master_predictions
+def run_dag(targets=None, force=False, max_workers=4, include_models=True):
+    dag = PipelineDAG(build_stages(include_models), DB_PATH, max_workers=max_workers)
+    return dag.run(targets=targets, force=force)
+
 
 @flow
-def full_pipeline_flow():
-    ingest_and_process()
-    return build_masters()
+def full_pipeline_flow(targets=None, force=False, max_workers=4, include_models=True):
+    results = run_dag(targets, force, max_workers, include_models)
+    return PipelineDAG.timing_report(results)
+
 
 if __name__ == "__main__":
-    full_pipeline_flow()
\ No newline at end of file
+    full_pipeline_flow()
@@ -0,0 +1 @@
+"""Benchmarks for the WARP data pipeline and models"""
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# Benchmark: pandas master builds (build_master_observed / build_master_predictions,
+# full rebuild) versus the DuckDB engine on a multi-year synthetic WARP.db.
+
+import sys
+import time
+import sqlite3
+import logging
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+SRC_ROOT = Path(__file__).resolve().parents[1]
+if str(SRC_ROOT) not in sys.path:
+    sys.path.append(str(SRC_ROOT))
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - bench_duckdb_masters - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger("bench_duckdb_masters")
+
+from data_master import build_master_observed, build_master_predictions
+from data_master.duckdb_masters import DuckMasterEngine
+from benchmarks.synthetic_warp import generate_warp_db
+
+def synthetic_db(db_path, years=3, seed=42):
+    """Source tables of the master builds (synthetic_warp), with daily forecast runs of 168 hours"""
+    stats = generate_warp_db(db_path, years=years, seed=seed, build_masters=False)
+    return stats["hours"], stats["forecast_rows"]
+
+def _timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+def run_benchmark(years=3, repeats=3):
+    results = {"years": years}
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "bench.db"
+        hours, forecast_rows = synthetic_db(db_path, years)
+        results.update({"hours": hours, "forecast_rows": forecast_rows})
+        logger.info(f"📦 {hours} uren, {forecast_rows} voorspelrijen ({years} jaar)")
+
+        for name in ("build_master_observed", "build_master_predictions", "duckdb_masters"):
+            logging.getLogger(name).setLevel(logging.WARNING)
+
+        pandas_times, duck_times, duck_write_times = [], [], []
+        for _ in range(repeats):
+            pandas_times.append(
+                _timed(build_master_observed.build_master, full_rebuild=True, db_path=db_path)[0]
+                + _timed(build_master_predictions.build_master, full_rebuild=True, db_path=db_path)[0]
+            )
+
+            def duck_build():
+                with DuckMasterEngine(db_path) as engine:
+                    return engine.master_warp(), engine.master_predictions()
+
+            seconds, (warp, predictions) = _timed(duck_build)
+            duck_times.append(seconds)
+
+            # Zelfde eindpunt als het pandas-pad: terugschrijven naar SQLite
+            def write_back():
+                with sqlite3.connect(db_path) as conn:
+                    warp.to_pandas().to_sql("bench_master_warp", conn, if_exists="replace", index=False)
+                    predictions.to_pandas().to_sql("bench_master_predictions", conn, if_exists="replace", index=False)
+
+            duck_write_times.append(seconds + _timed(write_back)[0])
+
+        with DuckMasterEngine(db_path) as engine:
+            run_date = pd.Timestamp("2022-01-01", tz="UTC") + pd.DateOffset(years=years) - pd.Timedelta(days=10)
+            results["duckdb_training_set_s"] = _timed(
+                engine.training_set, run_date - pd.DateOffset(years=1), run_date - pd.Timedelta(hours=1), run_date
+            )[0]
+
+    results.update({
+        "pandas_masters_s": min(pandas_times),
+        "duckdb_masters_s": min(duck_times),
+        "duckdb_masters_write_s": min(duck_write_times),
+        "master_warp_rows": warp.num_rows,
+        "master_predictions_rows": predictions.num_rows,
+    })
+    results["speedup"] = results["pandas_masters_s"] / results["duckdb_masters_s"]
+    results["speedup_with_write"] = results["pandas_masters_s"] / results["duckdb_masters_write_s"]
+
+    logger.info(f"⏱️ pandas masters (incl. schrijven): {results['pandas_masters_s']:.3f}s")
+    logger.info(f"⏱️ DuckDB masters (Arrow):           {results['duckdb_masters_s']:.3f}s ({results['speedup']:.1f}x)")
+    logger.info(f"⏱️ DuckDB masters + schrijven:       {results['duckdb_masters_write_s']:.3f}s ({results['speedup_with_write']:.1f}x)")
+    logger.info(f"⏱️ DuckDB training set (1 jaar):     {results['duckdb_training_set_s']:.3f}s")
+    return results
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# Benchmark: legacy resample of the whole raw_entsoe_obs table versus the
+# integer-hour-bucket transform, full and incremental, on multi-year synthetic data.
+
+import sys
+import time
+import sqlite3
+import logging
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+SRC_ROOT = Path(__file__).resolve().parents[1]
+if str(SRC_ROOT) not in sys.path:
+    sys.path.append(str(SRC_ROOT))
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - bench_entsoe_resample - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger("bench_entsoe_resample")
+
+from data_processing.entsoe_dataprocessing import (
+    RAW_TABLE, TRANSFORM_TABLE, derive_flows, resample_entsoe, transform_entsoe
+)
+
+COLUMNS = ["Load", "Price", "Forecast_Load", "Flow_GB_to_NL", "Flow_NL_to_GB", "Flow_NO_to_NL", "Flow_NL_to_NO"]
+
+def synthetic_raw(start, end, seed=42):
+    rng = np.random.default_rng(seed)
+    timestamps = pd.date_range(start, end, freq="15min", tz="UTC", inclusive="left")
+    df = pd.DataFrame(rng.normal(1000, 200, size=(len(timestamps), len(COLUMNS))), columns=COLUMNS)
+    df.insert(0, "Timestamp", timestamps.astype(str))
+    return df
+
+def legacy_resample(df):
+    df = df.copy()
+    df['Timestamp'] = pd.to_datetime(df['Timestamp'], errors='coerce')
+    df.set_index('Timestamp', inplace=True)
+    df_hourly = df.resample('h').mean()
+    df_hourly.index = df_hourly.index + pd.Timedelta(hours=1)
+    df_hourly['Price'] = df_hourly['Price'] / 1000
+    df_hourly.reset_index(inplace=True)
+    return derive_flows(df_hourly)
+
+def legacy_transform(conn):
+    """The original import-time script, minus the CSV export"""
+    df_hourly = legacy_resample(pd.read_sql_query(f"SELECT * FROM {RAW_TABLE}", conn))
+    df_hourly.to_sql(TRANSFORM_TABLE, conn, if_exists='replace', index=False)
+
+def _timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    func(*args, **kwargs)
+    return time.perf_counter() - start
+
+def run_benchmark(years=3, repeats=3):
+    start = pd.Timestamp("2022-01-01", tz="UTC")
+    end = start + pd.DateOffset(years=years)
+    raw = synthetic_raw(start, end)
+    new_day = synthetic_raw(end, end + pd.Timedelta(days=1), seed=7)
+    logger.info(f"📦 {len(raw)} ruwe kwartierrijen ({years} jaar)")
+
+    results = {"years": years, "raw_rows": len(raw)}
+
+    # Aggregation only, on an in-memory frame (no SQLite I/O)
+    results["legacy_compute_s"] = min(_timed(legacy_resample, raw) for _ in range(repeats))
+    results["bucketed_compute_s"] = min(_timed(resample_entsoe, raw) for _ in range(repeats))
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "bench.db"
+        with sqlite3.connect(db_path) as conn:
+            raw.to_sql(RAW_TABLE, conn, index=False)
+
+        logging.getLogger("entsoe_dataprocessing").setLevel(logging.WARNING)
+        legacy, full, incremental = [], [], []
+        for _ in range(repeats):
+            conn = sqlite3.connect(db_path)
+            legacy.append(_timed(legacy_transform, conn))
+            conn.close()
+            full.append(_timed(transform_entsoe, db_path=db_path, full_rebuild=True))
+
+            # One extra day of raw data, as in a daily pipeline run
+            with sqlite3.connect(db_path) as conn:
+                new_day.to_sql(RAW_TABLE, conn, index=False, if_exists="append")
+            incremental.append(_timed(transform_entsoe, db_path=db_path))
+            with sqlite3.connect(db_path) as conn:
+                conn.execute(f"DELETE FROM {RAW_TABLE} WHERE Timestamp >= ?", (str(end),))
+
+    results.update({
+        "legacy_full_s": min(legacy),
+        "bucketed_full_s": min(full),
+        "bucketed_incremental_s": min(incremental),
+    })
+    results["speedup_full"] = results["legacy_full_s"] / results["bucketed_full_s"]
+    results["speedup_incremental"] = results["legacy_full_s"] / results["bucketed_incremental_s"]
+
+    logger.info(f"⏱️ aggregation only: legacy {results['legacy_compute_s']:.3f}s, "
+                f"bucketed {results['bucketed_compute_s']:.3f}s")
+    logger.info(f"⏱️ legacy resample:        {results['legacy_full_s']:.3f}s")
+    logger.info(f"⏱️ bucketed, full rebuild: {results['bucketed_full_s']:.3f}s ({results['speedup_full']:.1f}x)")
+    logger.info(f"⏱️ bucketed, incremental:  {results['bucketed_incremental_s']:.3f}s ({results['speedup_incremental']:.1f}x)")
+    return results
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# Benchmark: startup (import) time of the experiment framework, measured with
+# `python -X importtime` in a fresh interpreter per repeat. Every scenario has a
+# time budget and a list of heavy packages it must not load; the script exits
+# with 1 when a scenario breaks either, so it can guard the lazy imports.
+#
+#   python src/benchmarks/bench_import_time.py --repeats 5 --top 10
+
+import sys
+import logging
+import argparse
+import statistics
+import subprocess
+from collections import defaultdict
+from pathlib import Path
+
+SRC_ROOT = Path(__file__).resolve().parents[1]
+if str(SRC_ROOT) not in sys.path:
+    sys.path.append(str(SRC_ROOT))
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - bench_import_time - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger("bench_import_time")
+
+HEAVY = ["statsmodels", "sklearn", "scipy", "pmdarima", "matplotlib", "IPython"]
+
+# name: (statement, budget in seconds, packages that must stay unloaded)
+SCENARIOS = {
+    "core": ("import core", 1.0, HEAVY),
+    "naive_experiment": (
+        "import core\n"
+        "from config.experiment_config import NaiveConfig\n"
+        "from models.factory import ModelFactory\n"
+        "ModelFactory({'naive': NaiveConfig(name='naive')}).create_model('naive')",
+        1.0, HEAVY),
+    "visualization": ("import core\nimport visualization", 1.5, ["matplotlib", "IPython"]),
+    "sarimax_experiment": (
+        "import core\n"
+        "from config.experiment_config import SarimaxConfig\n"
+        "from models.factory import ModelFactory\n"
+        "ModelFactory({'sarimax_no_exog': SarimaxConfig(name='sarimax_no_exog')}).create_model('sarimax_no_exog')",
+        3.0, ["matplotlib", "IPython", "pmdarima"]),
+}
+
+def parse_importtime(stderr):
+    """{module: (self_us, cumulative_us)} from the -X importtime report"""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+def measure_import(statement, cwd=SRC_ROOT):
+    """Total import time (s) and the per-module report of one fresh interpreter"""
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", statement], cwd=cwd,
+                               capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr.strip().splitlines()[-1])
+    modules = parse_importtime(completed.stderr)
+    return sum(self_us for self_us, _ in modules.values()) / 1e6, modules
+
+def top_packages(modules, top=10):
+    """Import time (s) per top-level package, largest first"""
+    per_package = defaultdict(int)
+    for name, (self_us, _) in modules.items():
+        per_package[name.split(".")[0]] += self_us
+    ranked = sorted(per_package.items(), key=lambda item: item[1], reverse=True)[:top]
+    return [(package, us / 1e6) for package, us in ranked]
+
+def run_scenario(name, repeats=3):
+    """min/median startup time plus the budget checks of one scenario"""
+    statement, budget, forbidden = SCENARIOS[name]
+    times, modules = [], {}
+    for _ in range(repeats):
+        seconds, modules = measure_import(statement)
+        times.append(seconds)
+
+    loaded = sorted({m.split(".")[0] for m in modules} & set(forbidden))
+    return {
+        "min_s": min(times),
+        "median_s": statistics.median(times),
+        "repeats": repeats,
+        "budget_s": budget,
+        "over_budget": min(times) > budget,
+        "forbidden_loaded": loaded,
+        "top_packages": top_packages(modules),
+    }
+
+def run_benchmark(scenarios=None, repeats=3, top=10):
+    results = {}
+    for name in scenarios or SCENARIOS:
+        result = run_scenario(name, repeats)
+        results[name] = result
+        status = "✅" if not result["over_budget"] and not result["forbidden_loaded"] else "❌"
+        logger.info(f"{status} {name}: {result['min_s']:.3f}s (median {result['median_s']:.3f}s, "
+                    f"budget {result['budget_s']:.1f}s)")
+        for package, seconds in result["top_packages"][:top]:
+            logger.info(f"   {package:<24} {seconds:.3f}s")
+        if result["forbidden_loaded"]:
+            logger.warning(f"⚠️ {name} laadt {', '.join(result['forbidden_loaded'])}")
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Startup time of the WARP experiment framework")
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--top", type=int, default=10, help="packages to list per scenario")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.scenarios, args.repeats, args.top)
+    if any(r["over_budget"] or r["forbidden_loaded"] for r in results.values()):
+        sys.exit(1)
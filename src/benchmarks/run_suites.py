@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+# Reproducible timing suites on a synthetic WARP.db (see synthetic_warp.py).
+# Results are written as JSON per run (commit + settings + timings) so regressions
+# between commits can be compared with --compare.
+#
+#   python src/benchmarks/run_suites.py --years 3 --features 10 --suites masters training_set
+#   python src/benchmarks/run_suites.py --compare latest
+#
+# Runs are only compared with runs on the same data (COMPARABLE_SETTINGS); --compare latest
+# picks the newest result with matching settings.
+
+import sys
+import json
+import time
+import sqlite3
+import logging
+import shutil
+import argparse
+import platform
+import tempfile
+import statistics
+import subprocess
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+SRC_ROOT = Path(__file__).resolve().parents[1]
+if str(SRC_ROOT) not in sys.path:
+    sys.path.append(str(SRC_ROOT))
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - run_suites - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger("run_suites")
+
+from benchmarks.synthetic_warp import generate_warp_db
+
+RESULTS_DIR = SRC_ROOT / "benchmarks" / "results"
+SUITES = ["transforms", "masters", "training_set", "rolling_splits", "metrics", "models", "startup"]
+QUIET_LOGGERS = [
+    "build_master_observed", "build_master_predictions", "build_training_set", "DataManager",
+    "MetricsCalculator", "NaiveModel", "SarimaxModel", "ModelFactory", "VintageStore",
+    "utils.incremental", "utils.time_keys", "utils.vintage_store", "utils.calendar_features",
+    "entsoe_dataprocessing", "transform_meteo_obs", "transform_meteo_forecast_now", "transform_meteo_preds_history",
+]
+# Timings depend on these; results with different values are not compared
+COMPARABLE_SETTINGS = ("years", "n_features", "train_days", "db")
+
+def _timed(func, repeats=3, setup=None):
+    """min/median wall time over `repeats` calls; setup() runs untimed before each call"""
+    times = []
+    for _ in range(repeats):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return {"min_s": min(times), "median_s": statistics.median(times), "repeats": repeats}
+
+def _experiment_config(db_path, data_start, train_days, n_windows=3):
+    from config.experiment_config import ExperimentConfig
+
+    train_start = data_start + pd.Timedelta(days=14)
+    train_end = train_start + pd.Timedelta(days=train_days) - pd.Timedelta(hours=1)
+    return ExperimentConfig(
+        database_path=db_path,
+        train_start=train_start,
+        train_end=train_end,
+        forecast_start=train_end + pd.Timedelta(hours=1),
+        rolling_windows=n_windows,
+    )
+
+@contextmanager
+def _module_db_path(module, db_path):
+    """Point a script that reads its module-level DB_PATH at the benchmark database"""
+    original_path = module.DB_PATH
+    module.DB_PATH = Path(db_path)
+    try:
+        yield
+    finally:
+        module.DB_PATH = original_path
+
+def suite_transforms(db_path, ctx, repeats):
+    from data_processing import (entsoe_dataprocessing, transform_meteo_obs, transform_meteo_forecast_now,
+                                 transform_meteo_preds_history)
+
+    results = {
+        "transform_entsoe_full": _timed(lambda: entsoe_dataprocessing.transform_entsoe(db_path, full_rebuild=True), repeats),
+        # Only the overlap hours are re-aggregated
+        "transform_entsoe_incremental": _timed(lambda: entsoe_dataprocessing.transform_entsoe(db_path), repeats),
+    }
+    with _module_db_path(transform_meteo_obs, db_path):
+        results["transform_meteo_obs"] = _timed(transform_meteo_obs.transform, repeats)
+    with _module_db_path(transform_meteo_forecast_now, db_path):
+        results["transform_meteo_forecast_now"] = _timed(transform_meteo_forecast_now.transform, repeats)
+    with _module_db_path(transform_meteo_preds_history, db_path):
+        results["transform_meteo_preds_history_full"] = _timed(
+            lambda: transform_meteo_preds_history.transform(full_rebuild=True), repeats)
+    return results
+
+def suite_masters(db_path, ctx, repeats):
+    from data_master import build_master_observed, build_master_predictions
+
+    return {
+        "master_warp_full": _timed(lambda: build_master_observed.build_master(full_rebuild=True, db_path=db_path), repeats),
+        "master_predictions_full": _timed(lambda: build_master_predictions.build_master(full_rebuild=True, db_path=db_path), repeats),
+        # Nothing changed since the last build: watermark check only
+        "masters_noop_incremental": _timed(lambda: (build_master_observed.build_master(db_path=db_path),
+                                                    build_master_predictions.build_master(db_path=db_path)), repeats),
+    }
+
+def suite_training_set(db_path, ctx, repeats):
+    from utils import build_training_set as bts
+    from core.data_manager import DataManager
+
+    config = ctx["config"]
+    # The script localizes its arguments itself, so it takes naive timestamps
+    bounds = [ts.tz_localize(None) for ts in (config.train_start, config.train_end, config.forecast_start)]
+    with _module_db_path(bts, db_path):
+        script = _timed(lambda: bts.build_training_set(*bounds), repeats)
+
+    return {
+        "build_training_set_script": script,
+        "data_manager_build_training_set": _timed(lambda: DataManager(config).build_training_set(), repeats),
+    }
+
+def suite_rolling_splits(db_path, ctx, repeats):
+    from core.data_manager import DataManager
+
+    # Actuals everywhere, so every rolling window finds its data
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("DROP TABLE IF EXISTS training_set")
+        conn.execute("CREATE TABLE training_set AS SELECT * FROM master_warp")
+
+    config = ctx["config"]
+    manager = {}
+    return {
+        f"create_rolling_splits_{config.rolling_windows}": _timed(
+            lambda: manager["dm"].create_rolling_splits(config.rolling_windows),
+            repeats,
+            setup=lambda: manager.update(dm=DataManager(config))  # cold cache each time
+        ),
+        f"create_rolling_splits_{config.rolling_windows}_cached": _timed(
+            lambda: manager["dm"].create_rolling_splits(config.rolling_windows), repeats
+        ),
+    }
+
+def suite_metrics(db_path, ctx, repeats, n_windows=100):
+    from evaluation.metrics import MetricsCalculator
+
+    rng = np.random.default_rng(0)
+    calculator = MetricsCalculator()
+    index = pd.date_range(ctx["data_start"], periods=168, freq="h")
+    pairs = [(pd.Series(rng.normal(80, 20, 168), index), pd.Series(rng.normal(80, 20, 168), index))
+             for _ in range(n_windows)]
+
+    def all_metrics():
+        for y_true, y_pred in pairs:
+            calculator.calculate_all_metrics(y_true, y_pred)
+            calculator.calculate_detailed_rmse(y_true, y_pred)
+            calculator.calculate_statistical_metrics(y_true, y_pred)
+
+    return {f"metrics_{n_windows}_windows": _timed(all_metrics, repeats)}
+
+def suite_models(db_path, ctx, repeats):
+    from core.data_manager import DataManager
+    from models.factory import ModelFactory
+
+    config = ctx["config"]
+    data_split = DataManager(config).create_splits(use_training_set=False)
+    factory = ModelFactory(config.model_configs)
+
+    results = {}
+    for model_name in ("naive", "sarimax_no_exog", "sarimax_with_exog"):
+        outcome = {}
+        def run():
+            outcome["result"] = factory.run_single_model(model_name, data_split)
+        results[f"{model_name}_fit_predict"] = _timed(run, repeats)
+        if not outcome["result"].success:
+            results[f"{model_name}_fit_predict"]["error"] = outcome["result"].error_message
+    return results
+
+def suite_startup(db_path, ctx, repeats):
+    from benchmarks.bench_import_time import SCENARIOS, run_scenario
+
+    # Fresh interpreter per repeat; the package breakdown stays in bench_import_time
+    results = {}
+    for name in SCENARIOS:
+        timing = run_scenario(name, repeats)
+        results[f"import_{name}"] = {key: timing[key] for key in ("min_s", "median_s", "repeats", "forbidden_loaded")}
+    return results
+
+SUITE_FUNCTIONS = {
+    "transforms": suite_transforms,
+    "masters": suite_masters,
+    "training_set": suite_training_set,
+    "rolling_splits": suite_rolling_splits,
+    "metrics": suite_metrics,
+    "models": suite_models,
+    "startup": suite_startup,
+}
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=SRC_ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except Exception:
+        return "unknown"
+
+def run_suites(suites=None, years=3, n_features=0, repeats=3, train_days=28, db_path=None, results_dir=RESULTS_DIR):
+    """Generate the synthetic database (unless db_path is given), run the suites, write JSON"""
+    suites = suites or SUITES
+    for name in QUIET_LOGGERS:
+        logging.getLogger(name).setLevel(logging.WARNING)
+
+    given_db = None if db_path is None else str(Path(db_path).resolve())
+    with tempfile.TemporaryDirectory() as tmp:
+        data_start = pd.Timestamp("2022-01-01", tz="UTC")
+        if db_path is None:
+            db_path = Path(tmp) / "WARP_bench.db"
+            generation = generate_warp_db(db_path, years=years, n_features=n_features, start=data_start)
+        else:
+            # The suites rebuild tables, so never touch the given database itself
+            generation = {"db_path": str(db_path)}
+            db_path = Path(shutil.copy(db_path, Path(tmp) / "WARP_bench.db"))
+
+        ctx = {"data_start": data_start, "config": _experiment_config(db_path, data_start, train_days)}
+        timings = {}
+        for suite in suites:
+            logger.info(f"⏱️ Suite '{suite}'")
+            timings[suite] = SUITE_FUNCTIONS[suite](db_path, ctx, repeats)
+            for case, timing in timings[suite].items():
+                logger.info(f"   {case}: {timing['min_s']:.3f}s (median {timing['median_s']:.3f}s)")
+
+    result = {
+        "commit": _git_commit(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        # years/n_features only describe generated data; "db" is set when an existing database was used
+        "settings": {"years": years, "n_features": n_features, "repeats": repeats, "train_days": train_days,
+                     "db": given_db},
+        "generation": generation,
+        "suites": timings,
+    }
+
+    results_dir = Path(results_dir)
+    results_dir.mkdir(parents=True, exist_ok=True)
+    path = results_dir / f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{result['commit'][:8]}.json"
+    path.write_text(json.dumps(result, indent=2, default=str))
+    logger.info(f"💾 Resultaten opgeslagen in {path}")
+    return result, path
+
+def settings_mismatch(baseline, current):
+    """{setting: (baseline, current)} for the COMPARABLE_SETTINGS that differ between two runs"""
+    before, after = baseline.get("settings", {}), current.get("settings", {})
+    return {key: (before.get(key), after.get(key)) for key in COMPARABLE_SETTINGS
+            if before.get(key) != after.get(key)}
+
+def compare_results(baseline, current, tolerance=0.2):
+    """Cases that got more than `tolerance` slower (min_s) than the baseline run.
+
+    Raises ValueError when the runs used different data or training windows
+    (see COMPARABLE_SETTINGS): their timings say nothing about a regression.
+    """
+    mismatch = settings_mismatch(baseline, current)
+    if mismatch:
+        raise ValueError(f"Benchmark settings differ from the baseline (baseline, current): {mismatch}")
+
+    rows = []
+    for suite, cases in current["suites"].items():
+        for case, timing in cases.items():
+            before = baseline.get("suites", {}).get(suite, {}).get(case)
+            if before is None:
+                continue
+            ratio = timing["min_s"] / before["min_s"] if before["min_s"] else np.nan
+            rows.append({"suite": suite, "case": case, "baseline_s": before["min_s"],
+                         "current_s": timing["min_s"], "ratio": ratio, "regression": ratio > 1 + tolerance})
+    return pd.DataFrame(rows)
+
+def _load_baseline(spec, results_dir, exclude=None, current=None):
+    """Baseline result from a path, or for 'latest' the newest one with the settings of `current`"""
+    if spec != "latest":
+        return json.loads(Path(spec).read_text())
+    for path in sorted((p for p in Path(results_dir).glob("*.json") if p != exclude), reverse=True):
+        result = json.loads(path.read_text())
+        if current is None or not settings_mismatch(result, current):
+            return result
+    return None
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="WARP benchmark suites on a synthetic WARP.db")
+    parser.add_argument("--suites", nargs="+", choices=SUITES, default=SUITES)
+    parser.add_argument("--years", type=int, default=3)
+    parser.add_argument("--features", type=int, default=0, help="extra synthetic weather features")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--train-days", type=int, default=28)
+    parser.add_argument("--db", type=Path, default=None, help="use an existing WARP.db instead of generating one")
+    parser.add_argument("--results-dir", type=Path, default=RESULTS_DIR)
+    parser.add_argument("--compare", default=None, help="baseline JSON path or 'latest'")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    result, path = run_suites(args.suites, args.years, args.features, args.repeats, args.train_days,
+                              args.db, args.results_dir)
+
+    if args.compare:
+        baseline = _load_baseline(args.compare, args.results_dir, exclude=path, current=result)
+        if baseline is None:
+            logger.warning("⚠️ Geen eerdere resultaten met dezelfde instellingen om mee te vergelijken")
+        else:
+            try:
+                comparison = compare_results(baseline, result, args.tolerance)
+            except ValueError as e:
+                logger.error(f"❌ {e}")
+                sys.exit(2)
+            logger.info(f"📊 Vergelijking met {baseline['commit'][:8]}:\n{comparison.to_string(index=False)}")
+            if comparison["regression"].any():
+                sys.exit(1)
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+# Synthetic WARP.db for benchmarks: the tables the master builders read
+# (dim_datetime, transform_entsoe_obs, transform_weather_obs, process_weather_preds,
+# transform_meteo_forecast_now) with daily/weekly/yearly seasonality, the raw tables the
+# transform scripts read (raw_entsoe_obs, raw_meteo_obs, raw_meteo_forecast_now,
+# raw_weather_preds), and optionally master_warp / master_predictions built from them
+# by the real builders.
+
+import sys
+import time
+import sqlite3
+import logging
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from scipy.signal import lfilter
+
+SRC_ROOT = Path(__file__).resolve().parents[1]
+if str(SRC_ROOT) not in sys.path:
+    sys.path.append(str(SRC_ROOT))
+
+from utils.time_keys import add_hour_key
+
+logger = logging.getLogger("synthetic_warp")
+
+WEATHER = ["temperature_2m", "shortwave_radiation", "direct_normal_irradiance", "diffuse_radiation",
+           "cloud_cover", "wind_speed_10m"]
+ENTSOE = ["Price", "Load", "Flow_NO", "Flow_GB"]
+HORIZON = 168
+
+def _ar1(rng, n, phi=0.9, scale=1.0, columns=1):
+    """Stationary AR(1) noise with unit-`scale` variance, all columns in one filter pass"""
+    shocks = rng.normal(0, scale * np.sqrt(1 - phi ** 2), size=(n, columns))
+    shocks[0] /= np.sqrt(1 - phi ** 2)
+    return lfilter([1.0], [1.0, -phi], shocks, axis=0)
+
+def synthetic_observations(hours, n_features=0, seed=42):
+    """Hourly weather + ENTSO-E frame with realistic shapes (NL-like)"""
+    rng = np.random.default_rng(seed)
+    n = len(hours)
+    hour = hours.hour.to_numpy()
+    doy = hours.dayofyear.to_numpy()
+    weekend = hours.dayofweek.to_numpy() >= 5
+    season = np.cos(2 * np.pi * (doy - 15) / 365.25)          # +1 midwinter, -1 midsummer
+
+    # Weather: temperature with yearly and daily cycle, sun from a crude solar elevation
+    temperature = 10 - 7 * season + 4 * np.sin(2 * np.pi * (hour - 9) / 24) + 2.5 * _ar1(rng, n)[:, 0]
+    cloud = np.clip(60 + 25 * _ar1(rng, n, 0.97)[:, 0], 0, 100)
+    day_length = 12 - 4 * season
+    elevation = np.clip(np.cos(np.pi * (hour + 0.5 - 12.5) / day_length), 0, None) * (hour >= 12.5 - day_length / 2)
+    clear_sky = 850 * elevation * (0.65 - 0.35 * season)
+    shortwave = clear_sky * (1 - 0.7 * cloud / 100)
+    direct = np.clip(shortwave * (1 - cloud / 100) * 1.4, 0, None)
+    diffuse = np.clip(shortwave - direct * 0.6, 0, None)
+    wind = np.clip(5 + 1.5 * season + 2.5 * _ar1(rng, n, 0.95)[:, 0], 0, None)
+
+    # Load and price: morning/evening peaks, weekend dip, winter premium, solar dip at midday
+    daily_load = np.array([0.78, 0.74, 0.72, 0.72, 0.74, 0.8, 0.9, 1.0, 1.05, 1.05, 1.04, 1.03,
+                           1.02, 1.01, 1.0, 1.0, 1.03, 1.1, 1.12, 1.08, 1.0, 0.93, 0.87, 0.82])
+    load = 12500 * daily_load[hour] * np.where(weekend, 0.88, 1.0) * (1 + 0.08 * season) + 300 * _ar1(rng, n)[:, 0]
+    price = (
+        85 + 25 * season
+        + 0.006 * (load - 12500)
+        - 0.05 * shortwave
+        - 2.0 * (wind - 5)
+        + 12 * _ar1(rng, n, 0.95)[:, 0]
+    )
+    flows = 1500 * _ar1(rng, n, 0.98, columns=2) + np.array([800, -400])
+
+    obs = pd.DataFrame({
+        "temperature_2m": temperature,
+        "shortwave_radiation": shortwave,
+        "direct_normal_irradiance": direct,
+        "diffuse_radiation": diffuse,
+        "cloud_cover": cloud,
+        "wind_speed_10m": wind,
+        "Price": price,
+        "Load": load,
+        "Flow_NO": flows[:, 0],
+        "Flow_GB": flows[:, 1],
+    }, index=hours)
+
+    # Extra anonymous features (daily cycle + persistent noise) to scale the width
+    if n_features:
+        extra = np.sin(2 * np.pi * hour / 24)[:, None] * rng.uniform(0.5, 2, n_features) + _ar1(rng, n, 0.9, columns=n_features)
+        for i in range(n_features):
+            obs[f"feature_{i}"] = extra[:, i]
+    return obs
+
+def synthetic_raw_entsoe(obs, seed=42):
+    """15-minute raw_entsoe_obs rows whose hourly means resample to the ENTSO-E columns of `obs`.
+
+    Local (Europe/Amsterdam) timestamps, Price in EUR/MWh and directional flows,
+    like the ENTSO-E client returns them; hour t is covered by [t - 1h, t).
+    """
+    rng = np.random.default_rng(seed + 2)
+    n = len(obs)
+    # Zero-mean quarter-hour pattern per hour, so the hourly means are exact
+    wiggle = rng.normal(size=(n, 4))
+    wiggle -= wiggle.mean(axis=1, keepdims=True)
+
+    def quarters(column, scale):
+        return (obs[column].to_numpy()[:, None] + scale * wiggle).ravel()
+
+    start = obs.index.repeat(4) - pd.Timedelta(hours=1)
+    raw = pd.DataFrame({"Timestamp": start + pd.to_timedelta(np.tile([0, 15, 30, 45], n), unit="min")})
+    raw["Timestamp"] = raw["Timestamp"].dt.tz_convert("Europe/Amsterdam")
+    raw["Load"] = quarters("Load", 150)
+    raw["Price"] = quarters("Price", 5) * 1000
+    raw["Forecast_Load"] = raw["Load"] * (1 + 0.02 * rng.normal(size=len(raw)))
+    for neighbor in ("NO", "GB"):
+        net = quarters(f"Flow_{neighbor}", 50)
+        raw[f"Flow_{neighbor}_to_NL"] = np.clip(net, 0, None)
+        raw[f"Flow_NL_to_{neighbor}"] = np.clip(-net, 0, None)
+    return raw
+
+
+def synthetic_raw_preds(preds, weather_columns):
+    """raw_weather_preds layout: one row per target hour with `<var>` from that day's run
+    and `<var>_previous_day<N>` from the run N days earlier"""
+    day = (preds["target_datetime"].dt.floor("D") - preds["run_date"]) // pd.Timedelta(days=1)
+    wide = preds.assign(day=day.to_numpy()).set_index(["target_datetime", "day"])[weather_columns].unstack("day")
+    wide.columns = [var if n == 0 else f"{var}_previous_day{n}" for var, n in wide.columns]
+    return wide.rename_axis("date").reset_index()
+
+
+def generate_warp_db(db_path, years=3, n_features=0, start="2022-01-01", seed=42, build_masters=True):
+    """Write a synthetic WARP.db; returns sizes and the generation time"""
+    started = time.perf_counter()
+    rng = np.random.default_rng(seed + 1)
+    start = pd.Timestamp(start)
+    start = start.tz_localize("UTC") if start.tz is None else start.tz_convert("UTC")
+    hours = pd.date_range(start, start + pd.DateOffset(years=years), freq="h", inclusive="left")
+    n = len(hours)
+
+    obs = synthetic_observations(hours, n_features, seed)
+    weather_columns = WEATHER + [c for c in obs.columns if c.startswith("feature_")]
+
+    # Daily forecast runs at 00:00 for 168 hours, error growing with lead time
+    runs = hours[::24]
+    run_idx = np.repeat(np.arange(len(runs)), HORIZON)
+    lead = np.tile(np.arange(HORIZON), len(runs))
+    target_idx = run_idx * 24 + lead
+    keep = target_idx < n
+    target_idx, lead, run_idx = target_idx[keep], lead[keep], run_idx[keep]
+    truth = obs[weather_columns].to_numpy()[target_idx]
+    spread = obs[weather_columns].std().to_numpy()[None, :] * (0.05 + 0.4 * lead[:, None] / HORIZON)
+    preds = pd.DataFrame(truth + rng.normal(size=truth.shape) * spread, columns=weather_columns)
+    clip = ["shortwave_radiation", "direct_normal_irradiance", "diffuse_radiation", "cloud_cover", "wind_speed_10m"]
+    preds[clip] = preds[clip].clip(lower=0)
+    preds.insert(0, "target_datetime", hours[target_idx])
+    preds.insert(0, "run_date", runs[run_idx])
+
+    with sqlite3.connect(db_path) as conn:
+        # Same layout as the real writers: every table carries its hour key
+        add_hour_key(pd.DataFrame({"datetime": hours}), "datetime").to_sql("dim_datetime", conn, if_exists="replace", index=False)
+
+        entsoe = add_hour_key(obs[ENTSOE].reset_index(names="Timestamp"), "Timestamp")
+        entsoe.to_sql("transform_entsoe_obs", conn, if_exists="replace", index=False)
+
+        weather = add_hour_key(obs[weather_columns].reset_index(names="date"), "date")
+        weather.to_sql("transform_weather_obs", conn, if_exists="replace", index=False)
+
+        add_hour_key(preds, "target_datetime")
+        preds.to_sql("process_weather_preds", conn, if_exists="replace", index=False, chunksize=50_000)
+
+        now = add_hour_key(obs[weather_columns].iloc[-48:].reset_index(names="date"), "date")
+        now.to_sql("transform_meteo_forecast_now", conn, if_exists="replace", index=False)
+
+        # Raw inputs of the transform scripts, in the layout their ingest scripts write
+        raw_entsoe = add_hour_key(synthetic_raw_entsoe(obs, seed), "Timestamp")
+        raw_entsoe.to_sql("raw_entsoe_obs", conn, if_exists="replace", index=False, chunksize=50_000)
+        weather.to_sql("raw_meteo_obs", conn, if_exists="replace", index=False)
+        # Persistence forecast for the 48 hours after the last observation
+        forecast_now = obs[weather_columns].iloc[-48:].reset_index(names="date")
+        forecast_now["date"] += pd.Timedelta(hours=48)
+        forecast_now.to_sql("raw_meteo_forecast_now", conn, if_exists="replace", index=False)
+        synthetic_raw_preds(preds, weather_columns).to_sql("raw_weather_preds", conn, if_exists="replace",
+                                                           index=False, chunksize=50_000)
+
+    stats = {"years": years, "n_features": n_features, "hours": n, "forecast_rows": int(len(preds)),
+             "raw_entsoe_rows": int(len(raw_entsoe))}
+    if build_masters:
+        from data_master import build_master_observed, build_master_predictions
+
+        build_master_observed.build_master(full_rebuild=True, db_path=db_path)
+        build_master_predictions.build_master(full_rebuild=True, db_path=db_path)
+
+    stats["seconds"] = time.perf_counter() - started
+    logger.info(f"📦 Synthetische WARP.db: {n} uren, {stats['forecast_rows']} voorspelrijen, "
+                f"{len(weather_columns)} weerkolommen ({stats['seconds']:.1f}s)")
+    return stats
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - synthetic_warp - %(levelname)s - %(message)s'
+    )
+    target = Path(sys.argv[1]) if len(sys.argv) > 1 else SRC_ROOT / "data" / "WARP_synthetic.db"
+    generate_warp_db(target, years=int(sys.argv[2]) if len(sys.argv) > 2 else 3)
@@ -34,6 +34,16 @@ DEFAULT_CONFIG = {
                 "latitude": 52.12949,
                 "longitude": 5.20514
             },
+            "stations": [
+                {"name": "De Bilt", "latitude": 52.10, "longitude": 5.18,
+                 "weights": {"population": 0.55, "solar": 0.35, "wind": 0.20}},
+                {"name": "Eelde", "latitude": 53.125, "longitude": 6.585,
+                 "weights": {"population": 0.12, "solar": 0.25, "wind": 0.35}},
+                {"name": "Sittard", "latitude": 51.00, "longitude": 5.87,
+                 "weights": {"population": 0.23, "solar": 0.25, "wind": 0.05}},
+                {"name": "Vlissingen", "latitude": 51.44, "longitude": 3.60,
+                 "weights": {"population": 0.10, "solar": 0.15, "wind": 0.40}}
+            ],
             "default_start": "2025-01-01"
         }
     },
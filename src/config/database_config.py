@@ -49,6 +49,13 @@ class DatabaseConfig:
                 train_size INTEGER,
                 forecast_size INTEGER,
                 execution_time_seconds REAL,
+                fit_seconds REAL,
+                predict_seconds REAL,
+                diagnostics_seconds REAL,
+                peak_memory_mb REAL,
+                optimizer_iterations INTEGER,
+                profile_json TEXT,
+                profile_path TEXT,
                 status TEXT DEFAULT 'running',
                 error_message TEXT,
                 created_at TEXT NOT NULL,
@@ -75,8 +82,86 @@ class DatabaseConfig:
                 created_at TEXT NOT NULL,
                 FOREIGN KEY (model_run_id) REFERENCES model_runs(id)
             )
+        """,
+        'model_predictions': """
+            CREATE TABLE IF NOT EXISTS model_predictions (
+                model_run_id INTEGER NOT NULL,
+                target_datetime TEXT NOT NULL,
+                lead_hour INTEGER NOT NULL,
+                predicted REAL,
+                actual REAL,
+                PRIMARY KEY (model_run_id, lead_hour),
+                FOREIGN KEY (model_run_id) REFERENCES model_runs(id)
+            ) WITHOUT ROWID
+        """,
+        # Summaries maintained by ExperimentLogger.log_model_results (window_id 0 = single run,
+        # which metric_trend_summary leaves out: its trends are over the rolling windows only)
+        'metric_window_summary': """
+            CREATE TABLE IF NOT EXISTS metric_window_summary (
+                experiment_id INTEGER NOT NULL,
+                model_name TEXT NOT NULL,
+                model_variant TEXT NOT NULL,
+                metric_name TEXT NOT NULL,
+                window_id INTEGER NOT NULL,
+                metric_value REAL,
+                model_run_id INTEGER NOT NULL,
+                created_at TEXT NOT NULL,
+                PRIMARY KEY (experiment_id, model_name, model_variant, metric_name, window_id)
+            ) WITHOUT ROWID
+        """,
+        'metric_trend_summary': """
+            CREATE TABLE IF NOT EXISTS metric_trend_summary (
+                experiment_id INTEGER NOT NULL,
+                model_name TEXT NOT NULL,
+                model_variant TEXT NOT NULL,
+                metric_name TEXT NOT NULL,
+                n_windows INTEGER NOT NULL,
+                value_sum REAL,
+                value_sq_sum REAL,
+                min_value REAL,
+                max_value REAL,
+                first_window_id INTEGER,
+                first_value REAL,
+                last_window_id INTEGER,
+                last_value REAL,
+                updated_at TEXT NOT NULL,
+                PRIMARY KEY (experiment_id, model_name, model_variant, metric_name)
+            ) WITHOUT ROWID
+        """
+    }
+    
+    # Covering indexes: the listed columns answer the queries without touching the table rows
+    LOGS_DB_INDEXES = {
+        'idx_model_runs_experiment': """
+            CREATE INDEX IF NOT EXISTS idx_model_runs_experiment
+            ON model_runs (experiment_id, model_name, model_variant, window_id, status)
+        """,
+        'idx_model_results_run': """
+            CREATE INDEX IF NOT EXISTS idx_model_results_run
+            ON model_results (model_run_id, metric_name, metric_value)
+        """,
+        'idx_metric_window_recent': """
+            CREATE INDEX IF NOT EXISTS idx_metric_window_recent
+            ON metric_window_summary (created_at, model_name, model_variant, metric_name, metric_value)
+        """,
+        'idx_metric_trend_model': """
+            CREATE INDEX IF NOT EXISTS idx_metric_trend_model
+            ON metric_trend_summary (model_name, metric_name, experiment_id, n_windows, value_sum, first_value, last_value)
         """
     }
+    
+    # Columns added after the first release; ExperimentLogger adds them to older logs.db files
+    LOGS_DB_ADDED_COLUMNS = {
+        'model_runs': {
+            'fit_seconds': 'REAL',
+            'predict_seconds': 'REAL',
+            'diagnostics_seconds': 'REAL',
+            'peak_memory_mb': 'REAL',
+            'optimizer_iterations': 'INTEGER',
+            'profile_json': 'TEXT',
+            'profile_path': 'TEXT'
+        }
+    }
 
 def get_database_schemas() -> Dict[str, Dict]:
     """Get all database schemas"""
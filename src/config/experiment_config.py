@@ -40,6 +40,53 @@ class NaiveConfig(ModelConfig):
             'lag': self.lag
         })
 
+@dataclass
+class GradientBoostingConfig(ModelConfig):
+    """Histogram gradient boosting, direct multi-horizon (lead hour is a feature)"""
+    max_iter: int = 300
+    learning_rate: float = 0.05
+    max_leaf_nodes: int = 63
+    min_samples_leaf: int = 40
+    l2_regularization: float = 0.0
+    origin_stride: int = 24
+    use_exogenous: bool = True
+    random_state: int = 42
+    
+    def __post_init__(self):
+        self.hyperparameters.update({
+            'max_iter': self.max_iter,
+            'learning_rate': self.learning_rate,
+            'max_leaf_nodes': self.max_leaf_nodes,
+            'min_samples_leaf': self.min_samples_leaf,
+            'l2_regularization': self.l2_regularization,
+            'origin_stride': self.origin_stride,
+            'use_exogenous': self.use_exogenous,
+            'random_state': self.random_state
+        })
+
+@dataclass
+class RidgeDirectConfig(ModelConfig):
+    """Ridge regression, one closed-form linear model per lead hour"""
+    alpha: float = 1.0
+    price_lags: List[int] = field(default_factory=lambda: list(range(24)) + [47, 71, 95, 119, 143, 167])
+    use_exogenous: bool = True
+    
+    def __post_init__(self):
+        self.hyperparameters.update({
+            'alpha': self.alpha,
+            'price_lags': list(self.price_lags),
+            'use_exogenous': self.use_exogenous
+        })
+
+# Model name -> config class, used when model_configs come from a YAML/JSON file
+MODEL_CONFIG_TYPES = {
+    'naive': NaiveConfig,
+    'sarimax_no_exog': SarimaxConfig,
+    'sarimax_with_exog': SarimaxConfig,
+    'gradient_boosting': GradientBoostingConfig,
+    'ridge_direct': RidgeDirectConfig,
+}
+
 @dataclass
 class ExperimentConfig:
     """Main experiment configuration"""
@@ -61,6 +108,9 @@ class ExperimentConfig:
         "yearday_sin", "is_non_working_day", "hour_cos", "is_weekend", "cloud_cover", 
         "weekday_sin", "hour_sin", "weekday_cos"
     ])
+    # Optional declarative feature spec (see data_processing.feature_matrix.FeatureSpec);
+    # when set, X_train/X_test are built from it instead of the raw feature_columns
+    feature_spec: Optional[Dict] = None
     
     # Model configurations
     model_configs: Dict[str, ModelConfig] = field(default_factory=lambda: {
@@ -72,6 +122,14 @@ class ExperimentConfig:
         'sarimax_with_exog': SarimaxConfig(
             name='sarimax_with_exog', 
             use_exogenous=True
+        ),
+        'gradient_boosting': GradientBoostingConfig(
+            name='gradient_boosting',
+            enabled=False
+        ),
+        'ridge_direct': RidgeDirectConfig(
+            name='ridge_direct',
+            enabled=False
         )
     })
     
@@ -85,6 +143,11 @@ class ExperimentConfig:
     save_detailed_logs: bool = True
     save_model_summaries: bool = True
     
+    # Profiling (phase timings are always recorded, see utils/profiling.py)
+    profile_memory: bool = False  # opt-in: tracemalloc slows fits down and inflates execution_time
+    profile_dir: Optional[Path] = None  # set to dump a cProfile/pyinstrument file per model run
+    profiler: str = "cprofile"
+    
     @property
     def forecast_end(self) -> pd.Timestamp:
         """Calculate forecast end based on start and horizon"""
@@ -104,9 +167,21 @@ class ExperimentConfig:
             if time_field in config_dict:
                 config_dict[time_field] = pd.Timestamp(config_dict[time_field], tz="UTC")
         
+        # Convert model config dicts to their config classes
+        if 'model_configs' in config_dict:
+            model_configs = {}
+            for name, model_dict in config_dict['model_configs'].items():
+                model_dict = dict(model_dict)
+                model_dict.setdefault('name', name)
+                for tuple_field in ['order', 'seasonal_order']:
+                    if tuple_field in model_dict:
+                        model_dict[tuple_field] = tuple(model_dict[tuple_field])
+                model_configs[name] = MODEL_CONFIG_TYPES.get(name, ModelConfig)(**model_dict)
+            config_dict['model_configs'] = model_configs
+        
         # Convert paths to Path objects
-        for path_field in ['database_path', 'logs_database_path']:
-            if path_field in config_dict:
+        for path_field in ['database_path', 'logs_database_path', 'profile_dir']:
+            if config_dict.get(path_field) is not None:
                 config_dict[path_field] = Path(config_dict[path_field])
         
         return cls(**config_dict)
@@ -123,7 +198,11 @@ class ExperimentConfig:
             'horizon': self.horizon,
             'target_column': self.target_column,
             'feature_columns': self.feature_columns,
+            'feature_spec': self.feature_spec,
             'model_configs': {k: v.hyperparameters for k, v in self.model_configs.items()},
             'rolling_windows': self.rolling_windows,
-            'parallel_execution': self.parallel_execution
+            'parallel_execution': self.parallel_execution,
+            'profile_memory': self.profile_memory,
+            'profile_dir': str(self.profile_dir) if self.profile_dir else None,
+            'profiler': self.profiler
         }
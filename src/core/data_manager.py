@@ -11,6 +11,10 @@ from dataclasses import dataclass
 from contextlib import contextmanager
 
 from config.experiment_config import ExperimentConfig
+from utils.calendar_features import CALENDAR_FEATURES, add_calendar_features
+from data_processing.feature_matrix import FeatureSpec, build_feature_matrix
+from utils.vintage_store import VintageStore
+from utils.time_keys import HOUR_KEY, from_hour_key
 
 @dataclass
 class DataSplit:
@@ -50,6 +54,7 @@ class DataManager:
         self.config = config
         self.logger = logging.getLogger(self.__class__.__name__)
         self._data_cache = {}
+        self.feature_report: Optional[pd.DataFrame] = None
         
     @contextmanager
     def _get_connection(self, db_path: Optional[Path] = None):
@@ -91,8 +96,12 @@ class DataManager:
             else:
                 raise e
         
-        # Ensure proper datetime and timezone handling
-        df["target_datetime"] = pd.to_datetime(df["target_datetime"], utc=True)
+        # Ensure proper datetime and timezone handling; integer hour keys avoid string parsing
+        if HOUR_KEY in df.columns and df[HOUR_KEY].notna().all():
+            df["target_datetime"] = from_hour_key(df.pop(HOUR_KEY))
+        else:
+            df = df.drop(columns=[HOUR_KEY], errors="ignore")
+            df["target_datetime"] = pd.to_datetime(df["target_datetime"], utc=True)
         df = df.sort_values("target_datetime").set_index("target_datetime")
         df = df[~df.index.duplicated(keep='first')]
         
@@ -129,12 +138,23 @@ class DataManager:
         y = df[self.config.target_column].dropna()
         
         # Create feature matrix
-        available_features = [col for col in self.config.feature_columns if col in df.columns]
-        if available_features:
-            X = df[available_features].loc[y.index]
+        if self.config.feature_spec:
+            X = self._build_spec_features(df, forecast_horizon).loc[y.index]
         else:
-            X = None
-            self.logger.warning("No feature columns available")
+            available_features = [col for col in self.config.feature_columns if col in df.columns]
+            if available_features:
+                X = df[available_features].loc[y.index]
+            else:
+                X = None
+                self.logger.warning("No feature columns available")
+        
+        # Lagged/rolling features are undefined at the very start of the data
+        if X is not None and self.config.feature_spec:
+            complete = X.loc[train_start:train_end].notna().all(axis=1)
+            if len(complete) and not complete.iloc[0] and complete.any():
+                first_complete = complete.idxmax()
+                self.logger.info(f"✂️ Training starts at {first_complete} (warm-up of lag/rolling features)")
+                train_start = first_complete
         
         # Create splits
         y_train = y.loc[train_start:train_end]
@@ -166,6 +186,25 @@ class DataManager:
         self.logger.info(f"✅ Created data split: {len(y_train)} train, {len(y_test)} test samples")
         return split
     
+    def _build_spec_features(self, df: pd.DataFrame, forecast_horizon: int) -> pd.DataFrame:
+        """Build X from config.feature_spec as a single float32 matrix"""
+        spec = FeatureSpec.from_dict(self.config.feature_spec)
+        if not spec.passthrough:
+            spec.passthrough = [col for col in self.config.feature_columns if col in df.columns]
+        
+        # Target-derived features must not see values inside the forecast horizon
+        target_lag = spec.min_lag(self.config.target_column)
+        if target_lag is not None and target_lag < forecast_horizon:
+            raise ValueError(
+                f"Feature spec uses '{self.config.target_column}' at lag {target_lag} < horizon "
+                f"{forecast_horizon}; this leaks test values into the features"
+            )
+        
+        matrix = build_feature_matrix(df, spec)
+        self.feature_report = matrix.report
+        self.logger.info(f"📐 Feature groups:\n{matrix.report.to_string(index=False)}")
+        return matrix.to_frame()
+    
     def create_rolling_splits(self, n_windows: int = 3) -> List[DataSplit]:
         """Create multiple rolling window splits"""
         splits = []
@@ -220,36 +259,16 @@ class DataManager:
                 
                 self.logger.info(f"✅ Loaded actuals: {len(df_actuals)} rows")
                 
-                # Load predictions
-                df_preds = self._load_table("master_predictions")
-                df_preds["target_datetime"] = pd.to_datetime(df_preds["target_datetime"], utc=True)
-                df_preds["run_date"] = pd.to_datetime(df_preds["run_date"], utc=True)
+                # Load the forecasts known at run_date (as-of lookup, no look-ahead)
+                store = VintageStore(conn, "master_predictions")
+                df_preds_filtered = store.as_of(run_date, forecast_start, horizon=self.config.horizon)
+                if not df_preds_filtered.empty:
+                    self.logger.info(f"📅 Using run_date(s) up to: {df_preds_filtered['run_date'].max()}")
                 
                 # Drop same problematic columns
-                existing_columns = [col for col in columns_to_drop if col in df_preds.columns]
+                existing_columns = [col for col in columns_to_drop if col in df_preds_filtered.columns]
                 if existing_columns:
-                    df_preds = df_preds.drop(columns=existing_columns)
-                
-                # Filter predictions by run_date and target_datetime
-                run_date_only = run_date.date()
-                df_preds_filtered = df_preds[
-                    (df_preds["run_date"].dt.date == run_date_only) &
-                    (df_preds["target_datetime"] >= forecast_start) &
-                    (df_preds["target_datetime"] <= forecast_end)
-                ]
-                
-                # If no exact match, find closest run_date
-                if df_preds_filtered.empty:
-                    self.logger.warning("⚠️ No exact run_date match, finding closest...")
-                    closest_before = df_preds[df_preds["run_date"] <= run_date]
-                    if not closest_before.empty:
-                        max_run_date = closest_before["run_date"].max()
-                        df_preds_filtered = df_preds[
-                            (df_preds["run_date"] == max_run_date) &
-                            (df_preds["target_datetime"] >= forecast_start) &
-                            (df_preds["target_datetime"] <= forecast_end)
-                        ]
-                        self.logger.info(f"📅 Using run_date: {max_run_date}")
+                    df_preds_filtered = df_preds_filtered.drop(columns=existing_columns)
                 
                 self.logger.info(f"✅ Loaded predictions: {len(df_preds_filtered)} rows")
                 
@@ -257,6 +276,10 @@ class DataManager:
                 if "run_date" in df_preds_filtered.columns:
                     df_preds_filtered = df_preds_filtered.drop(columns=["run_date"])
                 
+                # Calendar features for the forecast horizon come from the calendar service
+                calendar_cols = [col for col in CALENDAR_FEATURES if col in df_actuals.columns]
+                df_preds_filtered = add_calendar_features(df_preds_filtered, columns=calendar_cols, overwrite=False)
+                
                 # Combine datasets
                 df_combined = pd.concat([df_actuals, df_preds_filtered], ignore_index=True)
                 df_combined = df_combined.sort_values("target_datetime")
@@ -14,7 +14,9 @@ from core.data_manager import DataManager, DataSplit
 from models.factory import ModelFactory, ModelResult
 from evaluation.metrics import MetricsCalculator
 from evaluation.validator import RollingWindowValidator
+from evaluation.ensemble import evaluate_ensembles
 from core.logging_manager import ExperimentLogger
+from utils.profiling import ProfileSettings
 
 class TimeSeriesExperiment:
     """Main experiment orchestrator for time series forecasting"""
@@ -29,7 +31,14 @@ class TimeSeriesExperiment:
         self.logger = logging.getLogger(self.__class__.__name__)
         
         # Initialize components
-        self.model_factory = ModelFactory(config.model_configs)
+        self.model_factory = ModelFactory(
+            config.model_configs,
+            ProfileSettings(
+                track_memory=config.profile_memory,
+                profile_dir=config.profile_dir,
+                profiler=config.profiler
+            )
+        )
         self.metrics_calculator = MetricsCalculator()
         self.validator = RollingWindowValidator(
             data_manager, self.model_factory, logger, self.metrics_calculator
@@ -38,6 +47,7 @@ class TimeSeriesExperiment:
         # Experiment state
         self.experiment_id = None
         self.single_run_results = {}
+        self.single_run_split = None
         self.rolling_results = None
         
     def run_single_experiment(self, 
@@ -69,6 +79,7 @@ class TimeSeriesExperiment:
         
         # Store results
         self.single_run_results = model_results
+        self.single_run_split = data_split
         
         # Summary
         successful_models = [name for name, result in model_results.items() if result.success]
@@ -108,7 +119,7 @@ class TimeSeriesExperiment:
         
         # Analyze trends
         if not rolling_results.empty:
-            trends = self.validator.analyze_performance_trends(rolling_results)
+            trends = self.validator.analyze_performance_trends(rolling_results, experiment_id=self.experiment_id)
             
             self.logger.info(f"✅ Rolling validation complete in {total_time:.2f}s")
             self.logger.info(f"   Total windows: {trends.get('total_windows', 0)}")
@@ -121,9 +132,33 @@ class TimeSeriesExperiment:
         
         return rolling_results
     
+    def run_ensembles(self, 
+                      methods: Optional[List[str]] = None,
+                      save_results: bool = True) -> pd.DataFrame:
+        """Combine the rolling-window predictions already stored in logs.db (no model refits)"""
+        
+        self.logger.info("🧩 Fitting forecast combinations on stored predictions")
+        
+        try:
+            archive = self.logger_manager.get_prediction_archive(self.experiment_id)
+            archive = archive[archive['window_id'].notna() & ~archive['model_name'].str.startswith('ensemble_')]
+            
+            ensemble_results = evaluate_ensembles(
+                archive,
+                methods=methods,
+                experiment_logger=self.logger_manager if save_results and self.experiment_id else None,
+                experiment_id=self.experiment_id
+            )
+        except ValueError as e:
+            self.logger.warning(f"⚠️ No forecast combinations: {e}")
+            return pd.DataFrame()
+        
+        return ensemble_results
+    
     def run_full_experiment(self, 
                           experiment_name: Optional[str] = None,
-                          include_rolling: bool = True) -> Dict[str, Any]:
+                          include_rolling: bool = True,
+                          include_ensembles: bool = True) -> Dict[str, Any]:
         """Run complete experiment including single run and rolling validation"""
         
         experiment_name = experiment_name or f"Experiment_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
@@ -154,6 +189,13 @@ class TimeSeriesExperiment:
             # Run rolling validation if requested
             if include_rolling:
                 rolling_df = self.run_rolling_validation(save_results=True)
+                
+                # Combinations of the stored window predictions, no refits
+                if include_ensembles and not rolling_df.empty:
+                    ensemble_df = self.run_ensembles(save_results=True)
+                    rolling_df = pd.concat([rolling_df, ensemble_df], ignore_index=True)
+                    self.rolling_results = rolling_df
+                
                 results['rolling_results'] = rolling_df.to_dict('records') if not rolling_df.empty else []
             
             # Generate summary
@@ -200,6 +242,7 @@ class TimeSeriesExperiment:
                     forecast_end=data_split.forecast_end.isoformat(),
                     execution_time=model_result.execution_time
                 )
+                self.logger_manager.log_run_profile(run_id, model_result.profile)
                 
                 if model_result.success:
                     # Calculate metrics
@@ -220,6 +263,13 @@ class TimeSeriesExperiment:
                         detailed_metrics={'rmse_detailed': detailed_rmse}
                     )
                     
+                    self.logger_manager.log_predictions(
+                        model_run_id=run_id,
+                        forecast_start=data_split.forecast_start.isoformat(),
+                        y_true=data_split.y_test,
+                        y_pred=model_result.predictions
+                    )
+                    
                     # Log model details
                     self.logger_manager.log_model_details(
                         model_run_id=run_id,
@@ -257,6 +307,7 @@ class TimeSeriesExperiment:
                 'hyperparameters': result.hyperparameters,
                 'diagnostics': result.diagnostics,
                 'convergence_info': result.convergence_info,
+                'profile': result.profile,
                 'predictions_summary': {
                     'count': len(result.predictions) if result.predictions is not None else 0,
                     'mean': float(result.predictions.mean()) if result.predictions is not None else None,
@@ -285,8 +336,8 @@ class TimeSeriesExperiment:
         successful_single = {name: result for name, result in single_results.items() if result.success}
         
         if successful_single:
-            # Calculate metrics for comparison
-            data_split = self.data_manager.create_splits()
+            # Calculate metrics for comparison (same split the models were run on)
+            data_split = self.single_run_split or self.data_manager.create_splits()
             comparison_metrics = {}
             
             for model_name, result in successful_single.items():
@@ -397,37 +448,46 @@ class TimeSeriesExperiment:
         }
     
     def compare_with_previous_experiments(self, limit: int = 5) -> Dict:
-        """Compare current results with previous experiments"""
+        """Compare current results with previous experiments (metric_trend_summary lookups)"""
         if not self.experiment_id:
             return {'error': 'No current experiment to compare'}
         
-        # Get previous experiment results
-        previous_results = self.logger_manager.get_experiment_results(limit=limit)
-        
-        # Get current experiment trends
-        current_trends = self.logger_manager.get_performance_trends()
+        # One summary row per (experiment, model, metric): no raw runs/results are read
+        trends = self.logger_manager.get_metric_trends()
+        previous_ids = sorted(trends.loc[trends['experiment_id'] < self.experiment_id, 'experiment_id'].unique())[-limit:]
+        current = trends[trends['experiment_id'] == self.experiment_id]
+        previous = trends[trends['experiment_id'].isin(previous_ids)].groupby(
+            ['model_name', 'model_variant', 'metric_name']
+        )[['value_sum', 'n_windows']].sum()
         
         comparison = {
             'current_experiment_id': self.experiment_id,
-            'previous_experiments_count': len(previous_results),
-            'performance_comparison': current_trends,
+            'previous_experiments_count': len(previous_ids),
+            'performance_comparison': {},
             'recommendations': []
         }
         
         # Generate comparison insights
-        if current_trends:
-            for model_key, trend_data in current_trends.items():
-                for metric_name, metric_data in trend_data.get('metrics', {}).items():
-                    if metric_name.endswith('_trend'):
-                        continue
-                    
-                    trend_info = metric_data.get(f'{metric_name}_trend')
-                    if trend_info and trend_info['count'] > 1:
-                        change_pct = trend_info['change_pct']
-                        if abs(change_pct) > 20:
-                            direction = 'improved' if change_pct < 0 else 'degraded'
-                            comparison['recommendations'].append(
-                                f"{model_key} {metric_name} has {direction} by {abs(change_pct):.1f}% compared to previous runs"
-                            )
+        for row in current.itertuples(index=False):
+            key = (row.model_name, row.model_variant, row.metric_name)
+            if key not in previous.index or previous.loc[key, 'n_windows'] == 0:
+                continue
+            
+            previous_mean = previous.loc[key, 'value_sum'] / previous.loc[key, 'n_windows']
+            change_pct = ((row.mean - previous_mean) / previous_mean) * 100 if previous_mean != 0 else 0
+            model_key = f"{row.model_name}_{row.model_variant}"
+            comparison['performance_comparison'].setdefault(model_key, {})[row.metric_name] = {
+                'current_mean': row.mean,
+                'previous_mean': previous_mean,
+                'change_pct': change_pct,
+                'current_windows': int(row.n_windows),
+                'previous_windows': int(previous.loc[key, 'n_windows'])
+            }
+            
+            if abs(change_pct) > 20:
+                direction = 'improved' if change_pct < 0 else 'degraded'
+                comparison['recommendations'].append(
+                    f"{model_key} {row.metric_name} has {direction} by {abs(change_pct):.1f}% compared to previous runs"
+                )
         
         return comparison
\ No newline at end of file
@@ -4,6 +4,7 @@
 
 import sqlite3
 import json
+import math
 import logging
 from datetime import datetime
 from pathlib import Path
@@ -28,8 +29,29 @@ class ExperimentLogger:
         
         with self._get_connection() as conn:
             cursor = conn.cursor()
+            summaries_exist = cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'metric_window_summary'"
+            ).fetchone() is not None
+            
             for table_name, schema in DatabaseConfig.LOGS_DB_SCHEMA.items():
                 cursor.execute(schema)
+            
+            # Upgrade logs.db files created before these columns existed
+            for table_name, columns in DatabaseConfig.LOGS_DB_ADDED_COLUMNS.items():
+                existing = {row[1] for row in cursor.execute(f"PRAGMA table_info({table_name})").fetchall()}
+                for column, column_type in columns.items():
+                    if column not in existing:
+                        cursor.execute(f"ALTER TABLE {table_name} ADD COLUMN {column} {column_type}")
+            
+            for index_name, schema in DatabaseConfig.LOGS_DB_INDEXES.items():
+                cursor.execute(schema)
+            
+            # Older logs.db: fill the summaries once from the results logged so far
+            if not summaries_exist:
+                self._rebuild_metric_summaries(cursor)
+            elif cursor.execute("SELECT 1 FROM metric_trend_summary WHERE first_window_id = 0 LIMIT 1").fetchone():
+                # Trends folded in the single run before it was excluded
+                self._refresh_metric_trends(cursor)
             conn.commit()
     
     @contextmanager
@@ -147,10 +169,192 @@ class ExperimentLogger:
                     datetime.utcnow().isoformat()
                 ))
             
+            self._update_metric_summaries(cursor, model_run_id, metrics)
             conn.commit()
         
         self.logger.info(f"✅ Logged {len(metrics)} metrics for model run {model_run_id}")
     
+    @staticmethod
+    def _summary_value(value) -> Optional[float]:
+        """Numeric metric value for the summaries; NaN, inf and non-numeric values are not folded in"""
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            return None
+        return value if math.isfinite(value) else None
+    
+    def _update_metric_summaries(self, cursor, model_run_id: int, metrics: Dict[str, float]):
+        """Fold newly logged metrics into metric_window_summary / metric_trend_summary.
+        
+        A new window is one upsert per metric (count, sums, min/max and first/last
+        window); a window that is logged again has its trend row refolded from the
+        window rows of that (experiment, model, metric) only. The single run
+        (window_id 0) gets a window row but is not part of the rolling-window trend.
+        """
+        run = cursor.execute("""
+            SELECT experiment_id, model_name, model_variant, COALESCE(window_id, 0)
+            FROM model_runs WHERE id = ?
+        """, (model_run_id,)).fetchone()
+        if run is None:
+            return
+        
+        experiment_id, model_name, model_variant, window_id = run
+        now = datetime.utcnow().isoformat()
+        for metric_name, metric_value in metrics.items():
+            key = (experiment_id, model_name, model_variant, metric_name)
+            value = self._summary_value(metric_value)
+            
+            logged_before = cursor.execute("""
+                SELECT 1 FROM metric_window_summary
+                WHERE experiment_id = ? AND model_name = ? AND model_variant = ? AND metric_name = ? AND window_id = ?
+            """, key + (window_id,)).fetchone() is not None
+            
+            cursor.execute("""
+                INSERT OR REPLACE INTO metric_window_summary (
+                    experiment_id, model_name, model_variant, metric_name, window_id,
+                    metric_value, model_run_id, created_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, key + (window_id, value, model_run_id, now))
+            
+            if window_id == 0:
+                continue
+            if logged_before:
+                self._refresh_metric_trends(cursor, key)
+            elif value is not None:
+                cursor.execute("""
+                    INSERT INTO metric_trend_summary (
+                        experiment_id, model_name, model_variant, metric_name,
+                        n_windows, value_sum, value_sq_sum, min_value, max_value,
+                        first_window_id, first_value, last_window_id, last_value, updated_at
+                    ) VALUES (?, ?, ?, ?, 1, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (experiment_id, model_name, model_variant, metric_name) DO UPDATE SET
+                        n_windows = n_windows + 1,
+                        value_sum = value_sum + excluded.value_sum,
+                        value_sq_sum = value_sq_sum + excluded.value_sq_sum,
+                        min_value = MIN(min_value, excluded.min_value),
+                        max_value = MAX(max_value, excluded.max_value),
+                        first_value = CASE WHEN excluded.first_window_id < first_window_id
+                                           THEN excluded.first_value ELSE first_value END,
+                        first_window_id = MIN(first_window_id, excluded.first_window_id),
+                        last_value = CASE WHEN excluded.last_window_id >= last_window_id
+                                          THEN excluded.last_value ELSE last_value END,
+                        last_window_id = MAX(last_window_id, excluded.last_window_id),
+                        updated_at = excluded.updated_at
+                """, key + (value, value * value, value, value, window_id, value, window_id, value, now))
+    
+    def _refresh_metric_trends(self, cursor, key: Optional[tuple] = None):
+        """Recompute metric_trend_summary from the rolling windows in metric_window_summary (one key, or everything)"""
+        where = "WHERE experiment_id = ? AND model_name = ? AND model_variant = ? AND metric_name = ?" if key else ""
+        params = tuple(key) if key else ()
+        
+        cursor.execute(f"DELETE FROM metric_trend_summary {where}", params)
+        cursor.execute(f"""
+            WITH ranked AS (
+                SELECT *,
+                    ROW_NUMBER() OVER (PARTITION BY experiment_id, model_name, model_variant, metric_name
+                                       ORDER BY window_id) AS first_rank,
+                    ROW_NUMBER() OVER (PARTITION BY experiment_id, model_name, model_variant, metric_name
+                                       ORDER BY window_id DESC) AS last_rank
+                FROM metric_window_summary
+                {where + ' AND' if where else 'WHERE'} window_id > 0 AND typeof(metric_value) IN ('real', 'integer')
+            )
+            INSERT INTO metric_trend_summary (
+                experiment_id, model_name, model_variant, metric_name,
+                n_windows, value_sum, value_sq_sum, min_value, max_value,
+                first_window_id, first_value, last_window_id, last_value, updated_at
+            )
+            SELECT
+                experiment_id, model_name, model_variant, metric_name,
+                COUNT(*), SUM(metric_value), SUM(metric_value * metric_value), MIN(metric_value), MAX(metric_value),
+                MAX(CASE WHEN first_rank = 1 THEN window_id END), MAX(CASE WHEN first_rank = 1 THEN metric_value END),
+                MAX(CASE WHEN last_rank = 1 THEN window_id END), MAX(CASE WHEN last_rank = 1 THEN metric_value END),
+                ?
+            FROM ranked
+            GROUP BY experiment_id, model_name, model_variant, metric_name
+        """, params + (datetime.utcnow().isoformat(),))
+    
+    def _rebuild_metric_summaries(self, cursor):
+        # Later results for the same window replace earlier ones, as in log_model_results
+        cursor.execute("DELETE FROM metric_window_summary")
+        cursor.execute("""
+            INSERT OR REPLACE INTO metric_window_summary (
+                experiment_id, model_name, model_variant, metric_name, window_id,
+                metric_value, model_run_id, created_at
+            )
+            SELECT mr.experiment_id, mr.model_name, mr.model_variant, res.metric_name, COALESCE(mr.window_id, 0),
+                   CASE WHEN typeof(res.metric_value) IN ('real', 'integer') THEN res.metric_value END,
+                   mr.id, res.created_at
+            FROM model_results res
+            JOIN model_runs mr ON mr.id = res.model_run_id
+            ORDER BY res.id
+        """)
+        self._refresh_metric_trends(cursor)
+    
+    def rebuild_metric_summaries(self):
+        """Recompute both summary tables from model_runs / model_results (repair or backfill)"""
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            self._rebuild_metric_summaries(cursor)
+            conn.commit()
+            rows = cursor.execute("SELECT COUNT(*) FROM metric_trend_summary").fetchone()[0]
+        
+        self.logger.info(f"✅ Rebuilt metric summaries: {rows} (experiment, model, metric) trends")
+    
+    def get_metric_trends(self,
+                          experiment_ids: Optional[List[int]] = None,
+                          model_names: Optional[List[str]] = None,
+                          metric_names: Optional[List[str]] = None):
+        """One row per (experiment, model, variant, metric) from metric_trend_summary.
+        
+        Adds mean, std and change_pct (last window vs first window) to the stored
+        count / sums / min / max / first and last window values. Only rolling windows
+        count; the single run (window_id 0) is in get_window_metrics.
+        """
+        import pandas as pd
+        
+        conditions, params = [], []
+        for column, values in (('experiment_id', experiment_ids), ('model_name', model_names), ('metric_name', metric_names)):
+            if values:
+                conditions.append(f"{column} IN ({','.join('?' * len(values))})")
+                params.extend(values)
+        where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        
+        with self._get_connection() as conn:
+            trends = pd.read_sql_query(f"""
+                SELECT * FROM metric_trend_summary
+                {where_clause}
+                ORDER BY experiment_id, model_name, model_variant, metric_name
+            """, conn, params=params)
+        
+        n = trends['n_windows']
+        trends['mean'] = trends['value_sum'] / n
+        variance = (trends['value_sq_sum'] - n * trends['mean'] ** 2) / (n - 1)
+        trends['std'] = variance.clip(lower=0).pow(0.5).where(n > 1)
+        first = trends['first_value'].where(trends['first_value'] != 0)
+        trends['change_pct'] = (trends['last_value'] - first) / first * 100
+        return trends
+    
+    def get_window_metrics(self,
+                           experiment_id: Optional[int] = None,
+                           model_names: Optional[List[str]] = None,
+                           metric_names: Optional[List[str]] = None):
+        """Per-window metric values of one experiment from metric_window_summary (window_id 0 = single run)"""
+        import pandas as pd
+        
+        conditions, params = ["experiment_id = ?"], [experiment_id or self.current_experiment_id]
+        for column, values in (('model_name', model_names), ('metric_name', metric_names)):
+            if values:
+                conditions.append(f"{column} IN ({','.join('?' * len(values))})")
+                params.extend(values)
+        
+        with self._get_connection() as conn:
+            return pd.read_sql_query(f"""
+                SELECT model_name, model_variant, metric_name, window_id, metric_value, model_run_id, created_at
+                FROM metric_window_summary
+                WHERE {' AND '.join(conditions)}
+                ORDER BY model_name, model_variant, metric_name, window_id
+            """, conn, params=params)
+    
     def log_model_details(self,
                          model_run_id: int,
                          parameters: Optional[Dict] = None,
@@ -199,6 +403,142 @@ class ExperimentLogger:
         
         self.logger.info(f"✅ Logged {len(details)} detail types for model run {model_run_id}")
     
+    def log_run_profile(self, model_run_id: int, profile: Optional[Dict]):
+        """Store the per-phase timings / peak memory of a model run (ModelResult.profile)"""
+        if not profile:
+            return
+        
+        phases = profile.get('phases', {})
+        peak_memory = profile.get('peak_memory_mb', {})
+        
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                UPDATE model_runs
+                SET fit_seconds = ?, predict_seconds = ?, diagnostics_seconds = ?,
+                    peak_memory_mb = ?, optimizer_iterations = ?, profile_json = ?, profile_path = ?
+                WHERE id = ?
+            """, (
+                phases.get('fit'),
+                phases.get('predict'),
+                phases.get('diagnostics'),
+                max(peak_memory.values()) if peak_memory else None,
+                profile.get('iterations'),
+                json.dumps(profile),
+                profile.get('profile_path'),
+                model_run_id
+            ))
+            conn.commit()
+    
+    def get_profile_report(self, experiment_id: Optional[int] = None):
+        """Hot spots of an experiment: every (model, phase) ranked by total time"""
+        import pandas as pd
+        
+        exp_id = experiment_id or self.current_experiment_id
+        with self._get_connection() as conn:
+            runs = pd.read_sql_query("""
+                SELECT id, model_name, execution_time_seconds, peak_memory_mb, optimizer_iterations, profile_json
+                FROM model_runs
+                WHERE experiment_id = ? AND profile_json IS NOT NULL
+            """, conn, params=(exp_id,))
+        
+        if runs.empty:
+            return pd.DataFrame(columns=['model_name', 'phase', 'runs', 'total_seconds', 'mean_seconds',
+                                         'time_share', 'max_peak_memory_mb', 'mean_iterations', 'rank'])
+        
+        profiles = runs['profile_json'].map(json.loads)
+        rows = [
+            {'model_name': model_name, 'phase': phase, 'seconds': seconds,
+             'peak_memory_mb': profile.get('peak_memory_mb', {}).get(phase), 'iterations': profile.get('iterations')}
+            for model_name, profile in zip(runs['model_name'], profiles)
+            for phase, seconds in profile.get('phases', {}).items()
+        ]
+        phases = pd.DataFrame(rows)
+        
+        report = phases.groupby(['model_name', 'phase']).agg(
+            runs=('seconds', 'size'),
+            total_seconds=('seconds', 'sum'),
+            mean_seconds=('seconds', 'mean'),
+            max_peak_memory_mb=('peak_memory_mb', 'max'),
+            mean_iterations=('iterations', 'mean')
+        ).reset_index()
+        
+        # Shares over top-level phases only, nested phases ('fit.scale') are part of their parent
+        top_level = ~report['phase'].str.contains('.', regex=False)
+        report['time_share'] = report['total_seconds'] / report.loc[top_level, 'total_seconds'].sum()
+        report['rank'] = report['total_seconds'].rank(ascending=False, method='min').astype(int)
+        return report.sort_values('rank').reset_index(drop=True)
+    
+    def log_predictions(self,
+                        model_run_id: int,
+                        forecast_start: str,
+                        y_true,
+                        y_pred):
+        """Store hourly predictions and actuals of a model run (lead 0 = forecast_start)"""
+        import pandas as pd
+
+        start = pd.Timestamp(forecast_start)
+        y_pred = pd.Series(y_pred)
+        y_true = pd.Series(y_true).reindex(y_pred.index)
+        index = pd.DatetimeIndex(y_pred.index)
+        if index.tz is None and start.tz is not None:
+            index = index.tz_localize(start.tz)
+        leads = ((index - start) / pd.Timedelta(hours=1)).astype(int)
+
+        rows = [
+            (model_run_id, ts.isoformat(), int(lead),
+             None if pd.isna(pred) else float(pred), None if pd.isna(actual) else float(actual))
+            for ts, lead, pred, actual in zip(index, leads, y_pred.to_numpy(), y_true.to_numpy())
+        ]
+        with self._get_connection() as conn:
+            conn.executemany("""
+                INSERT OR REPLACE INTO model_predictions (model_run_id, target_datetime, lead_hour, predicted, actual)
+                VALUES (?, ?, ?, ?, ?)
+            """, rows)
+            conn.commit()
+
+        self.logger.info(f"✅ Logged {len(rows)} predictions for model run {model_run_id}")
+
+    def get_prediction_archive(self,
+                               experiment_id: Optional[int] = None,
+                               model_names: Optional[List[str]] = None):
+        """All logged predictions with their run metadata, one row per (run, lead hour)"""
+        import pandas as pd
+
+        conditions, params = ["mr.status = 'completed'"], []
+        if experiment_id is not None:
+            conditions.append("mr.experiment_id = ?")
+            params.append(experiment_id)
+        if model_names:
+            conditions.append(f"mr.model_name IN ({','.join('?' * len(model_names))})")
+            params.extend(model_names)
+
+        with self._get_connection() as conn:
+            archive = pd.read_sql_query(f"""
+                SELECT
+                    mr.id AS run_id,
+                    mr.experiment_id,
+                    mr.model_name,
+                    mr.model_variant,
+                    mr.window_id,
+                    mr.train_start,
+                    mr.train_end,
+                    mr.forecast_start,
+                    mr.forecast_end,
+                    p.target_datetime,
+                    p.lead_hour,
+                    p.predicted,
+                    p.actual
+                FROM model_predictions p
+                JOIN model_runs mr ON mr.id = p.model_run_id
+                WHERE {' AND '.join(conditions)}
+                ORDER BY mr.id, p.lead_hour
+            """, conn, params=params)
+
+        archive['forecast_start'] = pd.to_datetime(archive['forecast_start'], utc=True)
+        archive['target_datetime'] = pd.to_datetime(archive['target_datetime'], utc=True)
+        return archive
+
     def update_model_run_status(self, model_run_id: int, status: str, error_message: Optional[str] = None):
         """Update model run status"""
         with self._get_connection() as conn:
@@ -267,8 +607,8 @@ class ExperimentLogger:
         
         return results
     
-    def get_performance_trends(self, model_names: Optional[List[str]] = None) -> Dict[str, Any]:
-        """Analyze performance trends across experiments"""
+    def get_performance_trends(self, model_names: Optional[List[str]] = None, limit: int = 500) -> Dict[str, Any]:
+        """Analyze performance trends across experiments (latest `limit` window metrics)"""
         with self._get_connection() as conn:
             cursor = conn.cursor()
             
@@ -276,23 +616,23 @@ class ExperimentLogger:
             params = []
             if model_names:
                 placeholders = ','.join('?' * len(model_names))
-                where_clause = f"WHERE mr.model_name IN ({placeholders})"
-                params = model_names
+                where_clause = f"WHERE model_name IN ({placeholders})"
+                params = list(model_names)
             
+            # Newest rows first via idx_metric_window_recent: no join or sort over the raw results
             cursor.execute(f"""
                 SELECT 
-                    mr.model_name,
-                    mr.model_variant,
-                    mr.window_id,
-                    res.metric_name,
-                    res.metric_value,
-                    mr.created_at
-                FROM model_runs mr
-                JOIN model_results res ON mr.id = res.model_run_id
+                    model_name,
+                    model_variant,
+                    window_id,
+                    metric_name,
+                    metric_value,
+                    created_at
+                FROM metric_window_summary
                 {where_clause}
-                ORDER BY mr.created_at DESC
-                LIMIT 500
-            """, params)
+                ORDER BY created_at DESC
+                LIMIT ?
+            """, params + [limit])
             
             trends = {}
             for row in cursor.fetchall():
@@ -319,7 +659,7 @@ class ExperimentLogger:
         # Calculate trend statistics
         for model_key in trends:
             trends[model_key]['windows'] = list(trends[model_key]['windows'])
-            for metric_name in trends[model_key]['metrics']:
+            for metric_name in list(trends[model_key]['metrics']):
                 values = [m['value'] for m in trends[model_key]['metrics'][metric_name] if m['value'] is not None]
                 if len(values) > 1:
                     trends[model_key]['metrics'][metric_name + '_trend'] = {
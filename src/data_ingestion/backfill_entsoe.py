@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+# Chunked, parallel ENTSO-E backfill into raw_entsoe_obs.
+# Each series is split into month chunks that are fetched concurrently; every
+# finished chunk is checkpointed so an interrupted backfill resumes where it stopped.
+
+import sys
+import json
+import random
+import sqlite3
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pandas as pd
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - backfill_entsoe - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger("backfill_entsoe")
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+DB_PATH = PROJECT_ROOT / "src" / "data" / "WARP.db"
+CONFIG_PATH = PROJECT_ROOT / "src" / "config" / "config.json"
+OUTPUT_TABLE = "raw_entsoe_obs"
+STAGING_TABLE = "raw_entsoe_chunks"
+CHECKPOINT_TABLE = "backfill_entsoe_checkpoints"
+
+LOCAL_TZ = "Europe/Amsterdam"
+COUNTRY_CODE = "NL"
+NEIGHBORS = ["GB", "NO"]
+
+SRC_ROOT = Path(__file__).resolve().parents[1]
+if str(SRC_ROOT) not in sys.path:
+    sys.path.append(str(SRC_ROOT))
+
+from utils.incremental import table_columns
+from utils.time_keys import HOUR_KEY, ensure_hour_key, index_hour_key, sql_hour_key
+
+
+def build_series_specs(country=COUNTRY_CODE, neighbors=NEIGHBORS):
+    """Map output column -> (client method, kwargs) for every series in raw_entsoe_obs"""
+    specs = {
+        "Load": ("query_load", {"country_code": country}),
+        "Price": ("query_day_ahead_prices", {"country_code": country}),
+        "Forecast_Load": ("query_load_forecast", {"country_code": country}),
+    }
+    for neighbor in neighbors:
+        specs[f"Flow_{neighbor}_to_{country}"] = (
+            "query_crossborder_flows",
+            {"country_code_from": neighbor, "country_code_to": country},
+        )
+        specs[f"Flow_{country}_to_{neighbor}"] = (
+            "query_crossborder_flows",
+            {"country_code_from": country, "country_code_to": neighbor},
+        )
+    return specs
+
+
+def _to_local(ts):
+    ts = pd.Timestamp(ts)
+    return ts.tz_localize(LOCAL_TZ) if ts.tz is None else ts.tz_convert(LOCAL_TZ)
+
+
+def month_chunks(start, end):
+    """Split [start, end) into consecutive chunks that never cross a month boundary"""
+    start, end = _to_local(start), _to_local(end)
+    if start >= end:
+        return []
+
+    month_starts = pd.date_range(start.normalize(), end, freq="MS")
+    edges = [start] + [ms for ms in month_starts if start < ms < end] + [end]
+    return list(zip(edges[:-1], edges[1:]))
+
+
+def fetch_with_backoff(func, *args, retries=5, base_delay=2.0, max_delay=60.0, sleep=time.sleep, **kwargs):
+    """Call func with exponential backoff and full jitter between attempts.
+
+    A NoMatchingDataError from entsoe-py means the period simply has no data, so
+    it is returned as an empty series instead of being retried.
+    """
+    last_exc = None
+    for attempt in range(retries):
+        try:
+            return func(*args, **kwargs)
+        except Exception as e:
+            if type(e).__name__ == "NoMatchingDataError":
+                return pd.Series(dtype="float64")
+            last_exc = e
+            if attempt < retries - 1:
+                delay = random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+                logger.warning(f"⚠️ Poging {attempt + 1}/{retries} mislukt ({e}), opnieuw over {delay:.1f}s")
+                sleep(delay)
+    raise RuntimeError(f"Failed to fetch after {retries} retries") from last_exc
+
+
+def ensure_tables(conn):
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {STAGING_TABLE} (
+            series TEXT NOT NULL,
+            chunk_start TEXT NOT NULL,
+            Timestamp TEXT NOT NULL,
+            value REAL
+        )
+    """)
+    conn.execute(
+        f"CREATE INDEX IF NOT EXISTS idx_{STAGING_TABLE}_chunk ON {STAGING_TABLE}(series, chunk_start)"
+    )
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {CHECKPOINT_TABLE} (
+            series TEXT NOT NULL,
+            chunk_start TEXT NOT NULL,
+            chunk_end TEXT NOT NULL,
+            rows INTEGER,
+            completed_at TEXT NOT NULL,
+            PRIMARY KEY (series, chunk_start, chunk_end)
+        )
+    """)
+    conn.commit()
+
+
+def _chunk_key(ts):
+    return ts.tz_convert("UTC").isoformat()
+
+
+def completed_chunks(conn):
+    cur = conn.execute(f"SELECT series, chunk_start, chunk_end FROM {CHECKPOINT_TABLE}")
+    return {(series, start, end) for series, start, end in cur.fetchall()}
+
+
+def _to_series(result):
+    """entsoe-py returns a Series for prices/flows and a one-column DataFrame for load"""
+    if isinstance(result, pd.DataFrame):
+        result = result.iloc[:, 0] if result.shape[1] else pd.Series(dtype="float64")
+    return result if result is not None else pd.Series(dtype="float64")
+
+
+def save_chunk(conn, series, chunk_start, chunk_end, values):
+    """Write one chunk to staging and checkpoint it in a single transaction"""
+    start_key, end_key = _chunk_key(chunk_start), _chunk_key(chunk_end)
+    values = values.dropna()
+    # Chunks are [start, end): entsoe-py can return the boundary sample as well.
+    # An empty result (NoMatchingDataError) has no DatetimeIndex to compare.
+    if len(values):
+        values = values[(values.index >= chunk_start) & (values.index < chunk_end)]
+    timestamps = values.index.tz_convert("UTC").astype(str) if len(values) else []
+    rows = [(series, start_key, ts, float(v)) for ts, v in zip(timestamps, values.to_numpy())]
+
+    with conn:
+        conn.execute(
+            f"DELETE FROM {STAGING_TABLE} WHERE series = ? AND chunk_start = ?",
+            (series, start_key),
+        )
+        conn.executemany(
+            f"INSERT INTO {STAGING_TABLE} (series, chunk_start, Timestamp, value) VALUES (?, ?, ?, ?)",
+            rows,
+        )
+        conn.execute(
+            f"INSERT OR REPLACE INTO {CHECKPOINT_TABLE} VALUES (?, ?, ?, ?, ?)",
+            (series, start_key, end_key, len(rows), datetime.now(timezone.utc).isoformat()),
+        )
+    return len(rows)
+
+
+def merge_staging_into_raw(conn, start, end, columns=None):
+    """Pivot staged chunks to the wide raw_entsoe_obs layout and replace the backfilled span.
+
+    Runs entirely inside SQLite: the raw rows in the staged span (by hour key)
+    are deleted and the pivoted staging rows inserted in one transaction, so
+    the rest of raw_entsoe_obs is never read or rewritten.
+    """
+    start_key = str(_to_local(start).tz_convert("UTC"))
+    end_key = str(_to_local(end).tz_convert("UTC"))
+    series = columns or [row[0] for row in conn.execute(f"SELECT DISTINCT series FROM {STAGING_TABLE}")]
+
+    # Last staged value per (series, Timestamp); re-fetched chunks may overlap
+    latest = (
+        f"SELECT series, Timestamp, value FROM {STAGING_TABLE} WHERE rowid IN ("
+        f"SELECT MAX(rowid) FROM {STAGING_TABLE} WHERE Timestamp >= ? AND Timestamp < ? GROUP BY series, Timestamp)"
+    )
+    span = conn.execute(
+        f"SELECT MIN({sql_hour_key('Timestamp')}), MAX({sql_hour_key('Timestamp')}), COUNT(DISTINCT Timestamp) "
+        f"FROM ({latest})",
+        (start_key, end_key),
+    ).fetchone()
+    if not span[2]:
+        logger.warning("⚠️ Geen gestagede data om samen te voegen")
+        return 0
+
+    pivot = ", ".join(f"MAX(CASE WHEN series = ? THEN value END)" for _ in series)
+    quoted = ", ".join(f'"{col}"' for col in series)
+    conn.execute(f'CREATE TABLE IF NOT EXISTS {OUTPUT_TABLE} (Timestamp TEXT, {HOUR_KEY} INTEGER)')
+    ensure_hour_key(conn, OUTPUT_TABLE, "Timestamp")
+    existing = table_columns(conn, OUTPUT_TABLE)
+    with conn:
+        for col in series:
+            if col not in existing:
+                conn.execute(f'ALTER TABLE {OUTPUT_TABLE} ADD COLUMN "{col}" REAL')
+        conn.execute(f"DELETE FROM {OUTPUT_TABLE} WHERE {HOUR_KEY} BETWEEN ? AND ?", span[:2])
+        conn.execute(
+            f"INSERT INTO {OUTPUT_TABLE} (Timestamp, {quoted}, {HOUR_KEY}) "
+            f"SELECT Timestamp, {pivot}, {sql_hour_key('Timestamp')} FROM ({latest}) "
+            f"GROUP BY Timestamp ORDER BY Timestamp",
+            (*series, start_key, end_key),
+        )
+    index_hour_key(conn, OUTPUT_TABLE)
+    total = conn.execute(f"SELECT COUNT(*) FROM {OUTPUT_TABLE}").fetchone()[0]
+    logger.info(f"💾 {span[2]} rijen uit backfill samengevoegd in {OUTPUT_TABLE} ({total} totaal)")
+    return span[2]
+
+
+def run_backfill(client, start, end, conn=None, country=COUNTRY_CODE, neighbors=NEIGHBORS,
+                 max_workers=4, retries=5, base_delay=2.0, sleep=time.sleep, merge=True):
+    """Backfill all ENTSO-E series between start and end.
+
+    client only needs the entsoe-py query methods used in build_series_specs, so a
+    fake client can be passed in tests. Chunks already present in the checkpoint
+    table are skipped, which makes re-running an interrupted backfill cheap.
+    """
+    own_conn = conn is None
+    conn = conn or sqlite3.connect(DB_PATH)
+    ensure_tables(conn)
+
+    try:
+        specs = build_series_specs(country, neighbors)
+        chunks = month_chunks(start, end)
+        done = completed_chunks(conn)
+
+        todo = [
+            (series, chunk_start, chunk_end)
+            for series in specs
+            for chunk_start, chunk_end in chunks
+            if (series, _chunk_key(chunk_start), _chunk_key(chunk_end)) not in done
+        ]
+        skipped = len(specs) * len(chunks) - len(todo)
+        logger.info(f"📦 {len(todo)} chunks te doen, {skipped} al voltooid ({len(specs)} series × {len(chunks)} maanden)")
+
+        def fetch_chunk(series, chunk_start, chunk_end):
+            method, kwargs = specs[series]
+            result = fetch_with_backoff(
+                getattr(client, method), start=chunk_start, end=chunk_end,
+                retries=retries, base_delay=base_delay, sleep=sleep, **kwargs
+            )
+            return _to_series(result)
+
+        summary = {"chunks_total": len(specs) * len(chunks), "chunks_skipped": skipped,
+                   "chunks_fetched": 0, "chunks_failed": 0, "rows": 0}
+
+        # Workers only do network I/O; all SQLite writes stay on this thread
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(fetch_chunk, *task): task for task in todo}
+            for future in as_completed(futures):
+                series, chunk_start, chunk_end = futures[future]
+                try:
+                    n_rows = save_chunk(conn, series, chunk_start, chunk_end, future.result())
+                    summary["chunks_fetched"] += 1
+                    summary["rows"] += n_rows
+                    logger.info(f"✅ {series} {chunk_start:%Y-%m}: {n_rows} rijen")
+                except Exception as e:
+                    summary["chunks_failed"] += 1
+                    logger.error(f"❌ {series} {chunk_start:%Y-%m} mislukt: {e}")
+
+        if summary["chunks_failed"]:
+            logger.warning(f"⚠️ {summary['chunks_failed']} chunks mislukt; draai de backfill opnieuw om te hervatten")
+        elif merge:
+            merge_staging_into_raw(conn, start, end, columns=list(specs))
+
+        return summary
+    finally:
+        if own_conn:
+            conn.close()
+
+
+def main():
+    from entsoe import EntsoePandasClient
+
+    with open(CONFIG_PATH) as f:
+        cfg = json.load(f)["api"]["entsoe"]
+
+    client = EntsoePandasClient(api_key=cfg["api_key"])
+    start = pd.Timestamp(cfg.get("default_start", "2025-01-01T00:00:00Z"))
+    end = pd.Timestamp.now(tz="UTC").floor("h")
+
+    summary = run_backfill(client, start, end, country=cfg.get("country", COUNTRY_CODE))
+    logger.info(f"🎉 Backfill klaar: {summary}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 import pandas as pd
 from entsoe import EntsoePandasClient
 import sqlite3
+import sys
 import time
 from pathlib import Path
 
@@ -13,6 +14,12 @@ OUTPUT_TABLE = "raw_entsoe_obs"
 CSV_PATH = PROJECT_ROOT / "outputs" / f"{OUTPUT_TABLE}.csv"
 CSV_PATH.parent.mkdir(parents=True, exist_ok=True)  # maak outputmap aan als die niet bestaat
 
+SRC_ROOT = Path(__file__).resolve().parents[1]
+if str(SRC_ROOT) not in sys.path:
+    sys.path.append(str(SRC_ROOT))
+
+from utils.time_keys import add_hour_key, index_hour_key
+
 # ─────────────────────────────────────────────
 # 🔑 API en parameters
 # ─────────────────────────────────────────────
@@ -76,10 +83,12 @@ if not yearly_load.empty and not yearly_price.empty:
         df[key] = series.reindex(all_index).values
 
     df = df.sort_values("Timestamp")
+    add_hour_key(df, "Timestamp")
 
     # Opslaan naar database
     with sqlite3.connect(DB_PATH) as conn:
         df.to_sql(OUTPUT_TABLE, conn, if_exists="replace", index=False)
+        index_hour_key(conn, OUTPUT_TABLE)
         print(f"✅ Data opgeslagen in SQLite als tabel '{OUTPUT_TABLE}'")
 
 else:
@@ -1,13 +1,19 @@
 #src/data_ingestion/ingest_date.py
 
+import sys
 import pandas as pd
-import numpy as np
-import holidays
 import sqlite3
 import logging
 from pathlib import Path
 from datetime import timedelta
 
+SRC_ROOT = Path(__file__).resolve().parents[1]
+if str(SRC_ROOT) not in sys.path:
+    sys.path.append(str(SRC_ROOT))
+
+from utils.calendar_features import calendar_features
+from utils.time_keys import add_hour_key, ensure_hour_key, index_hour_key
+
 # Zet logging aan
 logging.basicConfig(
     level=logging.INFO,
@@ -22,7 +28,7 @@ TABLE_NAME = 'dim_datetime'
 def get_connection(db_path):
     if not db_path.exists():
         raise FileNotFoundError(f"❌ Database bestaat niet: {db_path}")
-    return sqlite3.connect(db_path)
+    return sqlite3.connect(db_path, timeout=60)
 
 def table_exists(conn, table_name):
     cur = conn.cursor()
@@ -43,33 +49,13 @@ def create_datetime_rows(start_date, end_date):
     start_date = pd.Timestamp(start_date).tz_localize('UTC') if start_date.tz is None else start_date.tz_convert('UTC')
     end_date = pd.Timestamp(end_date).tz_localize('UTC') if end_date.tz is None else end_date.tz_convert('UTC')
 
-    date_range = pd.date_range(start_date, end_date, freq='h', inclusive='left')
-    if len(date_range) == 0:
+    # Vectorized calendar columns (DST offsets, cached holiday set), see utils/calendar_features.py
+    df = calendar_features(start_date, end_date)
+    if df.empty:
         logger.info("No new dates to add")
         return None
 
-    df = pd.DataFrame({"datetime": date_range})
-    df["hour"] = df["datetime"].dt.hour
-    df["day_of_week"] = df["datetime"].dt.dayofweek
-    df["month"] = df["datetime"].dt.month
-    df["day_of_year"] = df["datetime"].dt.dayofyear
-    df["date"] = df["datetime"].dt.date
-
-    df["hour_sin"] = np.sin(2 * np.pi * df["hour"] / 24)
-    df["hour_cos"] = np.cos(2 * np.pi * df["hour"] / 24)
-    df["weekday_sin"] = np.sin(2 * np.pi * df["day_of_week"] / 7)
-    df["weekday_cos"] = np.cos(2 * np.pi * df["day_of_week"] / 7)
-    df["yearday_sin"] = np.sin(2 * np.pi * df["day_of_year"] / 365.25)
-    df["yearday_cos"] = np.cos(2 * np.pi * df["day_of_year"] / 365.25)
-    # Convert from UTC to a local timezone (e.g., Europe/Amsterdam) to capture DST changes
-    df["local_datetime"] = df["datetime"].dt.tz_convert("Europe/Amsterdam")
-    df["is_dst"] = df["local_datetime"].apply(lambda x: int(x.dst() != pd.Timedelta(0))).astype('bool')
-    years = set(df["datetime"].dt.year)
-    nl_holidays = holidays.country_holidays("NL", years=list(years))
-    df["is_holiday"] = df["date"].isin(nl_holidays).astype(bool)
-    df["is_weekend"] = df["day_of_week"].isin([5, 6]).astype(bool)
-    df["is_non_working_day"] = (df["is_weekend"] | df["is_holiday"]).astype(bool)
-
+    add_hour_key(df, "datetime")
     logger.info(f"Created {len(df)} rows")
     return df
 
@@ -92,6 +78,7 @@ def main():
                 logger.info(f"Creating new {TABLE_NAME} table with {len(df)} rows")
                 df.to_sql(TABLE_NAME, conn, if_exists='replace', index=False)
                 conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{TABLE_NAME}_datetime ON {TABLE_NAME}(datetime)")
+                index_hour_key(conn, TABLE_NAME)
                 conn.commit()
         else:
             if max_date.tz is None:
@@ -104,6 +91,7 @@ def main():
 
                 if df is not None and not df.empty:
                     logger.info(f"Adding {len(df)} new rows to existing {TABLE_NAME} table")
+                    ensure_hour_key(conn, TABLE_NAME, "datetime")
                     df.to_sql(TABLE_NAME, conn, if_exists='append', index=False)
             else:
                 logger.info(f"Table {TABLE_NAME} already up to date until {max_date}")
@@ -113,6 +101,7 @@ def main():
 
     except Exception as e:
         logger.error(f"❌ Error updating datetime dimension: {e}", exc_info=True)
+        raise
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,7 +1,9 @@
 #!/usr/bin/env python3
 import os
+import sys
 import json
 import time
+import random
 import datetime
 import sqlite3
 import pandas as pd
@@ -12,6 +14,12 @@ CONFIG_PATH  = os.path.join(ROOT_DIR, 'workspaces', 'sandeep', 'config', 'api-ca
 WARP_DB_PATH = os.path.join(ROOT_DIR, 'src', 'data', 'WARP.db')
 TABLE_RAW    = 'raw_entsoe_obs'
 
+if os.path.join(ROOT_DIR, 'src') not in sys.path:
+    sys.path.append(os.path.join(ROOT_DIR, 'src'))
+
+from utils.incremental import table_columns
+from utils.time_keys import HOUR_KEY, add_hour_key, ensure_hour_key, from_hour_key, hour_key
+
 
 def load_config(path):
     with open(path) as f:
@@ -22,7 +30,7 @@ def get_connection(db_path):
     folder = os.path.dirname(db_path)
     if folder and not os.path.isdir(folder):
         os.makedirs(folder, exist_ok=True)
-    return sqlite3.connect(db_path)
+    return sqlite3.connect(db_path, timeout=60)
 
 
 def table_exists(conn, name):
@@ -31,55 +39,73 @@ def table_exists(conn, name):
     return cur.fetchone() is not None
 
 
+def sql_type(df, col):
+    if col == HOUR_KEY:
+        return 'INTEGER'
+    return 'REAL' if pd.api.types.is_numeric_dtype(df[col]) else 'TEXT'
+
+
 def create_table_from_df(conn, df, name):
-    cols = df.columns.tolist()
-    defs = ','.join(f'"{c}" TEXT' for c in cols)
+    defs = ','.join(f'"{c}" {sql_type(df, c)}' for c in df.columns)
     conn.execute(f'CREATE TABLE IF NOT EXISTS {name} ({defs})')
     conn.commit()
 
 
-def remove_duplicates(conn, name):
-    cur = conn.cursor()
-    cur.execute(f'PRAGMA table_info({name})')
-    cols = [r[1] for r in cur.fetchall()]
-    group = ','.join(f'"{c}"' for c in cols)
-    conn.execute(
-        f'DELETE FROM {name} WHERE rowid NOT IN ('
-        f'SELECT MIN(rowid) FROM {name} GROUP BY {group})'
-    )
+def add_missing_columns(conn, df, name):
+    existing = set(table_columns(conn, name))
+    for col in df.columns:
+        if col not in existing:
+            conn.execute(f'ALTER TABLE {name} ADD COLUMN "{col}" {sql_type(df, col)}')
     conn.commit()
 
 
-def fetch_with_retries(func, *args, retries=3, delay=5, **kwargs):
+def fetch_with_retries(func, *args, retries=3, delay=5, max_delay=60, **kwargs):
+    # Exponential backoff with full jitter so parallel callers don't retry in lockstep
     last_exc = None
-    for _ in range(retries):
+    for attempt in range(retries):
         try:
             return func(*args, **kwargs)
         except Exception as e:
             last_exc = e
-            time.sleep(delay)
+            if attempt < retries - 1:
+                time.sleep(random.uniform(0, min(max_delay, delay * 2 ** attempt)))
     raise RuntimeError(f"Failed to fetch after {retries} retries") from last_exc
 
 
+def _series(result):
+    # query_load / query_load_forecast return one-column frames
+    return result.squeeze(axis=1) if isinstance(result, pd.DataFrame) else result
+
+
 def ingest_entsoe():
+    """Append new 15-minute rows to raw_entsoe_obs in the layout of entsoe_load.py
+    (Timestamp, Load, Price, Forecast_Load, Flow_*), which transform_entsoe reads"""
     cfg      = load_config(CONFIG_PATH)['entsoe']
     client   = EntsoePandasClient(api_key=cfg['api_key'])
     country  = cfg.get('country', 'NL')
-    start    = cfg.get('default_start')
+    start    = pd.Timestamp(cfg.get('default_start'))
     neighbors= cfg.get('neighbors', [])
 
     conn = get_connection(WARP_DB_PATH)
 
     if table_exists(conn, TABLE_RAW):
-        last = pd.read_sql_query(
-            f"SELECT MAX(Timestamp) AS dt FROM {TABLE_RAW}", conn
-        )['dt'][0]
-        start = last or start
-
-    end = datetime.datetime.utcnow().replace(minute=0, second=0, microsecond=0).isoformat()
-
-    load_s  = fetch_with_retries(client.query_load, country, start=start, end=end)
-    price_s = fetch_with_retries(client.query_day_ahead_prices, country, start=start, end=end)
+        # One-off migration of a table written before hour keys, a no-op afterwards
+        ensure_hour_key(conn, TABLE_RAW, 'Timestamp')
+        last = conn.execute(f'SELECT MAX({HOUR_KEY}) FROM {TABLE_RAW}').fetchone()[0]
+        if last is not None:
+            # Refetch the last (possibly incomplete or revised) hour
+            start = from_hour_key([last])[0]
+
+    start = (start.tz_localize('UTC') if start.tz is None else start).tz_convert('Europe/Amsterdam')
+    end = pd.Timestamp(datetime.datetime.now(datetime.timezone.utc)).floor('h').tz_convert('Europe/Amsterdam')
+    if start >= end:
+        conn.close()
+        print(f"'{TABLE_RAW}' is up to date until {start}.")
+        return
+
+    load_s     = _series(fetch_with_retries(client.query_load, country, start=start, end=end))
+    price_s    = fetch_with_retries(client.query_day_ahead_prices, country, start=start, end=end)
+    forecast_s = _series(fetch_with_retries(client.query_load_forecast, country, start=start, end=end))
 
     flows = {}
     for n in neighbors:
@@ -98,18 +124,27 @@ def ingest_entsoe():
             end=end
         )
 
-    df = pd.DataFrame({'load': load_s, 'price': price_s})
+    df = pd.DataFrame({'Load': load_s, 'Price': price_s, 'Forecast_Load': forecast_s})
     for col, series in flows.items():
         df[col] = series
+    # The API returns the end boundary as well; it belongs to the next run
+    df = df[df.index < end].sort_index()
 
-    df = df.reset_index().rename(columns={'index': 'datetime'})
-    df['datetime'] = df['datetime'].astype(str)
+    df = df.rename_axis('Timestamp').reset_index()
+    add_hour_key(df, 'Timestamp')
+    if df.empty:
+        conn.close()
+        print(f"No new ENTSO-E data from {start} to {end}.")
+        return
 
     if not table_exists(conn, TABLE_RAW):
         create_table_from_df(conn, df, TABLE_RAW)
+    add_missing_columns(conn, df, TABLE_RAW)
 
+    # The refetched span replaces what was stored for it
+    conn.execute(f'DELETE FROM {TABLE_RAW} WHERE {HOUR_KEY} >= ?', (hour_key(start),))
     df.to_sql(TABLE_RAW, conn, if_exists='append', index=False)
-    remove_duplicates(conn, TABLE_RAW)
+    conn.commit()
     conn.close()
 
     print(f"Ingested ENTSO-E from {start} to {end} into '{TABLE_RAW}'.")
@@ -30,7 +30,7 @@ VARS = [
 def get_connection(db_path):
     if not db_path.exists():
         raise FileNotFoundError(f"❌ Database niet gevonden: {db_path}")
-    return sqlite3.connect(db_path)
+    return sqlite3.connect(db_path, timeout=60)
 
 def fetch_forecast_now():
     start_date = datetime.now(timezone.utc).strftime('%Y-%m-%d')
@@ -82,6 +82,7 @@ def ingest_forecast_now():
         logger.info("✅ Actuele forecast succesvol opgeslagen.")
     except Exception as e:
         logger.error(f"❌ Fout bij ophalen of opslaan: {e}", exc_info=True)
+        raise
     finally:
         conn.close()
         logger.info("🔒 Verbinding gesloten")
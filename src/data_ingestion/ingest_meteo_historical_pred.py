@@ -142,7 +142,7 @@ def save_to_csv(df):
 
 def ingest():
     logger.info(f"📦 Ingest starten, schrijven naar {TABLE_NAME}")
-    conn = sqlite3.connect(DB_PATH)
+    conn = sqlite3.connect(DB_PATH, timeout=60)
 
     try:
         # First try to get data from API
@@ -194,6 +194,7 @@ def ingest():
         logger.info(f"📅 Datumbereik: {df_combined['date'].min()} t/m {df_combined['date'].max()}")
     except Exception as e:
         logger.error(f"❌ Fout tijdens ingest: {e}", exc_info=True)
+        raise
     finally:
         conn.close()
         logger.info("🔒 DB-verbinding gesloten")
@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 
+import sys
 import pandas as pd
 import sqlite3
 import logging
@@ -21,6 +22,12 @@ PROJECT_ROOT = Path(__file__).resolve().parents[2]
 DB_PATH = PROJECT_ROOT / "src" / "data" / "WARP.db"
 TABLE_NAME = "raw_meteo_obs"
 
+SRC_ROOT = Path(__file__).resolve().parents[1]
+if str(SRC_ROOT) not in sys.path:
+    sys.path.append(str(SRC_ROOT))
+
+from utils.time_keys import add_hour_key, index_hour_key
+
 # === Open-Meteo variabelen (KNMI Seamless) ===
 VARS = [
     "temperature_2m", "wind_speed_10m", "apparent_temperature", "cloud_cover", 
@@ -30,7 +37,7 @@ VARS = [
 def get_connection(db_path):
     if not db_path.exists():
         raise FileNotFoundError(f"❌ Database niet gevonden: {db_path}")
-    return sqlite3.connect(db_path)
+    return sqlite3.connect(db_path, timeout=60)
 
 def get_last_observed_date(conn):
     try:
@@ -95,12 +102,15 @@ def ingest_meteo_obs():
         df_combined = pd.concat([df_existing, df_new])
         df_combined = df_combined.drop_duplicates(subset="date", keep="last")
         df_combined = df_combined.sort_values("date")
+        add_hour_key(df_combined, "date")
 
         logger.info(f"💾 Opslaan in tabel: {TABLE_NAME} ({len(df_combined)} rijen totaal)")
         df_combined.to_sql(TABLE_NAME, conn, if_exists="replace", index=False)
+        index_hour_key(conn, TABLE_NAME)
         logger.info("✅ Observaties succesvol opgeslagen.")
     except Exception as e:
         logger.error(f"❌ Fout bij inladen observaties: {e}", exc_info=True)
+        raise
     finally:
         conn.close()
         logger.info("🔒 Verbinding gesloten")
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# Observed weather for all KNMI reference stations in one batched Open-Meteo call.
+# Rows are stored per station; national aggregates are built in
+# data_processing/transform_weather_stations.py.
+
+import json
+import sqlite3
+import logging
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# === Logging ===
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - ingest_meteo_stations - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger("ingest_meteo_stations")
+
+# === Config ===
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+DB_PATH = PROJECT_ROOT / "src" / "data" / "WARP.db"
+CONFIG_PATH = PROJECT_ROOT / "src" / "config" / "config.json"
+TABLE_NAME = "raw_meteo_stations"
+URL = "https://api.open-meteo.com/v1/forecast"
+
+# Same variables as ingest_meteo_obs so the national aggregate can replace De Bilt one-to-one
+VARS = [
+    "temperature_2m", "wind_speed_10m", "apparent_temperature", "cloud_cover",
+    "snowfall", "diffuse_radiation", "direct_normal_irradiance", "shortwave_radiation"
+]
+
+def load_stations(config_path=CONFIG_PATH):
+    with open(config_path) as f:
+        cfg = json.load(f)["api"]["open_meteo"]
+    stations = cfg.get("stations")
+    if not stations:
+        # Fall back to the single De Bilt coordinate used by the other ingest scripts
+        stations = [{"name": "De Bilt", **cfg["coordinates"], "weights": {}}]
+    return stations
+
+def get_connection(db_path):
+    if not db_path.exists():
+        raise FileNotFoundError(f"❌ Database niet gevonden: {db_path}")
+    return sqlite3.connect(db_path)
+
+def get_last_observed_date(conn, default="2025-01-01"):
+    try:
+        max_date = conn.execute(f"SELECT MAX(date) FROM {TABLE_NAME}").fetchone()[0]
+        if max_date:
+            return pd.to_datetime(max_date).strftime('%Y-%m-%d')
+    except sqlite3.OperationalError:
+        pass
+    return default
+
+def get_client():
+    import requests_cache
+    from retry_requests import retry
+    from openmeteo_requests import Client
+
+    session = retry(requests_cache.CachedSession(".cache", expire_after=3600), retries=5)
+    return Client(session=session)
+
+def responses_to_frame(responses, stations, variables=VARS):
+    """Stack the per-location responses of one batched call into a long (station, date) frame"""
+    frames = []
+    for station, response in zip(stations, responses):
+        hourly = response.Hourly()
+        timestamps = pd.date_range(
+            start=pd.to_datetime(hourly.Time(), unit="s", utc=True),
+            end=pd.to_datetime(hourly.TimeEnd(), unit="s", utc=True),
+            freq=pd.Timedelta(seconds=hourly.Interval()),
+            inclusive='left'
+        )
+        values = np.column_stack([hourly.Variables(i).ValuesAsNumpy() for i in range(len(variables))])
+        frame = pd.DataFrame(values, columns=variables)
+        frame.insert(0, "date", timestamps)
+        frame.insert(0, "station", station["name"])
+        frames.append(frame)
+    return pd.concat(frames, ignore_index=True)
+
+def fetch_station_obs(stations, start_date, end_date, client=None):
+    logger.info(f"🌦️ Ophalen van observaties voor {len(stations)} stations: {start_date} → {end_date}")
+
+    client = client or get_client()
+    # Open-Meteo accepts comma-separated coordinate lists and answers with one response per location
+    params = {
+        "latitude": [s["latitude"] for s in stations],
+        "longitude": [s["longitude"] for s in stations],
+        "models": "knmi_seamless",
+        "hourly": VARS,
+        "start_date": start_date,
+        "end_date": end_date
+    }
+    responses = client.weather_api(URL, params=params)
+    if len(responses) != len(stations):
+        raise ValueError(f"Verwacht {len(stations)} responses, kreeg {len(responses)}")
+
+    df = responses_to_frame(responses, stations)
+    return df[df["date"] <= datetime.now(timezone.utc)]
+
+def write_station_obs(conn, df_new):
+    """Replace the fetched span for the fetched stations, keep older history"""
+    if df_new.empty:
+        return
+    df_new = df_new.copy()
+    df_new["date"] = df_new["date"].astype(str)
+
+    table_exists = conn.execute(
+        "SELECT name FROM sqlite_master WHERE type='table' AND name=?", (TABLE_NAME,)
+    ).fetchone() is not None
+
+    with conn:
+        if table_exists:
+            placeholders = ",".join("?" * df_new["station"].nunique())
+            conn.execute(
+                f"DELETE FROM {TABLE_NAME} WHERE date >= ? AND station IN ({placeholders})",
+                (df_new["date"].min(), *df_new["station"].unique()),
+            )
+        df_new.to_sql(TABLE_NAME, conn, if_exists="append", index=False)
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{TABLE_NAME}_station_date ON {TABLE_NAME}(station, date)")
+
+def ingest_meteo_stations():
+    logger.info(f"📦 Verbinden met database: {DB_PATH}")
+    conn = get_connection(DB_PATH)
+
+    try:
+        stations = load_stations()
+        start_date = get_last_observed_date(conn)
+        end_date = datetime.now(timezone.utc).strftime('%Y-%m-%d')
+        df_new = fetch_station_obs(stations, start_date, end_date)
+
+        logger.info(f"💾 Opslaan in tabel: {TABLE_NAME} ({len(df_new)} nieuwe rijen)")
+        write_station_obs(conn, df_new)
+        logger.info("✅ Stationsobservaties succesvol opgeslagen.")
+    except Exception as e:
+        logger.error(f"❌ Fout bij inladen stationsobservaties: {e}", exc_info=True)
+        raise
+    finally:
+        conn.close()
+        logger.info("🔒 Verbinding gesloten")
+
+if __name__ == "__main__":
+    ingest_meteo_stations()
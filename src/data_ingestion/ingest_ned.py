@@ -41,7 +41,7 @@ TIMESTAMP_COLUMN = 'validfrom' # To be changed to 'validto'  to have right times
 def get_connection(db_path):
     if not db_path.exists():
         raise FileNotFoundError(f"❌ Database bestaat niet: {db_path}")
-    return sqlite3.connect(db_path)
+    return sqlite3.connect(db_path, timeout=60)
 
 def table_exists(conn, table_name):
     cur = conn.cursor()
@@ -217,6 +217,7 @@ def main():
         status = 'failed'
         error_msg = str(e)
         logger.error(f"❌ Process failed: {error_msg}", exc_info=True)
+        raise
 
     finally:
         end_time = datetime.datetime.now().isoformat()
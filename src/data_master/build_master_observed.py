@@ -1,3 +1,4 @@
+import sys
 import pandas as pd
 import sqlite3
 import logging
@@ -13,6 +14,21 @@ PROJECT_ROOT = Path(__file__).resolve().parents[2]
 DB_PATH = PROJECT_ROOT / "src" / "data" / "WARP.db"
 MASTER_TABLE = "master_warp"
 
+SRC_ROOT = Path(__file__).resolve().parents[1]
+if str(SRC_ROOT) not in sys.path:
+    sys.path.append(str(SRC_ROOT))
+
+from utils.incremental import plan_incremental, set_watermarks, upsert_since
+from utils.calendar_features import calendar_spine
+from utils.time_keys import HOUR_KEY, NS_PER_HOUR, ensure_hour_key, from_hour_key, hour_key, index_hour_key, read_keyed
+
+# Brontabel -> kolom die groeit bij nieuwe data (high-watermark)
+SOURCES = {
+    "dim_datetime": "datetime",
+    "transform_weather_obs": "date",
+    "transform_entsoe_obs": "Timestamp",
+}
+
 
 desired_order = [
     'Price', 'target_datetime', 'Load', 'shortwave_radiation', 'temperature_2m',
@@ -22,34 +38,43 @@ desired_order = [
     'weekday_cos', 'hour', 'day_of_week', 'day_of_year', 'is_holiday'
 ]
 
-def safe_load_table(conn, table_name):
+def safe_load_table(conn, table_name, time_column=None, since=None):
     try:
-        df = pd.read_sql_query(f"SELECT * FROM {table_name}", conn)
+        # Integer hour key (geïndexeerd, door de schrijvers gevuld) voor joins en bereikfilters
+        df = read_keyed(conn, table_name, time_column, since)
         logger.info(f"✅ '{table_name}' geladen met {len(df)} rijen")
         return df
     except Exception as e:
         logger.error(f"❌ Kan '{table_name}' niet laden: {e}")
-        return pd.DataFrame()
+        return pd.DataFrame(columns=[HOUR_KEY])
 
-def build_master():
+def build_master(full_rebuild=False, db_path=DB_PATH):
     logger.info(f"📦 Start build voor {MASTER_TABLE}")
-    conn = sqlite3.connect(DB_PATH)
+    conn = sqlite3.connect(db_path, timeout=60)
 
     try:
-        df_time = safe_load_table(conn, "dim_datetime")
-        df_weather = safe_load_table(conn, "transform_weather_obs")
-        df_entsoe = safe_load_table(conn, "transform_entsoe_obs")
-
-        df_time["target_datetime"] = pd.to_datetime(df_time["datetime"], utc=True)
-        df_weather["target_datetime"] = pd.to_datetime(df_weather["date"], utc=True)
-        df_entsoe["target_datetime"] = pd.to_datetime(df_entsoe["Timestamp"], utc=True)
-
-        df_time = df_time.drop(columns=["datetime", "date"], errors="ignore")
+        since, watermarks = plan_incremental(conn, MASTER_TABLE, SOURCES, full_rebuild=full_rebuild)
+        if since is pd.NaT:
+            logger.info(f"✅ {MASTER_TABLE} is up-to-date, geen bron gewijzigd")
+            return
+        if since is not None:
+            logger.info(f"🔄 Incrementele build vanaf {since}")
+
+        df_time = safe_load_table(conn, "dim_datetime", SOURCES["dim_datetime"], since)
+        df_weather = safe_load_table(conn, "transform_weather_obs", SOURCES["transform_weather_obs"], since)
+        df_entsoe = safe_load_table(conn, "transform_entsoe_obs", SOURCES["transform_entsoe_obs"], since)
+
+        # dim_datetime blijft de ruggengraat (uren buiten dim_datetime vallen weg, zoals voorheen);
+        # de kalenderkolommen voor die uren komen uit de calendar service
+        keys = pd.unique(df_time[HOUR_KEY].dropna().astype("int64"))
+        df_time = calendar_spine(from_hour_key(keys))
+        df_time[HOUR_KEY] = df_time["target_datetime"].astype("int64") // NS_PER_HOUR
+        df_time = df_time.drop(columns=["date"], errors="ignore")
         df_weather = df_weather.drop(columns=["date"], errors="ignore")
         df_entsoe = df_entsoe.drop(columns=["Timestamp"], errors="ignore")
 
-        df = df_time.merge(df_entsoe, on="target_datetime", how="left")
-        df = df.merge(df_weather, on="target_datetime", how="left")
+        df = df_time.merge(df_entsoe, on=HOUR_KEY, how="left")
+        df = df.merge(df_weather, on=HOUR_KEY, how="left")
         df = df.fillna(0)
 
         # Kolomfilter toepassen
@@ -60,16 +85,24 @@ def build_master():
 
         remaining_cols = [col for col in df.columns if col not in desired_order]
         df = df[available_cols + remaining_cols]
-        df = df.sort_values("target_datetime")
+        df = df.sort_values(HOUR_KEY)
 
         logger.info(f"📊 Eindtabel: {df.shape[0]} rijen, {df.shape[1]} kolommen")
         logger.info(f"🧾 Kolommen: {df.columns.tolist()}")
 
-        df.to_sql(MASTER_TABLE, conn, if_exists="replace", index=False)
+        if since is None:
+            df.to_sql(MASTER_TABLE, conn, if_exists="replace", index=False)
+            index_hour_key(conn, MASTER_TABLE)
+        else:
+            # Eenmalige migratie van een master van voor de hour keys, daarna een no-op
+            ensure_hour_key(conn, MASTER_TABLE, "target_datetime")
+            upsert_since(conn, MASTER_TABLE, df, HOUR_KEY, hour_key(since))
+        set_watermarks(conn, MASTER_TABLE, SOURCES, watermarks)
         logger.info(f"✅ {MASTER_TABLE} succesvol opgeslagen")
 
     except Exception as e:
         logger.error(f"❌ Fout bij bouwen van {MASTER_TABLE}: {e}", exc_info=True)
+        raise
     finally:
         conn.close()
         logger.info("🔒 Verbinding gesloten")
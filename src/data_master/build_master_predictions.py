@@ -1,3 +1,4 @@
+import sys
 import pandas as pd
 import sqlite3
 import logging
@@ -13,6 +14,29 @@ PROJECT_ROOT = Path(__file__).resolve().parents[2]
 DB_PATH = PROJECT_ROOT / "src" / "data" / "WARP.db"
 MASTER_TABLE = "master_predictions"
 
+SRC_ROOT = Path(__file__).resolve().parents[1]
+if str(SRC_ROOT) not in sys.path:
+    sys.path.append(str(SRC_ROOT))
+
+from utils.incremental import plan_incremental, set_watermarks, upsert_since
+from utils.calendar_features import calendar_spine
+from utils.vintage_store import VintageStore
+from utils.time_keys import HOUR_KEY, NS_PER_HOUR, ensure_hour_key, from_hour_key, hour_key, index_hour_key, read_keyed
+
+# Brontabel -> kolom die groeit bij nieuwe data. Een nieuwe run_date raakt alleen
+# target-uren vanaf die run; forecast_now wordt per run als venster vervangen.
+SOURCES = {
+    "dim_datetime": "datetime",
+    "process_weather_preds": "run_date",
+    "transform_meteo_forecast_now": "MIN(date)",
+}
+# Kolom waarop elke bron naar target-uur gefilterd wordt
+TARGET_COLUMNS = {
+    "dim_datetime": "datetime",
+    "process_weather_preds": "target_datetime",
+    "transform_meteo_forecast_now": "date",
+}
+
 # Kolomvolgorde zonder 'Price'
 desired_order = [
     'target_datetime', 'Load', 'shortwave_radiation', 'temperature_2m',
@@ -22,39 +46,46 @@ desired_order = [
     'weekday_cos'
 ]
 
-def safe_load(conn, table):
+def safe_load(conn, table, since=None):
     try:
-        df = pd.read_sql_query(f"SELECT * FROM {table}", conn)
+        # Integer hour key van het target-uur (geïndexeerd, door de schrijvers gevuld)
+        df = read_keyed(conn, table, TARGET_COLUMNS[table], since)
         logger.info(f"✅ '{table}' geladen ({len(df)} rijen)")
         return df
     except Exception as e:
         logger.error(f"❌ Fout bij laden '{table}': {e}")
-        return pd.DataFrame()
+        return pd.DataFrame(columns=[HOUR_KEY])
 
-def build_master():
+def build_master(full_rebuild=False, db_path=DB_PATH):
     logger.info(f"📦 Start build voor {MASTER_TABLE}")
-    conn = sqlite3.connect(DB_PATH)
+    conn = sqlite3.connect(db_path, timeout=60)
 
     try:
-        df_time = safe_load(conn, "dim_datetime")
-        df_weather = safe_load(conn, "process_weather_preds")
-        df_now = safe_load(conn, "transform_meteo_forecast_now")
-
-        df_time["target_datetime"] = pd.to_datetime(df_time["datetime"], utc=True)
-        df_weather["target_datetime"] = pd.to_datetime(df_weather["target_datetime"], utc=True)
-
-        if not df_now.empty:
-            if "target_datetime" in df_now.columns:
-                df_now["target_datetime"] = pd.to_datetime(df_now["target_datetime"], utc=True)
-            elif "date" in df_now.columns:
-                df_now = df_now.rename(columns={"date": "target_datetime"})
-                df_now["target_datetime"] = pd.to_datetime(df_now["target_datetime"], utc=True)
-
-        df = df_time.drop(columns=["datetime", "date"], errors="ignore")
-        df = df.merge(df_weather, on="target_datetime", how="left", suffixes=("", "_weather"))
+        since, watermarks = plan_incremental(conn, MASTER_TABLE, SOURCES, full_rebuild=full_rebuild)
+        if since is pd.NaT:
+            logger.info(f"✅ {MASTER_TABLE} is up-to-date, geen bron gewijzigd")
+            return
+        if since is not None:
+            logger.info(f"🔄 Incrementele build vanaf {since}")
+
+        df_time = safe_load(conn, "dim_datetime", since)
+        df_weather = safe_load(conn, "process_weather_preds", since)
+        df_now = safe_load(conn, "transform_meteo_forecast_now", since)
+
+        df_time = df_time.drop(columns=["datetime"], errors="ignore")
+        df_weather = df_weather.drop(columns=["target_datetime"], errors="ignore")
+        df_now = df_now.drop(columns=["target_datetime", "date"], errors="ignore")
+
+        # dim_datetime blijft de ruggengraat (voorspelde uren buiten dim_datetime vallen weg, zoals voorheen);
+        # de kalenderkolommen (toekomstige regressoren) voor die uren komen uit de calendar service
+        keys = pd.unique(df_time[HOUR_KEY].dropna().astype("int64"))
+        df = calendar_spine(from_hour_key(keys))
+        df[HOUR_KEY] = df["target_datetime"].astype("int64") // NS_PER_HOUR
+        df = df.drop(columns=["date"], errors="ignore")
+        df = df.merge(df_weather, on=HOUR_KEY, how="left", suffixes=("", "_weather"))
 
         if not df_now.empty:
-            df = df.merge(df_now, on="target_datetime", how="left", suffixes=("", "_now"))
+            df = df.merge(df_now, on=HOUR_KEY, how="left", suffixes=("", "_now"))
 
         # Combineer duplicate kolommen
         suffix_sources = ["_weather", "_now"]
@@ -69,7 +100,7 @@ def build_master():
                 df = df.drop(columns=suffix_cols)
 
         df = df.loc[:, ~df.columns.duplicated()]
-        df = df.sort_values("target_datetime")
+        df = df.sort_values(HOUR_KEY)
 
         if "run_date" in df.columns:
             df["run_date"] = pd.to_datetime(df["run_date"], utc=True)
@@ -82,11 +113,21 @@ def build_master():
         logger.info(f"📊 Eindtabel: {df.shape[0]} rijen, {df.shape[1]} kolommen")
         logger.info(f"🧾 Kolommen: {df.columns.tolist()}")
 
-        df.to_sql(MASTER_TABLE, conn, if_exists="replace", index=False)
+        if since is None:
+            df.to_sql(MASTER_TABLE, conn, if_exists="replace", index=False)
+            index_hour_key(conn, MASTER_TABLE)
+        else:
+            # Eenmalige migratie van een master van voor de hour keys, daarna een no-op
+            ensure_hour_key(conn, MASTER_TABLE, "target_datetime")
+            upsert_since(conn, MASTER_TABLE, df, HOUR_KEY, hour_key(since))
+        if "run_date" in df.columns:
+            VintageStore(conn, MASTER_TABLE).ensure_index()
+        set_watermarks(conn, MASTER_TABLE, SOURCES, watermarks)
         logger.info(f"✅ {MASTER_TABLE} succesvol opgeslagen")
 
     except Exception as e:
         logger.error(f"❌ Fout tijdens build: {e}", exc_info=True)
+        raise
     finally:
         conn.close()
         logger.info("🔒 Verbinding gesloten")
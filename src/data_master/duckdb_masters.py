@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+# Optioneel analytisch pad: dezelfde master-joins als build_master_observed /
+# build_master_predictions / build_training_set, maar als SQL in DuckDB op een
+# gekoppelde WARP.db (en/of Parquet-bestanden). Resultaten komen terug als Arrow-tabellen;
+# de kalenderkolommen blijven uit de calendar service komen.
+
+import sys
+import sqlite3
+import logging
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    import duckdb
+    DUCKDB_AVAILABLE = True
+except ImportError:
+    DUCKDB_AVAILABLE = False
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - duckdb_masters - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger("duckdb_masters")
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+DB_PATH = PROJECT_ROOT / "src" / "data" / "WARP.db"
+
+SRC_ROOT = Path(__file__).resolve().parents[1]
+if str(SRC_ROOT) not in sys.path:
+    sys.path.append(str(SRC_ROOT))
+
+from utils.calendar_features import CALENDAR_FEATURES, calendar_spine
+from utils.time_keys import HOUR_KEY, NS_PER_HOUR, TABLE_TIME_COLUMNS, from_hour_key, hour_key
+from data_master.build_master_observed import desired_order as OBSERVED_ORDER
+from data_master.build_master_predictions import desired_order as PREDICTIONS_ORDER
+from utils.build_training_set import desired_order as TRAINING_ORDER
+
+HORIZON = 168
+# Bronnen per master, in merge-volgorde (eerste bron wint bij dubbele kolommen)
+OBSERVED_SOURCES = ["transform_entsoe_obs", "transform_weather_obs"]
+PREDICTION_SOURCES = ["process_weather_preds", "transform_meteo_forecast_now"]
+# Tijdkolommen die na de join niet meer nodig zijn (target_datetime komt uit de spine)
+DROP_COLUMNS = {"datetime", "date", "Timestamp", "target_datetime", HOUR_KEY}
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+class DuckMasterEngine:
+    """DuckDB-sessie met WARP.db gekoppeld als schema 'warp'.
+
+    Zonder de sqlite-extensie (offline) worden de brontabellen eenmalig als Arrow
+    geregistreerd; de joins lopen dan nog steeds in DuckDB. Met parquet_dir worden
+    '<tabel>.parquet'-bestanden gebruikt in plaats van de SQLite-tabel.
+    """
+
+    def __init__(self, db_path=DB_PATH, parquet_dir=None, threads=None):
+        if not DUCKDB_AVAILABLE:
+            raise ImportError("duckdb is vereist voor de DuckDB master-engine")
+        self.db_path = Path(db_path)
+        self.parquet_dir = Path(parquet_dir) if parquet_dir else None
+        self.con = duckdb.connect()
+        if threads:
+            self.con.execute(f"SET threads = {int(threads)}")
+        self.attached = self._attach()
+        self._columns = {}
+
+    def _attach(self):
+        if not self.db_path.exists():
+            if self.parquet_dir is None:
+                raise FileNotFoundError(f"❌ Database bestaat niet: {self.db_path}")
+            return False
+        try:
+            self.con.execute("LOAD sqlite")
+        except Exception:
+            try:
+                self.con.execute("INSTALL sqlite")
+                self.con.execute("LOAD sqlite")
+            except Exception as e:
+                logger.warning(f"⚠️ sqlite-extensie niet beschikbaar, tabellen worden via Arrow geregistreerd: {e}")
+                return False
+        self.con.execute(f"ATTACH '{self.db_path}' AS warp (TYPE SQLITE, READ_ONLY)")
+        logger.info(f"🔗 {self.db_path.name} gekoppeld in DuckDB")
+        return True
+
+    def close(self):
+        self.con.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --- bronnen -------------------------------------------------------------
+
+    def source(self, table):
+        """View 'src_<table>' met een hour_key-kolom; None als de tabel ontbreekt"""
+        view = f"src_{table}"
+        if table in self._columns:
+            return view if self._columns[table] is not None else None
+
+        parquet = self.parquet_dir / f"{table}.parquet" if self.parquet_dir else None
+        if parquet is not None and parquet.exists():
+            relation = f"read_parquet('{parquet}')"
+        elif self.attached and self._sqlite_has(table):
+            relation = f"warp.{table}"
+        elif self.db_path.exists() and self._sqlite_has(table):
+            with sqlite3.connect(self.db_path) as conn:
+                frame = pd.read_sql_query(f"SELECT * FROM {table}", conn)
+            self.con.register(f"arrow_{table}", frame)
+            relation = f"arrow_{table}"
+        else:
+            logger.warning(f"⚠️ Bron '{table}' niet gevonden")
+            self._columns[table] = None
+            return None
+
+        columns = [row[0] for row in self.con.execute(f"DESCRIBE SELECT * FROM {relation}").fetchall()]
+        if HOUR_KEY in columns:
+            # Sleutels die nog niet zijn aangevuld (NULL) alsnog uit de tijdkolom halen
+            key = f"COALESCE({HOUR_KEY}, {self._key_expression(TABLE_TIME_COLUMNS[table])})"
+            select = f"* REPLACE ({key} AS {HOUR_KEY})"
+        else:
+            select = f"*, {self._key_expression(TABLE_TIME_COLUMNS[table])} AS {HOUR_KEY}"
+            columns.append(HOUR_KEY)
+        self.con.execute(f"CREATE OR REPLACE TEMP VIEW {view} AS SELECT {select} FROM {relation}")
+        self._columns[table] = columns
+        return view
+
+    def _sqlite_has(self, table):
+        with sqlite3.connect(self.db_path) as conn:
+            row = conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (table,)).fetchone()
+        return row is not None
+
+    @staticmethod
+    def _key_expression(time_column):
+        seconds = f"epoch(CAST({_quote(time_column)} AS TIMESTAMPTZ))"
+        return f"CAST(floor({seconds} / 3600) AS INTEGER)"
+
+    def columns(self, table):
+        self.source(table)
+        return self._columns.get(table) or []
+
+    def _register_spine(self, keys, name="spine"):
+        """Kalenderkolommen uit de calendar service voor de gegeven hour keys"""
+        spine = calendar_spine(from_hour_key(keys)).drop(columns=["date"], errors="ignore")
+        spine[HOUR_KEY] = (spine["target_datetime"].astype("int64") // NS_PER_HOUR).astype("int32")
+        self.con.register(name, spine)
+        return [col for col in spine.columns if col != HOUR_KEY]
+
+    def _keys(self, views, since=None):
+        where = f" WHERE {HOUR_KEY} >= {hour_key(since)}" if since is not None else ""
+        union = " UNION ".join(f"SELECT {HOUR_KEY} FROM {view}{where}" for view in views)
+        return self.con.execute(f"SELECT {HOUR_KEY} FROM ({union}) WHERE {HOUR_KEY} IS NOT NULL").fetchnumpy()[HOUR_KEY]
+
+    @staticmethod
+    def _coalesced(sources, order, fill_zero=(), casts=None):
+        """SELECT-lijst: per kolom COALESCE over de bronnen die hem hebben (combine_first)"""
+        casts = casts or {}
+        names, providers = [], {}
+        for alias, columns in sources:
+            for col in columns:
+                if col not in providers:
+                    names.append(col)
+                    providers[col] = []
+                providers[col].append(f"{alias}.{_quote(col)}")
+
+        ordered = [col for col in order if col in providers] + [col for col in names if col not in order]
+        select = []
+        for col in ordered:
+            parts = providers[col] + (["0"] if col in fill_zero else [])
+            expression = parts[0] if len(parts) == 1 else f"COALESCE({', '.join(parts)})"
+            if col in casts:
+                expression = f"CAST({expression} AS {casts[col]})"
+            select.append(f"{expression} AS {_quote(col)}")
+        return ", ".join(select)
+
+    # --- masters -------------------------------------------------------------
+
+    def master_warp(self, since=None):
+        """master_warp als Arrow-tabel (zelfde rijen en kolommen als build_master_observed)"""
+        views = [self.source(t) for t in ["dim_datetime"] + OBSERVED_SOURCES]
+        views = [v for v in views if v]
+        spine_columns = self._register_spine(self._keys(views, since))
+
+        sources, joins = [("s", spine_columns)], []
+        for i, table in enumerate(OBSERVED_SOURCES):
+            view = self.source(table)
+            if view is None:
+                continue
+            alias = f"b{i}"
+            sources.append((alias, [c for c in self.columns(table) if c not in DROP_COLUMNS]))
+            joins.append(f"LEFT JOIN {view} {alias} ON {alias}.{HOUR_KEY} = s.{HOUR_KEY}")
+
+        # fillna(0) van het pandas-pad, alleen voor numerieke bronkolommen
+        numeric = self._numeric_columns(OBSERVED_SOURCES)
+        select = self._coalesced(sources, OBSERVED_ORDER, fill_zero=numeric)
+        query = f"SELECT {select}, s.{HOUR_KEY} FROM spine s {' '.join(joins)} ORDER BY s.{HOUR_KEY}"
+        table = self.con.execute(query).arrow()
+        logger.info(f"📊 master_warp (DuckDB): {table.num_rows} rijen, {table.num_columns} kolommen")
+        return table
+
+    def master_predictions(self, since=None):
+        """master_predictions als Arrow-tabel; dubbele kolommen van _weather/_now via COALESCE"""
+        views = [self.source(t) for t in ["dim_datetime"] + PREDICTION_SOURCES]
+        views = [v for v in views if v]
+        spine_columns = self._register_spine(self._keys(views, since))
+
+        sources, joins = [("s", spine_columns)], []
+        for i, table in enumerate(PREDICTION_SOURCES):
+            view = self.source(table)
+            if view is None:
+                continue
+            alias = f"b{i}"
+            sources.append((alias, [c for c in self.columns(table) if c not in DROP_COLUMNS]))
+            joins.append(f"LEFT JOIN {view} {alias} ON {alias}.{HOUR_KEY} = s.{HOUR_KEY}")
+
+        select = self._coalesced(sources, PREDICTIONS_ORDER, casts={"run_date": "TIMESTAMPTZ"})
+        order = f"s.{HOUR_KEY}"
+        if any("run_date" in columns for _, columns in sources):
+            order += ", run_date"
+        query = f"SELECT {select}, s.{HOUR_KEY} FROM spine s {' '.join(joins)} ORDER BY {order}"
+        table = self.con.execute(query).arrow()
+        logger.info(f"📊 master_predictions (DuckDB): {table.num_rows} rijen, {table.num_columns} kolommen")
+        return table
+
+    def _numeric_columns(self, tables):
+        numeric = set()
+        for table in tables:
+            view = self.source(table)
+            if view is None:
+                continue
+            for name, dtype, *_ in self.con.execute(f"DESCRIBE SELECT * FROM {view}").fetchall():
+                if dtype in ("TINYINT", "SMALLINT", "INTEGER", "BIGINT", "HUGEINT", "FLOAT", "DOUBLE") \
+                        or dtype.startswith("DECIMAL"):
+                    numeric.add(name)
+        return numeric
+
+    def training_set(self, train_start, train_end, run_date, lag_hours=168,
+                     actuals_table="master_warp", predictions_table="master_predictions"):
+        """Trainingset als Arrow-tabel, zoals utils/build_training_set maar in één query.
+
+        Voorspellingen: per target-uur de laatste vintage met run_date <= run_date
+        (QUALIFY). Kalenderkolommen komen uit de calendar service, Price uit de
+        actuals, overige ontbrekende kolommen via een ASOF-join lag_hours terug.
+        Bij overlap winnen de actuals.
+        """
+        train_start, train_end, run_date = (pd.Timestamp(t, tz="UTC") if pd.Timestamp(t).tz is None
+                                            else pd.Timestamp(t).tz_convert("UTC")
+                                            for t in (train_start, train_end, run_date))
+        forecast_start = run_date
+        forecast_end = forecast_start + pd.Timedelta(hours=HORIZON)
+        extended_end = max(train_end, forecast_end - pd.Timedelta(hours=lag_hours))
+
+        actuals = self.source(actuals_table)
+        if actuals is None:
+            raise ValueError(f"Table '{actuals_table}' does not exist")
+        columns = [col for col in TRAINING_ORDER if col in self.columns(actuals_table)]
+        actual_select = ", ".join(
+            f"to_timestamp({HOUR_KEY} * 3600) AS target_datetime" if col == "target_datetime" else _quote(col)
+            for col in columns
+        )
+        ks, ke, kx = hour_key(train_start), hour_key(train_end), hour_key(extended_end)
+        fs, fe = hour_key(forecast_start), hour_key(forecast_end)
+
+        predictions = self.source(predictions_table)
+        pred_columns = self.columns(predictions_table)
+        if predictions is None or "run_date" not in pred_columns:
+            query = f"""
+                SELECT {actual_select} FROM {actuals}
+                WHERE {HOUR_KEY} BETWEEN {ks} AND {ke}
+                QUALIFY row_number() OVER (PARTITION BY {HOUR_KEY}) = 1
+                ORDER BY {HOUR_KEY}
+            """
+            return self.con.execute(query).arrow()
+
+        self._register_spine(list(range(fs, fe + 1)), name="forecast_calendar")
+        common = [col for col in columns if col in pred_columns and col != "target_datetime"]
+        forecast_select = []
+        for col in columns:
+            if col == "target_datetime":
+                forecast_select.append(f"to_timestamp(p.{HOUR_KEY} * 3600) AS target_datetime")
+            elif col == "Price":
+                price = "COALESCE(fa.Price, p.Price)" if "Price" in common else "fa.Price"
+                forecast_select.append(f"{price} AS Price")
+            elif col in common:
+                forecast_select.append(f"p.{_quote(col)}")
+            elif col in CALENDAR_FEATURES:
+                forecast_select.append(f"c.{_quote(col)}")
+            else:
+                forecast_select.append(f"lag.{_quote(col)}")
+
+        query = f"""
+            WITH latest AS (
+                SELECT * FROM {predictions}
+                WHERE {HOUR_KEY} BETWEEN {fs} AND {fe}
+                  AND epoch(CAST(run_date AS TIMESTAMPTZ)) <= {run_date.timestamp()}
+                QUALIFY row_number() OVER (PARTITION BY {HOUR_KEY} ORDER BY epoch(CAST(run_date AS TIMESTAMPTZ)) DESC) = 1
+            ),
+            history AS (
+                SELECT * FROM {actuals} WHERE {HOUR_KEY} BETWEEN {ks} AND {kx}
+            ),
+            forecast AS (
+                SELECT {', '.join(forecast_select)}, p.{HOUR_KEY}
+                FROM latest p
+                LEFT JOIN forecast_calendar c ON c.{HOUR_KEY} = p.{HOUR_KEY}
+                LEFT JOIN (SELECT {HOUR_KEY}, Price FROM {actuals} WHERE {HOUR_KEY} BETWEEN {fs} AND {fe}) fa
+                    ON fa.{HOUR_KEY} = p.{HOUR_KEY}
+                ASOF LEFT JOIN history lag ON p.{HOUR_KEY} - {int(lag_hours)} >= lag.{HOUR_KEY}
+            ),
+            observed AS (
+                SELECT {actual_select}, {HOUR_KEY} FROM {actuals}
+                WHERE {HOUR_KEY} BETWEEN {ks} AND {ke}
+            ),
+            combined AS (
+                SELECT *, 0 AS priority FROM observed
+                UNION ALL BY NAME
+                SELECT *, 1 AS priority FROM forecast
+            )
+            SELECT {', '.join(_quote(col) for col in columns)} FROM combined
+            QUALIFY row_number() OVER (PARTITION BY {HOUR_KEY} ORDER BY priority) = 1
+            ORDER BY {HOUR_KEY}
+        """
+        table = self.con.execute(query).arrow()
+        logger.info(f"📦 training_set (DuckDB): {table.num_rows} rijen, {table.num_columns} kolommen")
+        return table
+
+
+def build_masters(db_path=DB_PATH, parquet_dir=None):
+    """Beide masters via DuckDB, als dict tabelnaam -> Arrow-tabel"""
+    with DuckMasterEngine(db_path, parquet_dir) as engine:
+        return {
+            "master_warp": engine.master_warp(),
+            "master_predictions": engine.master_predictions(),
+        }
+
+
+if __name__ == "__main__":
+    try:
+        for name, table in build_masters().items():
+            logger.info(f"✅ {name}: {table.num_rows} rijen")
+    except Exception as e:
+        logger.error(f"❌ Fout tijdens DuckDB-build: {e}", exc_info=True)
@@ -1,87 +1,155 @@
-import pandas as pd
-from entsoe import EntsoePandasClient
-import time
+#!/usr/bin/env python3
+# raw_entsoe_obs (15-minute) -> transform_entsoe_obs (hourly, end-of-hour timestamps).
+# Only hours touched since the previous run are re-aggregated and upserted.
+
+import sys
 import sqlite3
+import logging
 from pathlib import Path
 
+import numpy as np
+import pandas as pd
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - entsoe_dataprocessing - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger("entsoe_dataprocessing")
+
 # Pad naar de SQLite-database
 PROJECT_ROOT = Path(__file__).resolve().parents[2]
 DB_PATH = PROJECT_ROOT / "src" / "data" / "WARP.db"
-
-# Maak verbinding met de database
-conn = sqlite3.connect(DB_PATH)
-
-# Lees de 'raw_entsoe_obs'-tabel in een Pandas DataFrame
-query = "SELECT * FROM raw_entsoe_obs"
-df = pd.read_sql_query(query, conn)
-
-# Sluit de verbinding
-conn.close()
-
-# DEBUG: Check original columns
-print("Original columns:")
-print(df.columns.tolist())
-
-# Ensure 'Timestamp' column is datetime and use it as index
-df['Timestamp'] = pd.to_datetime(df['Timestamp'], errors='coerce')
-df.set_index('Timestamp', inplace=True)
-
-# Resample the data to hourly frequency and calculate the mean for each hour
-df_hourly = df.resample('h').mean()
-print("Data resampled to hourly frequency based on the past hour!")
-
-# DEBUG: Check columns after resampling
-print("Columns after resampling:")
-print(df_hourly.columns.tolist())
-
-# Shift timestamps by +1 hour (aligns with end-of-hour timestamps)
-df_hourly.index = df_hourly.index + pd.Timedelta(hours=1)
-
-# Convert price to kWh
-df_hourly['Price'] = df_hourly['Price'] / 1000
-
-# Add the timestamps as a column
-df_hourly.reset_index(inplace=True)
-print("Timestamps added to the final DataFrame!")
-
-neighboring_countries = ['GB', 'NO']
-
-# DEBUG: Check which flow columns exist
-flow_columns = [col for col in df_hourly.columns if 'Flow' in col]
-print("Available Flow columns:")
-print(flow_columns)
-
-# Safe processing of neighboring countries
-for neighbor in neighboring_countries:
-    from_col = f'Flow_{neighbor}_to_NL'
-    to_col = f'Flow_NL_to_{neighbor}'
-    
-    if from_col in df_hourly.columns and to_col in df_hourly.columns:
-        df_hourly[f'Flow_{neighbor}'] = df_hourly[from_col] - df_hourly[to_col]
-        df_hourly.drop([from_col, to_col], axis=1, inplace=True)
-        print(f"Processed flow for {neighbor}")
+RAW_TABLE = "raw_entsoe_obs"
+TRANSFORM_TABLE = "transform_entsoe_obs"
+
+SRC_ROOT = Path(__file__).resolve().parents[1]
+if str(SRC_ROOT) not in sys.path:
+    sys.path.append(str(SRC_ROOT))
+
+from utils.incremental import table_exists, upsert_since
+from utils.time_keys import HOUR_KEY, NS_PER_HOUR, ensure_hour_key, hour_keys, index_hour_key, read_keyed
+
+NEIGHBORING_COUNTRIES = ['GB', 'NO']
+# ENTSO-E revises the most recent values, so the last day is always recomputed
+OVERLAP_HOURS = 24
+# Above this many (mostly empty) buckets hourly_mean only returns the hours that have rows
+MAX_DENSE_HOURS = 24 * 366
+
+def hourly_mean(hours, values):
+    """Mean per hour bucket.
+
+    hours: int64 hours since epoch, values: (n, k) float array. Returns the
+    bucket keys (contiguous from first to last hour, like resample) and the
+    (hours, k) means with NaN for empty hours. When the span is far larger than
+    the data (e.g. one bogus timestamp decades away) only the occupied hours are
+    returned, so the buckets never outgrow the rows.
+    """
+    first = hours.min()
+    n_hours = int(hours.max() - first) + 1
+    if n_hours > max(4 * len(hours), MAX_DENSE_HOURS):
+        keys, bucket = np.unique(hours, return_inverse=True)
+        n_hours = len(keys)
+        logger.warning(f"⚠️ Uren beslaan {int(hours.max() - first) + 1} uur voor {len(hours)} rijen, "
+                       f"alleen de {n_hours} gevulde uren worden gemiddeld")
     else:
-        print(f"Missing columns for {neighbor}: {from_col} exists: {from_col in df_hourly.columns}, {to_col} exists: {to_col in df_hourly.columns}")
-
-# Only calculate total flow for countries that were successfully processed
-processed_countries = [country for country in neighboring_countries 
-                      if f'Flow_{country}' in df_hourly.columns]
-if processed_countries:
-    df_hourly['Total_Flow'] = sum(df_hourly[f'Flow_{country}'] for country in processed_countries)
-else:
-    print("No flow data processed - skipping Total_Flow calculation")
-
-# Save the DataFrame to a CSV file
-df_hourly.to_csv('transform_entsoe.csv', index=False)
-
-# Connect to the SQLite database
-DB_PATH = PROJECT_ROOT / "src" / "data" / "WARP.db"
-conn = sqlite3.connect(DB_PATH)
-
-# Write the DataFrame to the database table 'transformed_entsoe_obs'
-df_hourly.to_sql('transform_entsoe_obs', conn, if_exists='replace', index=False)
-
-# Close the connection
-conn.close()
-
-print("Data successfully written to database table 'transform_entsoe_obs'")
\ No newline at end of file
+        keys = np.arange(first, first + n_hours, dtype="int64")
+        bucket = hours - first
+
+    present = ~np.isnan(values)
+    means = np.empty((n_hours, values.shape[1]))
+    for j in range(values.shape[1]):
+        sums = np.bincount(bucket, weights=np.where(present[:, j], values[:, j], 0.0), minlength=n_hours)
+        counts = np.bincount(bucket, weights=present[:, j], minlength=n_hours)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means[:, j] = sums / counts
+    return keys, means
+
+def derive_flows(df_hourly):
+    for neighbor in NEIGHBORING_COUNTRIES:
+        from_col = f'Flow_{neighbor}_to_NL'
+        to_col = f'Flow_NL_to_{neighbor}'
+
+        if from_col in df_hourly.columns and to_col in df_hourly.columns:
+            df_hourly[f'Flow_{neighbor}'] = df_hourly[from_col] - df_hourly[to_col]
+            df_hourly.drop([from_col, to_col], axis=1, inplace=True)
+        else:
+            logger.warning(f"⚠️ Ontbrekende flow-kolommen voor {neighbor}: "
+                           f"{from_col}={from_col in df_hourly.columns}, {to_col}={to_col in df_hourly.columns}")
+
+    # Only calculate total flow for countries that were successfully processed
+    processed = [country for country in NEIGHBORING_COUNTRIES if f'Flow_{country}' in df_hourly.columns]
+    if processed:
+        df_hourly['Total_Flow'] = sum(df_hourly[f'Flow_{country}'] for country in processed)
+    return df_hourly
+
+def resample_entsoe(df_raw):
+    """15-minute raw rows -> hourly frame labelled at the end of the hour, Price in EUR/kWh"""
+    df_raw = df_raw.dropna(subset=['Timestamp'])
+    value_cols = [col for col in df_raw.columns if col != 'Timestamp']
+    values = df_raw[value_cols].apply(pd.to_numeric, errors="coerce").to_numpy(dtype="float64")
+
+    hours = hour_keys(df_raw['Timestamp'])
+    valid = ~hours.isna()
+    if not valid.all():
+        logger.warning(f"⚠️ {int((~valid).sum())} rijen met een onleesbare Timestamp overgeslagen")
+    keys, means = hourly_mean(hours[valid].to_numpy(dtype="int64"), values[valid])
+
+    df_hourly = pd.DataFrame(means, columns=value_cols)
+    # Bucket [h, h+1) is labelled h+1 (end-of-hour timestamps)
+    df_hourly.insert(0, 'Timestamp', pd.to_datetime((keys + 1) * NS_PER_HOUR, utc=True))
+    df_hourly[HOUR_KEY] = (keys + 1).astype(np.int32)
+
+    # Convert price to kWh
+    if 'Price' in df_hourly.columns:
+        df_hourly['Price'] = df_hourly['Price'] / 1000
+
+    return derive_flows(df_hourly)
+
+def get_last_processed(conn):
+    if not table_exists(conn, TRANSFORM_TABLE):
+        return None
+    max_ts = conn.execute(f"SELECT MAX(Timestamp) FROM {TRANSFORM_TABLE}").fetchone()[0]
+    return pd.to_datetime(max_ts, utc=True) if max_ts else None
+
+def load_raw(conn, since=None):
+    # Integer range filter on the indexed hour key
+    df = read_keyed(conn, RAW_TABLE, 'Timestamp', since)
+    return df.drop(columns=[HOUR_KEY], errors="ignore")
+
+def transform_entsoe(db_path=DB_PATH, full_rebuild=False, overlap_hours=OVERLAP_HOURS):
+    """Re-aggregate the hours affected since the last run and upsert them into transform_entsoe_obs"""
+    logger.info(f"📦 Verbinden met database: {db_path}")
+    conn = sqlite3.connect(db_path, timeout=60)
+
+    try:
+        last_label = None if full_rebuild else get_last_processed(conn)
+        # The last output label L covers raw rows from L-1h onwards
+        since = None if last_label is None else last_label - pd.Timedelta(hours=1 + overlap_hours)
+
+        df_raw = load_raw(conn, since)
+        logger.info(f"📥 {len(df_raw)} ruwe rijen geladen" + (f" vanaf {since}" if since is not None else ""))
+        if df_raw.empty:
+            logger.info("✅ Geen nieuwe ruwe data, niets te doen")
+            return 0
+
+        df_hourly = resample_entsoe(df_raw)
+
+        if since is None:
+            df_hourly.to_sql(TRANSFORM_TABLE, conn, if_exists='replace', index=False)
+            index_hour_key(conn, TRANSFORM_TABLE)
+        else:
+            # One-off migration of a table written before hour keys, a no-op afterwards
+            ensure_hour_key(conn, TRANSFORM_TABLE, 'Timestamp')
+            upsert_since(conn, TRANSFORM_TABLE, df_hourly, HOUR_KEY, int(df_hourly[HOUR_KEY].min()))
+
+        logger.info(f"✅ {len(df_hourly)} uren weggeschreven naar {TRANSFORM_TABLE}")
+        return len(df_hourly)
+    except Exception as e:
+        logger.error(f"❌ Fout bij verwerken ENTSO-E data: {e}", exc_info=True)
+        raise
+    finally:
+        conn.close()
+        logger.info("🔒 Verbinding gesloten")
+
+if __name__ == "__main__":
+    transform_entsoe()
@@ -1,20 +1,27 @@
 # src/data_processing/feature_eng.py
 from typing import Tuple
+import numpy as np
 import pandas as pd
 from sklearn.preprocessing import StandardScaler
 
-def add_lag_features(df: pd.DataFrame, columns: list, lags: list) -> pd.DataFrame:
-    for col in columns:
-        for lag in lags:
-            df[f"{col}_lag_{lag}"] = df[col].shift(lag)
+from .feature_matrix import FeatureSpec, build_feature_matrix
+
+def _add_features(df: pd.DataFrame, spec: FeatureSpec) -> pd.DataFrame:
+    # Same contract as the per-column versions: float64 columns added to df in place, df returned,
+    # and lags/windows count rows (like .shift/.rolling) whatever the index is. The builder only
+    # sees positions, so its hourly grid for a DatetimeIndex does not apply here.
+    rows = df[spec.source_columns()].reset_index(drop=True)
+    matrix = build_feature_matrix(rows, spec, dtype=np.float64)
+    df[matrix.columns] = matrix.values
     return df
 
+def add_lag_features(df: pd.DataFrame, columns: list, lags: list) -> pd.DataFrame:
+    return _add_features(df, FeatureSpec(lags={col: list(lags) for col in columns}))
+
 def add_rolling_features(df: pd.DataFrame, columns: list, windows: list) -> pd.DataFrame:
-    for col in columns:
-        for window in windows:
-            df[f"{col}_rollmean_{window}"] = df[col].rolling(window).mean()
-            df[f"{col}_rollstd_{window}"] = df[col].rolling(window).std()
-    return df
+    return _add_features(df, FeatureSpec(rolling={
+        col: {"windows": list(windows), "stats": ["mean", "std"], "shift": 0} for col in columns
+    }))
 
 def add_time_features(df: pd.DataFrame, time_column: str = "datetime") -> pd.DataFrame:
     df[time_column] = pd.to_datetime(df[time_column])
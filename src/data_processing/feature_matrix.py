@@ -0,0 +1,253 @@
+# src/data_processing/feature_matrix.py
+# Declarative feature spec compiled into one preallocated float32 matrix.
+# Every feature group (lags, rolling stats, diffs, interactions) writes straight
+# into its slice of the matrix; rolling reductions use NumPy sliding windows.
+# Lags and windows count hours: a DatetimeIndex with gaps is built on its hourly
+# grid, any other index is taken as consecutive hours.
+import time
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+logger = logging.getLogger(__name__)
+
+ROLLING_STATS = ("mean", "std", "min", "max")
+HOUR = pd.Timedelta(hours=1)
+
+
+@dataclass
+class FeatureSpec:
+    """What to build; column names follow feature_eng ({col}_lag_{n}, {col}_rollmean_{w}, ...)"""
+    passthrough: List[str] = field(default_factory=list)
+    lags: Dict[str, List[int]] = field(default_factory=dict)
+    rolling: Dict[str, Dict] = field(default_factory=dict)  # col -> {'windows': [...], 'stats': [...], 'shift': 0}
+    diffs: Dict[str, List[int]] = field(default_factory=dict)
+    interactions: List[Tuple[str, str]] = field(default_factory=list)
+
+    @classmethod
+    def from_dict(cls, spec: Dict) -> 'FeatureSpec':
+        rolling = {}
+        for col, options in spec.get("rolling", {}).items():
+            # Shorthand: {'Load': [24, 168]} means mean+std over those windows
+            options = {"windows": options} if isinstance(options, list) else dict(options)
+            options.setdefault("stats", ["mean", "std"])
+            options.setdefault("shift", 0)
+            rolling[col] = options
+        return cls(
+            passthrough=list(spec.get("passthrough", [])),
+            lags={col: list(v) for col, v in spec.get("lags", {}).items()},
+            rolling=rolling,
+            diffs={col: list(v) for col, v in spec.get("diffs", {}).items()},
+            interactions=[tuple(pair) for pair in spec.get("interactions", [])],
+        )
+
+    def source_columns(self) -> List[str]:
+        cols = list(self.passthrough) + list(self.lags) + list(self.rolling) + list(self.diffs)
+        cols += [c for pair in self.interactions for c in pair]
+        return list(dict.fromkeys(cols))
+
+    def min_lag(self, column: str) -> Optional[int]:
+        """Smallest offset at which `column` enters a feature (None if only passthrough/unused)"""
+        offsets = list(self.lags.get(column, []))
+        if column in self.rolling:
+            offsets.append(int(self.rolling[column].get("shift", 0)))
+        offsets += [0 for _ in self.diffs.get(column, [])]
+        offsets += [0 for pair in self.interactions if column in pair]
+        return min(offsets) if offsets else None
+
+    def column_groups(self) -> Dict[str, List[str]]:
+        """Output column names per feature group, in matrix order"""
+        groups = {"passthrough": list(self.passthrough)}
+        groups["lags"] = [f"{col}_lag_{lag}" for col, lags in self.lags.items() for lag in lags]
+        groups["rolling"] = [
+            f"{col}_roll{stat}_{window}"
+            for col, options in self.rolling.items()
+            for window in options["windows"]
+            for stat in options["stats"]
+        ]
+        groups["diffs"] = [f"{col}_diff_{d}" for col, ds in self.diffs.items() for d in ds]
+        groups["interactions"] = [f"{a}_x_{b}" for a, b in self.interactions]
+        return {name: cols for name, cols in groups.items() if cols}
+
+
+@dataclass
+class FeatureMatrix:
+    """Built features: one C-contiguous array plus its labels and a per-group build report"""
+    values: np.ndarray
+    columns: List[str]
+    index: pd.Index
+    report: pd.DataFrame
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(self.values, index=self.index, columns=self.columns, copy=False)
+
+    @property
+    def nbytes(self) -> int:
+        return self.values.nbytes
+
+
+def hourly_grid_positions(index: pd.Index, start: Optional[pd.Timestamp] = None) -> Optional[np.ndarray]:
+    """Positions of a DatetimeIndex on the hourly grid from `start` (default: its first timestamp).
+
+    None for any other index. Raises ValueError for timestamps that are not
+    strictly increasing whole hours from `start`.
+    """
+    if not isinstance(index, pd.DatetimeIndex) or len(index) == 0:
+        return None
+    offsets = index - (index[0] if start is None else start)
+    positions = np.asarray(offsets // HOUR, dtype=np.int64)
+    if (offsets % HOUR != pd.Timedelta(0)).any() or positions[0] < 0 or (np.diff(positions) <= 0).any():
+        raise ValueError(
+            f"Feature rows must be strictly increasing whole hours"
+            f"{'' if start is None else f' from {start}'}, got {index[0]} .. {index[-1]}"
+        )
+    return positions
+
+
+def _on_grid(x: np.ndarray, positions: np.ndarray, n: int) -> np.ndarray:
+    """x spread over an n-hour grid, NaN for the missing hours"""
+    out = np.full(n, np.nan)
+    out[positions] = x
+    return out
+
+
+def _shift(x: np.ndarray, n: int) -> np.ndarray:
+    out = np.full_like(x, np.nan)
+    if n == 0:
+        out[:] = x
+    elif n < len(x):
+        out[n:] = x[:-n]
+    return out
+
+
+def _rolling(x: np.ndarray, window: int, stats: List[str]) -> Dict[str, np.ndarray]:
+    """Trailing-window stats with pandas semantics (NaN until the window is full or if it contains NaN)"""
+    result = {stat: np.full(len(x), np.nan) for stat in stats}
+    if window > len(x):
+        return result
+
+    if "mean" in stats or "std" in stats:
+        # O(n) window sums from cumulative sums; centring keeps the variance numerically stable
+        valid = ~np.isnan(x)
+        center = x[valid].mean() if valid.any() else 0.0
+        xc = np.where(valid, x - center, 0.0)
+        c1 = np.concatenate(([0.0], np.cumsum(xc)))
+        c2 = np.concatenate(([0.0], np.cumsum(xc * xc)))
+        cn = np.concatenate(([0], np.cumsum(valid)))
+        s1, s2 = c1[window:] - c1[:-window], c2[window:] - c2[:-window]
+        full = (cn[window:] - cn[:-window]) == window
+        if "mean" in stats:
+            result["mean"][window - 1:] = np.where(full, s1 / window + center, np.nan)
+        if "std" in stats and window > 1:
+            var = np.maximum(s2 - s1 * s1 / window, 0.0) / (window - 1)
+            result["std"][window - 1:] = np.where(full, np.sqrt(var), np.nan)
+
+    if "min" in stats or "max" in stats:
+        windows = sliding_window_view(x, window)
+        if "min" in stats:
+            result["min"][window - 1:] = windows.min(axis=1)
+        if "max" in stats:
+            result["max"][window - 1:] = windows.max(axis=1)
+    return result
+
+
+class FeatureMatrixBuilder:
+    """Compiles a FeatureSpec against a time-ordered DataFrame.
+
+    Missing hours in a DatetimeIndex are filled with NaN for the computation, so a
+    lag of n is always n hours back; the result has the rows of the input only.
+    """
+
+    def __init__(self, spec: FeatureSpec, dtype=np.float32):
+        unknown = {s for options in spec.rolling.values() for s in options["stats"]} - set(ROLLING_STATS)
+        if unknown:
+            raise ValueError(f"Unknown rolling stats: {sorted(unknown)} (supported: {ROLLING_STATS})")
+        self.spec = spec
+        self.dtype = dtype
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def build(self, df: pd.DataFrame) -> FeatureMatrix:
+        missing = [col for col in self.spec.source_columns() if col not in df.columns]
+        if missing:
+            raise ValueError(f"Feature spec refers to missing columns: {missing}")
+
+        groups = self.spec.column_groups()
+        columns = [col for cols in groups.values() for col in cols]
+        # Source columns are read once, in float64 so the reductions keep full precision
+        source = {col: pd.to_numeric(df[col], errors="coerce").to_numpy(dtype="float64")
+                  for col in self.spec.source_columns()}
+
+        positions = hourly_grid_positions(df.index)
+        n_rows = len(df) if positions is None else int(positions[-1]) + 1
+        if n_rows == len(df):
+            positions = None
+        else:
+            self.logger.warning(f"⚠️ {n_rows - len(df)} missing hours in the input, features are built on the hourly grid")
+            source = {col: _on_grid(x, positions, n_rows) for col, x in source.items()}
+        values = np.empty((n_rows, len(columns)), dtype=self.dtype)
+
+        builders = {
+            "passthrough": self._passthrough,
+            "lags": self._lags,
+            "rolling": self._rolling_stats,
+            "diffs": self._diffs,
+            "interactions": self._interactions,
+        }
+        report, position = [], 0
+        for name, cols in groups.items():
+            start = time.perf_counter()
+            block = values[:, position:position + len(cols)]
+            for j, array in enumerate(builders[name](source)):
+                block[:, j] = array
+            position += len(cols)
+            report.append({
+                "group": name,
+                "columns": len(cols),
+                "megabytes": round(block.nbytes / 1e6, 3),
+                "seconds": round(time.perf_counter() - start, 4),
+            })
+
+        if positions is not None:
+            values = values[positions]
+        report = pd.DataFrame(report, columns=["group", "columns", "megabytes", "seconds"])
+        self.logger.info(
+            f"🧮 Feature matrix {values.shape[0]}x{values.shape[1]} ({values.nbytes / 1e6:.1f} MB) "
+            f"built in {report['seconds'].sum():.3f}s"
+        )
+        return FeatureMatrix(values, columns, df.index, report)
+
+    def _passthrough(self, source):
+        for col in self.spec.passthrough:
+            yield source[col]
+
+    def _lags(self, source):
+        for col, lags in self.spec.lags.items():
+            for lag in lags:
+                yield _shift(source[col], lag)
+
+    def _rolling_stats(self, source):
+        for col, options in self.spec.rolling.items():
+            x = _shift(source[col], int(options.get("shift", 0)))
+            for window in options["windows"]:
+                stats = _rolling(x, window, options["stats"])
+                for stat in options["stats"]:
+                    yield stats[stat]
+
+    def _diffs(self, source):
+        for col, ds in self.spec.diffs.items():
+            for d in ds:
+                yield source[col] - _shift(source[col], d)
+
+    def _interactions(self, source):
+        for a, b in self.spec.interactions:
+            yield source[a] * source[b]
+
+
+def build_feature_matrix(df: pd.DataFrame, spec, dtype=np.float32) -> FeatureMatrix:
+    """Convenience wrapper; spec may be a FeatureSpec or its dict form"""
+    spec = spec if isinstance(spec, FeatureSpec) else FeatureSpec.from_dict(spec)
+    return FeatureMatrixBuilder(spec, dtype=dtype).build(df)
@@ -0,0 +1,284 @@
+# src/data_processing/online_features.py
+# Stateful, checkpointable version of the feature_matrix spec: only the last
+# few hundred hours are kept (ring buffers), so appending N new hours costs O(N)
+# regardless of how long the history is. Output matches FeatureMatrixBuilder.
+import pickle
+import logging
+from collections import deque
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from .feature_matrix import FeatureMatrix, FeatureSpec, HOUR, ROLLING_STATS, hourly_grid_positions
+
+logger = logging.getLogger(__name__)
+
+
+class RollingWindow:
+    """Fixed-size trailing window with O(1) mean/std (Welford add/remove) and
+    amortized O(1) min/max (monotonic deques). Like pandas, a window that is
+    not yet full or contains a NaN yields NaN."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self.values = deque(maxlen=size)
+        self.position = 0
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.nan_count = 0
+        self._min = deque()
+        self._max = deque()
+        self._removals = 0
+
+    def push(self, value: float):
+        if len(self.values) == self.size:
+            self._remove(self.values[0])
+        self.values.append(value)
+        self.position += 1
+
+        if np.isnan(value):
+            self.nan_count += 1
+        else:
+            self.n += 1
+            delta = value - self.mean
+            self.mean += delta / self.n
+            self.m2 += delta * (value - self.mean)
+            while self._min and self._min[-1][1] >= value:
+                self._min.pop()
+            self._min.append((self.position, value))
+            while self._max and self._max[-1][1] <= value:
+                self._max.pop()
+            self._max.append((self.position, value))
+
+        oldest = self.position - self.size
+        for queue in (self._min, self._max):
+            while queue and queue[0][0] <= oldest:
+                queue.popleft()
+
+    def _remove(self, value: float):
+        if np.isnan(value):
+            self.nan_count -= 1
+            return
+        self.n -= 1
+        if self.n == 0:
+            self.mean, self.m2 = 0.0, 0.0
+        else:
+            delta = value - self.mean
+            self.mean -= delta / self.n
+            self.m2 = max(self.m2 - delta * (value - self.mean), 0.0)
+        self._removals += 1
+        if self._removals >= self.size:
+            self._resync()
+
+    def _resync(self):
+        """Recompute mean/M2 from the window once per `size` removals to stop drift"""
+        self._removals = 0
+        valid = [v for v in list(self.values)[1:] if not np.isnan(v)]
+        self.n = len(valid)
+        self.mean = float(np.mean(valid)) if valid else 0.0
+        self.m2 = float(np.sum((np.asarray(valid) - self.mean) ** 2)) if valid else 0.0
+
+    @property
+    def full(self) -> bool:
+        return len(self.values) == self.size and self.nan_count == 0
+
+    def stat(self, name: str) -> float:
+        if not self.full:
+            return np.nan
+        if name == "mean":
+            return self.mean
+        if name == "std":
+            return np.sqrt(self.m2 / (self.size - 1)) if self.size > 1 else np.nan
+        if name == "min":
+            return self._min[0][1]
+        if name == "max":
+            return self._max[0][1]
+        raise ValueError(f"Unknown rolling stat: {name} (supported: {ROLLING_STATS})")
+
+
+class OnlineFeatureState:
+    """Incremental counterpart of FeatureMatrixBuilder for one FeatureSpec"""
+
+    def __init__(self, spec: FeatureSpec, dtype=np.float32):
+        self.spec = spec
+        self.dtype = dtype
+        self.columns = [col for cols in spec.column_groups().values() for col in cols]
+        self.last_index = None
+        self.rows_seen = 0
+        # Spare-capacity row buffer behind the matrices returned by extend
+        self._buffer = None
+        self._buffer_rows = 0
+
+        # How far back each source column has to be remembered
+        depth = {col: 1 for col in spec.source_columns()}
+        for col, lags in spec.lags.items():
+            depth[col] = max(depth[col], max(lags) + 1)
+        for col, ds in spec.diffs.items():
+            depth[col] = max(depth[col], max(ds) + 1)
+        for col, options in spec.rolling.items():
+            depth[col] = max(depth[col], int(options.get("shift", 0)) + 1)
+        self.history = {col: deque([np.nan] * d, maxlen=d) for col, d in depth.items()}
+        self.windows = {
+            (col, window): RollingWindow(window)
+            for col, options in spec.rolling.items() for window in options["windows"]
+        }
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    @classmethod
+    def from_history(cls, spec, df: pd.DataFrame, dtype=np.float32) -> 'OnlineFeatureState':
+        """Warm up from the tail of the history (only as many rows as the spec looks back)"""
+        spec = spec if isinstance(spec, FeatureSpec) else FeatureSpec.from_dict(spec)
+        state = cls(spec, dtype=dtype)
+        state.update(df.iloc[-state.lookback:] if len(df) > state.lookback else df)
+        return state
+
+    @property
+    def lookback(self) -> int:
+        """Rows of history needed to reproduce the next feature row exactly"""
+        needed = [len(h) for h in self.history.values()]
+        for col, options in self.spec.rolling.items():
+            shift = int(options.get("shift", 0))
+            needed += [shift + window for window in options["windows"]]
+        return max(needed) if needed else 1
+
+    def _step(self, row: Dict[str, float], out: np.ndarray):
+        for col, value in row.items():
+            self.history[col].append(value)
+
+        j = 0
+        spec = self.spec
+        for col in spec.passthrough:
+            out[j] = row[col]
+            j += 1
+        for col, lags in spec.lags.items():
+            history = self.history[col]
+            for lag in lags:
+                out[j] = history[-1 - lag]
+                j += 1
+        for col, options in spec.rolling.items():
+            entering = self.history[col][-1 - int(options.get("shift", 0))]
+            for window in options["windows"]:
+                rolling = self.windows[(col, window)]
+                rolling.push(entering)
+                for stat in options["stats"]:
+                    out[j] = rolling.stat(stat)
+                    j += 1
+        for col, ds in spec.diffs.items():
+            history = self.history[col]
+            for d in ds:
+                out[j] = history[-1] - history[-1 - d]
+                j += 1
+        for a, b in spec.interactions:
+            out[j] = row[a] * row[b]
+            j += 1
+
+    def update(self, df_new: pd.DataFrame) -> FeatureMatrix:
+        """Feature rows for N newly arrived (time-ordered) rows, in O(N).
+
+        Like FeatureMatrixBuilder, hours missing from a DatetimeIndex (also between
+        the previous update and this one) are stepped through as NaN rows.
+        """
+        missing = [col for col in self.history if col not in df_new.columns]
+        if missing:
+            raise ValueError(f"New rows are missing source columns: {missing}")
+        if self.last_index is not None and len(df_new) and df_new.index[0] <= self.last_index:
+            raise ValueError(f"New rows must start after {self.last_index}, got {df_new.index[0]}")
+
+        sources = {col: pd.to_numeric(df_new[col], errors="coerce").to_numpy(dtype="float64")
+                   for col in self.history}
+        start = self.last_index + HOUR if isinstance(self.last_index, pd.Timestamp) else None
+        positions = hourly_grid_positions(df_new.index, start)
+        n_steps = len(df_new) if positions is None else int(positions[-1]) + 1
+        # Output row per step, -1 for the filled hours
+        targets = np.arange(n_steps)
+        if positions is not None and n_steps != len(df_new):
+            targets = np.full(n_steps, -1)
+            targets[positions] = np.arange(len(df_new))
+            for col, x in sources.items():
+                sources[col] = np.full(n_steps, np.nan)
+                sources[col][positions] = x
+
+        values = np.empty((len(df_new), len(self.columns)), dtype=self.dtype)
+        row_buffer = np.empty(len(self.columns), dtype="float64")
+        for i in range(n_steps):
+            self._step({col: sources[col][i] for col in sources}, row_buffer)
+            if targets[i] >= 0:
+                values[targets[i]] = row_buffer
+
+        if len(df_new):
+            self.last_index = df_new.index[-1]
+        self.rows_seen += n_steps
+        report = pd.DataFrame([{"group": "online", "columns": len(self.columns),
+                                "megabytes": round(values.nbytes / 1e6, 3), "seconds": np.nan}])
+        return FeatureMatrix(values, list(self.columns), df_new.index, report)
+
+    def _owns(self, values: np.ndarray) -> bool:
+        """True for the values of the matrix returned by the previous extend call"""
+        return self._buffer is not None and values.base is self._buffer and len(values) == self._buffer_rows
+
+    def extend(self, matrix: FeatureMatrix, df_new: pd.DataFrame) -> FeatureMatrix:
+        """Append the feature rows for df_new to an existing matrix built with the same spec.
+
+        Rows are written into a buffer with spare capacity that doubles when it
+        is full, so extending the previously returned matrix again costs O(new
+        rows) amortized instead of copying the whole history. Any other matrix
+        is copied into a fresh buffer once. The returned values are a view of
+        that buffer; only the index (8 bytes per row) is still appended.
+        """
+        if list(matrix.columns) != self.columns:
+            raise ValueError("Feature matrix was built with a different spec")
+        new = self.update(df_new)
+        n_old, n_total = len(matrix.values), len(matrix.values) + len(new.values)
+
+        if not self._owns(matrix.values) or n_total > len(self._buffer):
+            buffer = np.empty((max(2 * n_total, 1024), len(self.columns)), dtype=matrix.values.dtype)
+            buffer[:n_old] = matrix.values
+            self._buffer = buffer
+        self._buffer[n_old:n_total] = new.values
+        self._buffer_rows = n_total
+
+        return FeatureMatrix(
+            self._buffer[:n_total], list(self.columns),
+            matrix.index.append(new.index), pd.concat([matrix.report, new.report], ignore_index=True)
+        )
+
+    def save(self, path: Union[str, Path]):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "wb") as f:
+            pickle.dump(self.__getstate__(), f)
+        self.logger.info(f"💾 Feature state saved to {path} (last index {self.last_index})")
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> 'OnlineFeatureState':
+        with open(path, "rb") as f:
+            state = pickle.load(f)
+        obj = cls.__new__(cls)
+        obj.__setstate__(state)
+        return obj
+
+    def __getstate__(self) -> Dict:
+        state = dict(self.__dict__)
+        state.pop("logger", None)
+        # The extend buffer is output, not state
+        state["_buffer"], state["_buffer_rows"] = None, 0
+        return state
+
+    def __setstate__(self, state: Dict):
+        self.__dict__.update({"_buffer": None, "_buffer_rows": 0, **state})
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+
+def load_or_warm_up(spec, df_history: pd.DataFrame, checkpoint: Optional[Union[str, Path]] = None
+                    ) -> OnlineFeatureState:
+    """Resume from a checkpoint when it matches the spec, otherwise warm up from history"""
+    spec = spec if isinstance(spec, FeatureSpec) else FeatureSpec.from_dict(spec)
+    if checkpoint is not None and Path(checkpoint).exists():
+        state = OnlineFeatureState.load(checkpoint)
+        if state.spec == spec:
+            return state
+        logger.warning(f"⚠️ Checkpoint {checkpoint} was built with another feature spec, warming up again")
+    return OnlineFeatureState.from_history(spec, df_history)
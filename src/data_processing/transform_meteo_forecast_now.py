@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 
+import sys
 import sqlite3
 import pandas as pd
 import logging
@@ -19,10 +20,16 @@ RAW_TABLE = "raw_meteo_forecast_now"
 OBS_TABLE = "raw_meteo_obs"
 OUTPUT_TABLE = "transform_meteo_forecast_now"
 
+SRC_ROOT = Path(__file__).resolve().parents[1]
+if str(SRC_ROOT) not in sys.path:
+    sys.path.append(str(SRC_ROOT))
+
+from utils.time_keys import add_hour_key, index_hour_key
+
 def get_connection(path):
     if not path.exists():
         raise FileNotFoundError(f"❌ Database niet gevonden: {path}")
-    return sqlite3.connect(path)
+    return sqlite3.connect(path, timeout=60)
 
 def transform():
     logger.info(f"📦 Verbinden met database: {DB_PATH}")
@@ -41,13 +48,16 @@ def transform():
         # Filter voorspellingen die ná de laatste observatie vallen
         df = df[df["date"] > max_obs_date]
         df = df.sort_values("date")
+        add_hour_key(df, "date")
 
         logger.info(f"💾 Wegschrijven naar tabel: {OUTPUT_TABLE} ({len(df)} rijen)")
         df.to_sql(OUTPUT_TABLE, conn, if_exists="replace", index=False)
+        index_hour_key(conn, OUTPUT_TABLE)
 
         logger.info("🎉 transform_meteo_forecast_now succesvol opgeslagen.")
     except Exception as e:
         logger.error(f"❌ Fout bij transformatie: {e}", exc_info=True)
+        raise
     finally:
         conn.close()
         logger.info("🔒 Verbinding gesloten")
@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 
+import sys
 import pandas as pd
 import sqlite3
 import logging
@@ -18,10 +19,16 @@ DB_PATH = PROJECT_ROOT / "src" / "data" / "WARP.db"
 RAW_TABLE = "raw_meteo_obs"
 TRANSFORM_TABLE = "transform_weather_obs"
 
+SRC_ROOT = Path(__file__).resolve().parents[1]
+if str(SRC_ROOT) not in sys.path:
+    sys.path.append(str(SRC_ROOT))
+
+from utils.time_keys import add_hour_key, index_hour_key
+
 def get_connection(path):
     if not path.exists():
         raise FileNotFoundError(f"❌ Database niet gevonden: {path}")
-    return sqlite3.connect(path)
+    return sqlite3.connect(path, timeout=60)
 
 def transform():
     logger.info(f"📦 Gebruik van database: {DB_PATH}")
@@ -35,13 +42,16 @@ def transform():
         df["date"] = pd.to_datetime(df["date"], utc=True)
         df = df.drop_duplicates(subset="date", keep="last")
         df = df.sort_values("date")
+        add_hour_key(df, "date")
 
         logger.info(f"🧱 Overschrijven van {TRANSFORM_TABLE}")
         df.to_sql(TRANSFORM_TABLE, conn, if_exists="replace", index=False)
+        index_hour_key(conn, TRANSFORM_TABLE)
 
         logger.info(f"✅ {TRANSFORM_TABLE} bevat {len(df)} rijen")
     except Exception as e:
         logger.error(f"❌ Fout tijdens transformatie: {e}", exc_info=True)
+        raise
     finally:
         conn.close()
         logger.info("🔒 Verbinding gesloten")
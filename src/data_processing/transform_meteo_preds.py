@@ -1,6 +1,9 @@
 #!/usr/bin/env python3
 
+import re
+import sys
 import sqlite3
+import numpy as np
 import pandas as pd
 import logging
 from pathlib import Path
@@ -19,52 +22,157 @@ DB_PATH = PROJECT_ROOT / "src" / "data" / "WARP.db"
 SOURCE_TABLE = "raw_meteo_preds_history"
 OUTPUT_TABLE = "process_weather_preds"
 
-def load_preds(conn):
-    logger.info(f"📥 Laden van tabel: {SOURCE_TABLE}")
-    df = pd.read_sql_query(f"SELECT * FROM {SOURCE_TABLE}", conn)
+# Raw rows from the last day are re-processed on every run because Open-Meteo
+# fills in the newest vintages later.
+REPROCESS_OVERLAP = timedelta(days=1)
+
+SRC_ROOT = Path(__file__).resolve().parents[1]
+if str(SRC_ROOT) not in sys.path:
+    sys.path.append(str(SRC_ROOT))
+
+from utils.incremental import table_columns
+from utils.time_keys import HOUR_KEY, add_hour_key, ensure_hour_key, index_hour_key
+
+PREVIOUS_DAY_PATTERN = re.compile(r"^(?P<variable>.+)_previous_day(?P<day>\d+)$")
+
+def table_exists(conn, table_name):
+    cur = conn.cursor()
+    cur.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?", (table_name,))
+    return cur.fetchone() is not None
+
+def get_watermark(conn, table_name, column):
+    """Latest processed timestamp in an output table, or None for a first run"""
+    if not table_exists(conn, table_name):
+        return None
+    cols = pd.read_sql_query(f"PRAGMA table_info({table_name})", conn)["name"].tolist()
+    if column not in cols:
+        return None
+    max_value = conn.execute(f"SELECT MAX({column}) FROM {table_name}").fetchone()[0]
+    return pd.to_datetime(max_value, utc=True) if max_value else None
+
+def stack_previous_runs(df, time_col="date", include_current=False, drop_empty=False):
+    """Reshape Open-Meteo previous-runs columns to long format in one vectorized step.
+
+    Every `<variable>_previous_day<N>` column becomes a row per (fetch_date,
+    forecast_for) with one column per variable. With include_current the plain
+    `<variable>` column is treated as vintage 0. With drop_empty, rows where
+    all variables are missing are dropped.
+    """
+    vintages = {}
+    for col in df.columns:
+        match = PREVIOUS_DAY_PATTERN.match(col)
+        if match:
+            vintages[(match.group("variable"), int(match.group("day")))] = col
+
+    variables = sorted({var for var, _ in vintages})
+    if include_current:
+        for var in variables:
+            if var in df.columns:
+                vintages[(var, 0)] = var
+    days = sorted({day for _, day in vintages})
+
+    if not variables:
+        logger.warning("⚠️ Geen _previous_dayN kolommen gevonden")
+        return pd.DataFrame(columns=["fetch_date", "forecast_for"])
+
+    # (day × variable) grid of column positions; missing combinations point at a NaN column
+    source_cols = list(vintages.values())
+    position = {col: i for i, col in enumerate(source_cols)}
+    nan_pos = len(source_cols)
+    grid = np.array([
+        [position.get(vintages.get((var, day)), nan_pos) for var in variables]
+        for day in days
+    ])
+
+    values = df[source_cols].apply(pd.to_numeric, errors="coerce").to_numpy(dtype="float64")
+    values = np.hstack([values, np.full((len(df), 1), np.nan)])
+    cube = values[:, grid]  # (rows × days × variables)
+
+    forecast_for = pd.DatetimeIndex(pd.to_datetime(df[time_col], utc=True))
+    n_rows, n_days = len(df), len(days)
+    target = forecast_for.repeat(n_days)
+    offsets = pd.to_timedelta(np.tile(days, n_rows), unit="D")
+
+    long_df = pd.DataFrame(cube.reshape(n_rows * n_days, len(variables)), columns=variables)
+    long_df.insert(0, "forecast_for", target)
+    long_df.insert(0, "fetch_date", (target - offsets).floor("D"))
+
+    if drop_empty:
+        long_df = long_df.dropna(subset=variables, how="all")
+    return long_df.sort_values(["forecast_for", "fetch_date"]).reset_index(drop=True)
+
+def load_preds(conn, since=None):
+    logger.info(f"📥 Laden van tabel: {SOURCE_TABLE}" + (f" vanaf {since}" if since is not None else ""))
+    if since is None:
+        df = pd.read_sql_query(f"SELECT * FROM {SOURCE_TABLE}", conn)
+    else:
+        df = pd.read_sql_query(f"SELECT * FROM {SOURCE_TABLE} WHERE date >= ?", conn, params=(str(since),))
     df["date"] = pd.to_datetime(df["date"], utc=True)
     return df
 
 def transform_to_long_format(df):
     logger.info("🔄 Transformeren naar long-format met fetch_date (datum) + forecast_for")
+    # Vintages the API has no values for are padding here, not data
+    combined = stack_previous_runs(df, time_col="date", drop_empty=True)
+    logger.info(f"✅ {len(combined)} rijen in long-format gegenereerd ({combined.shape[1] - 2} variabelen)")
+    return combined
 
-    long_rows = []
+def write_incremental(conn, df_long, table_name, time_col, since):
+    """Replace rows from `since` onwards (or the whole table on a first run).
 
-    for col in df.columns:
-        if col.startswith("temperature_2m_previous_day"):
-            day_offset = int(col.replace("temperature_2m_previous_day", ""))
-            temp_df = df[["date", col]].copy()
-            temp_df = temp_df.rename(columns={col: "temperature_2m"})
-            temp_df["forecast_for"] = temp_df["date"]
-            temp_df["fetch_date"] = (temp_df["forecast_for"] - timedelta(days=day_offset)).dt.floor("D")
-            long_rows.append(temp_df[["fetch_date", "forecast_for", "temperature_2m"]])
-
-    combined = pd.concat(long_rows, ignore_index=True)
-    combined = combined.sort_values(["forecast_for", "fetch_date"]).reset_index(drop=True)
-
-    logger.info(f"✅ {len(combined)} rijen in long-format gegenereerd")
-    return combined
+    The hour key of `time_col` is added here, so readers never have to parse it.
+    The existing table is brought to the frame's layout first: a table without
+    `time_col` (another writer's layout) is replaced as a whole, columns the
+    frame adds (new variables) are added with ALTER TABLE. A table without
+    `time_col` also has no watermark, so the callers then pass the full data.
+    """
+    add_hour_key(df_long, time_col)
+    existing = table_columns(conn, table_name) if table_exists(conn, table_name) else []
+    if since is None or time_col not in existing:
+        if since is not None:
+            logger.warning(f"⚠️ {table_name} heeft een andere indeling (geen {time_col}), tabel wordt vervangen")
+        df_long.to_sql(table_name, conn, if_exists="replace", index=False)
+        index_hour_key(conn, table_name)
+        return
+    # One-off migration of a table written before hour keys, a no-op afterwards
+    ensure_hour_key(conn, table_name, time_col)
+    added = [col for col in df_long.columns if col not in existing and col != HOUR_KEY]
+    if added:
+        logger.info(f"➕ Nieuwe kolommen in {table_name}: {added}")
+    with conn:
+        for col in added:
+            conn.execute(f'ALTER TABLE {table_name} ADD COLUMN "{col}"')
+        conn.execute(f"DELETE FROM {table_name} WHERE {time_col} >= ?", (str(since),))
+    df_long.to_sql(table_name, conn, if_exists="append", index=False)
 
-def main():
+def main(full_rebuild=False):
     logger.info(f"📦 Verbinden met database: {DB_PATH}")
     if not DB_PATH.exists():
         raise FileNotFoundError(f"❌ Database niet gevonden: {DB_PATH}")
 
-    conn = sqlite3.connect(DB_PATH)
+    conn = sqlite3.connect(DB_PATH, timeout=60)
 
     try:
-        df_preds = load_preds(conn)
+        watermark = None if full_rebuild else get_watermark(conn, OUTPUT_TABLE, "forecast_for")
+        since = (watermark - REPROCESS_OVERLAP).floor("D") if watermark is not None else None
+
+        df_preds = load_preds(conn, since)
+        if df_preds.empty:
+            logger.info("ℹ️ Geen nieuwe data om te transformeren")
+            return
+
         df_long = transform_to_long_format(df_preds)
 
         logger.info(f"💾 Wegschrijven naar tabel: {OUTPUT_TABLE}")
-        df_long.to_sql(OUTPUT_TABLE, conn, if_exists="replace", index=False)
+        write_incremental(conn, df_long, OUTPUT_TABLE, "forecast_for", since)
 
         logger.info("🎉 transform_meteo_preds_history succesvol opgeslagen.")
     except Exception as e:
         logger.error(f"❌ Fout bij transformatie: {e}", exc_info=True)
+        raise
     finally:
         conn.close()
         logger.info("🔒 Verbinding gesloten")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,12 +1,22 @@
 #!/usr/bin/env python3
 
-import pandas as pd
+import sys
 import sqlite3
 import logging
 from pathlib import Path
-import re
-from functools import reduce
-from datetime import timedelta
+
+import pandas as pd
+
+SRC_ROOT = Path(__file__).resolve().parents[1]
+if str(SRC_ROOT) not in sys.path:
+    sys.path.append(str(SRC_ROOT))
+
+from data_processing.transform_meteo_preds import (
+    REPROCESS_OVERLAP,
+    get_watermark,
+    stack_previous_runs,
+    write_incremental,
+)
 
 # === Logging ===
 logging.basicConfig(
@@ -21,8 +31,8 @@ DB_PATH = PROJECT_ROOT / "src" / "data" / "WARP.db"
 RAW_TABLE = "raw_weather_preds"
 TRANSFORM_TABLE = "process_weather_preds"
 
-def transform():
-    conn = sqlite3.connect(DB_PATH)
+def transform(full_rebuild=False):
+    conn = sqlite3.connect(DB_PATH, timeout=60)
     try:
         # First, check if raw table exists
         cursor = conn.cursor()
@@ -31,17 +41,23 @@ def transform():
             logger.error(f"❌ Tabel {RAW_TABLE} bestaat niet in de database")
             return
 
-        # Count rows in raw table
-        cursor.execute(f"SELECT COUNT(*) FROM {RAW_TABLE}")
-        raw_count = cursor.fetchone()[0]
-        if raw_count == 0:
-            logger.error(f"❌ Tabel {RAW_TABLE} bevat geen data")
+        # Only raw rows newer than what is already transformed (minus overlap) are re-processed
+        watermark = None if full_rebuild else get_watermark(conn, TRANSFORM_TABLE, "target_datetime")
+        since = (watermark - REPROCESS_OVERLAP).floor("D") if watermark is not None else None
+
+        if since is None:
+            df = pd.read_sql_query(f"SELECT * FROM {RAW_TABLE}", conn)
+        else:
+            df = pd.read_sql_query(f"SELECT * FROM {RAW_TABLE} WHERE date >= ?", conn, params=(str(since),))
+            logger.info(f"ℹ️ Incrementeel vanaf {since}")
+
+        if df.empty:
+            if since is None:
+                logger.error(f"❌ Tabel {RAW_TABLE} bevat geen data")
+            else:
+                logger.info("ℹ️ Geen nieuwe data om te transformeren")
             return
-        
-        logger.info(f"ℹ️ Tabel {RAW_TABLE} bevat {raw_count} rijen")
-        
-        # Load raw data
-        df = pd.read_sql_query(f"SELECT * FROM {RAW_TABLE}", conn)
+
         logger.info(f"✅ {RAW_TABLE} geladen ({len(df)} rijen)")
 
         # Check and report NULL values in _previous_day columns
@@ -54,66 +70,17 @@ def transform():
             logger.warning(f"⚠️ Veel NULL-waarden gevonden in {len(high_null_cols)} kolommen")
             logger.debug(f"Kolommen met >50% NULL: {high_null_cols[:5]}...")
 
-        df["target_datetime"] = pd.to_datetime(df["date"], utc=True, errors="coerce")
-        df = df.drop(columns=["date"])
-
-        # Extract variable base names and their "previous day" variants
-        pattern = re.compile(r"^(?P<varname>.+)_previous_day(?P<day>\d+)$")
-        variable_map = {}
-        base_variables = set()
-
-        # First, identify all variables with _previous_day pattern
-        for col in df.columns:
-            match = pattern.match(col)
-            if match:
-                varname = match.group("varname")
-                day = int(match.group("day"))
-                base_variables.add(varname)
-                variable_map.setdefault(varname, []).append((day, col))
-
-        # Next, add current day variables (those without _previous_day suffix)
-        for col in df.columns:
-            if col != "target_datetime" and "_previous_day" not in col:
-                # Check if this column is a base variable that may have previous_day variants
-                if col in base_variables:
-                    # Add as day 0 (current day's value)
-                    variable_map.setdefault(col, []).append((0, col))
-                    logger.info(f"✅ Toegevoegd huidige waarde: {col} (dag 0)")
-
-        logger.info(f"📊 Geïdentificeerde variabelen: {list(variable_map.keys())}")
-
-        result_frames = []
-
-        for var, entries in variable_map.items():
-            rows = []
-            for horizon, col in sorted(entries):
-                temp = df[["target_datetime", col]].copy()
-                # Calculate run_date (when the prediction was made)
-                temp["run_date"] = (temp["target_datetime"] - pd.Timedelta(days=horizon)).dt.normalize()
-                temp.rename(columns={col: var}, inplace=True)
-                
-                # Only include rows where the variable has a value
-                temp = temp.dropna(subset=[var])
-                if not temp.empty:
-                    rows.append(temp)
-                    logger.info(f"✅ Verwerkt {var} voor dag {horizon}: {len(temp)} rijen")
-                else:
-                    logger.warning(f"⚠️ Geen data voor {var} dag {horizon}")
-
-            if rows:
-                merged = pd.concat(rows)
-                result_frames.append(merged)
-            else:
-                logger.warning(f"⚠️ Geen rijen voor variabele {var}")
+        # All variables and vintages in one stack; the plain column is vintage 0.
+        # Vintages without any value are dropped (the old per-variable dropna never emitted
+        # them), otherwise VintageStore.as_of would pick an empty newer run over a filled one
+        df_final = stack_previous_runs(df, time_col="date", include_current=True, drop_empty=True)
+        df_final = df_final.rename(columns={"fetch_date": "run_date", "forecast_for": "target_datetime"})
 
-        if not result_frames:
+        if df_final.shape[1] <= 2:
             logger.error("❌ Geen data om te transformeren")
             return
 
-        df_final = reduce(
-            lambda left, right: pd.merge(left, right, on=["run_date", "target_datetime"], how="outer"),
-            result_frames
-        )
+        logger.info(f"📊 Geïdentificeerde variabelen: {list(df_final.columns[2:])}")
 
         # ✅ Forceer correct datetime-type
         df_final["run_date"] = pd.to_datetime(df_final["run_date"], utc=True, errors="coerce")
@@ -137,7 +104,7 @@ def transform():
             logger.error("❌ Transformatie resulteerde in een lege dataset")
             return
             
-        df_final.to_sql(TRANSFORM_TABLE, conn, if_exists="replace", index=False)
+        write_incremental(conn, df_final, TRANSFORM_TABLE, "target_datetime", since)
         logger.info(f"✅ Weggeschreven naar {TRANSFORM_TABLE}")
         
         # Confirm data was saved
@@ -147,6 +114,7 @@ def transform():
         
     except Exception as e:
         logger.error(f"❌ Fout tijdens transformatie: {e}", exc_info=True)
+        raise
     finally:
         conn.close()
         logger.info("🔒 Verbinding gesloten")
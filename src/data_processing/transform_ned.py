@@ -15,12 +15,12 @@ logger = logging.getLogger('transform_ned')
 # Config
 PROJECT_ROOT = Path(__file__).resolve().parents[2]
 DB_PATH = PROJECT_ROOT / "src" / "data" / "WARP.db"
-RAW_TABLE = "raw_ned_obs"
+RAW_TABLE = "raw_ned_obs_2"  # written by ingest_ned.py
 TRANSFORM_TABLE = "transform_ned_obs"
 
 def clean_ned_obs(df):
     if 'validto' not in df.columns or 'volume' not in df.columns:
-        raise KeyError("⚠️ Vereiste kolommen 'validto' en 'volume' ontbreken in raw_ned_obs.")
+        raise KeyError(f"⚠️ Vereiste kolommen 'validto' en 'volume' ontbreken in {RAW_TABLE}.")
 
     df = df[['volume', 'validto']].copy()
     df['volume'] = pd.to_numeric(df['volume'], errors='coerce').astype('Int64')
@@ -32,13 +32,13 @@ def transform_ned_pipeline():
     if not DB_PATH.exists():
         raise FileNotFoundError(f"❌ Database niet gevonden op: {DB_PATH}")
 
-    conn = sqlite3.connect(DB_PATH)
+    conn = sqlite3.connect(DB_PATH, timeout=60)
 
     try:
         logger.info(f"📥 Ophalen van {RAW_TABLE}")
         df = pd.read_sql_query(f"SELECT * FROM {RAW_TABLE}", conn)
         if df.empty:
-            logger.warning("⚠️ Geen data gevonden in raw_ned_obs. Pipeline stopt.")
+            logger.warning(f"⚠️ Geen data gevonden in {RAW_TABLE}. Pipeline stopt.")
             return
 
         logger.info("🔧 Start transformatie")
@@ -50,6 +50,7 @@ def transform_ned_pipeline():
         logger.info(f"✅ Transformatie klaar. {len(df_transformed)} rijen opgeslagen in {TRANSFORM_TABLE}.")
     except Exception as e:
         logger.error(f"❌ Fout tijdens transformatie: {e}", exc_info=True)
+        raise
     finally:
         conn.close()
         logger.info("🔒 Verbinding gesloten")
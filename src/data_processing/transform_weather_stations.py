@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# National weather aggregate from the station-partitioned raw_meteo_stations table.
+# Each variable is weighted by the scheme that drives its effect on the grid:
+# population for temperature-like variables, installed solar for radiation and
+# installed wind for wind speed.
+
+import json
+import sqlite3
+import logging
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# === Logging ===
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - transform_weather_stations - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger("transform_weather_stations")
+
+# === Config ===
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+DB_PATH = PROJECT_ROOT / "src" / "data" / "WARP.db"
+CONFIG_PATH = PROJECT_ROOT / "src" / "config" / "config.json"
+RAW_TABLE = "raw_meteo_stations"
+TRANSFORM_TABLE = "transform_weather_national"
+
+WEIGHT_SCHEME = {
+    "temperature_2m": "population",
+    "apparent_temperature": "population",
+    "cloud_cover": "population",
+    "snowfall": "population",
+    "wind_speed_10m": "wind",
+    "diffuse_radiation": "solar",
+    "direct_normal_irradiance": "solar",
+    "shortwave_radiation": "solar",
+}
+
+def load_stations(config_path=CONFIG_PATH):
+    with open(config_path) as f:
+        return json.load(f)["api"]["open_meteo"].get("stations", [])
+
+def to_cube(df, variables, stations):
+    """Long (station, date) rows -> dates, (time × station × variable) float array with NaN gaps"""
+    wide = df.pivot_table(index="date", columns="station", values=variables, aggfunc="last", dropna=False)
+    wide = wide.reindex(columns=pd.MultiIndex.from_product([variables, stations]))
+    cube = wide.to_numpy(dtype="float64").reshape(len(wide), len(variables), len(stations))
+    return wide.index, cube.transpose(0, 2, 1)
+
+def weight_matrix(stations, variables, scheme=WEIGHT_SCHEME):
+    """(station × variable) weights; variables without a scheme get equal weights"""
+    weights = np.ones((len(stations), len(variables)))
+    for j, var in enumerate(variables):
+        kind = scheme.get(var)
+        if kind:
+            weights[:, j] = [s.get("weights", {}).get(kind, 0.0) for s in stations]
+    return weights
+
+def aggregate_national(cube, weights):
+    """Weighted mean over stations; missing stations drop out and the remaining weights renormalise"""
+    present = ~np.isnan(cube)
+    total = np.einsum("tsv,sv->tv", np.where(present, cube, 0.0), weights)
+    norm = np.einsum("tsv,sv->tv", present.astype("float64"), weights)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(norm > 0, total / norm, np.nan)
+
+def transform():
+    logger.info(f"📦 Gebruik van database: {DB_PATH}")
+    if not DB_PATH.exists():
+        raise FileNotFoundError(f"❌ Database niet gevonden: {DB_PATH}")
+    conn = sqlite3.connect(DB_PATH)
+
+    try:
+        stations = load_stations()
+        if not stations:
+            raise ValueError("Geen stations geconfigureerd in api.open_meteo.stations")
+
+        logger.info(f"📥 Ophalen van data uit {RAW_TABLE}")
+        df = pd.read_sql_query(f"SELECT * FROM {RAW_TABLE}", conn)
+        df["date"] = pd.to_datetime(df["date"], utc=True)
+
+        names = [s["name"] for s in stations]
+        unknown = set(df["station"].unique()) - set(names)
+        if unknown:
+            logger.warning(f"⚠️ Stations zonder gewichten genegeerd: {sorted(unknown)}")
+
+        variables = [v for v in WEIGHT_SCHEME if v in df.columns]
+        logger.info(f"🔧 Aggregeren van {len(variables)} variabelen over {len(names)} stations")
+        dates, cube = to_cube(df[df["station"].isin(names)], variables, names)
+        national = aggregate_national(cube, weight_matrix(stations, variables))
+
+        df_out = pd.DataFrame(national, columns=variables)
+        df_out.insert(0, "date", dates)
+        df_out = df_out.sort_values("date")
+
+        logger.info(f"🧱 Overschrijven van {TRANSFORM_TABLE}")
+        df_out.to_sql(TRANSFORM_TABLE, conn, if_exists="replace", index=False)
+        logger.info(f"✅ {TRANSFORM_TABLE} bevat {len(df_out)} rijen")
+    except Exception as e:
+        logger.error(f"❌ Fout tijdens transformatie: {e}", exc_info=True)
+        raise
+    finally:
+        conn.close()
+        logger.info("🔒 Verbinding gesloten")
+
+if __name__ == "__main__":
+    transform()
@@ -1,4 +1,9 @@
 from .metrics import MetricsCalculator
 from .validator import RollingWindowValidator
+from .savings import SavingsSimulator, PredictionCube
+from .probabilistic import ResidualBootstrap, ProbabilisticForecaster
+from .ensemble import ForecastCombiner, evaluate_ensembles
 
-__all__ = ['MetricsCalculator', 'RollingWindowValidator']
\ No newline at end of file
+__all__ = ['MetricsCalculator', 'RollingWindowValidator', 'SavingsSimulator', 'PredictionCube',
+           'ResidualBootstrap', 'ProbabilisticForecaster',
+           'ForecastCombiner', 'evaluate_ensembles']
\ No newline at end of file
@@ -0,0 +1,258 @@
+import pandas as pd
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+from pathlib import Path
+import logging
+import time
+
+from evaluation.savings import PredictionCube
+
+logger = logging.getLogger(__name__)
+
+COMBINATION_METHODS = ('inverse_mse', 'stacked_ridge', 'per_lead')
+
+
+class ForecastCombiner:
+    """Combine archived model forecasts without refitting any model.
+
+    Works on the prediction archive in logs.db (model_predictions). Weights are
+    fitted walk-forward: the combination for a run only uses errors of target
+    hours before its forecast_start. Rolling windows overlap (daily runs, 168h
+    horizon), so the later leads of recent runs are left out until their actuals
+    exist. Every method is closed form on running sums over runs:
+      - inverse_mse: w_m ~ 1 / MSE_m
+      - stacked_ridge: least squares of actual on the model forecasts with the
+        weights summing to one, shrunk towards equal weights by `alpha`
+      - per_lead: inverse_mse per lead hour
+    Hours where a model has no forecast are combined from the other models with
+    their weights rescaled.
+    """
+
+    def __init__(self, method: str = 'inverse_mse', alpha: float = 0.1):
+        if method not in COMBINATION_METHODS:
+            raise ValueError(f"Unknown combination method '{method}', choose from {COMBINATION_METHODS}")
+        self.method = method
+        self.alpha = alpha
+        self.weights_ = None
+        self.models_ = None
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    @property
+    def name(self) -> str:
+        return f"ensemble_{self.method}"
+
+    @staticmethod
+    def _cutoffs(runs: pd.DatetimeIndex, leads: int) -> np.ndarray:
+        """(R + 1, L): per run and lead, how many runs have that lead's target before the run starts.
+
+        Run r' at lead l targets hours[r'] + l, known before run r when
+        hours[r'] < hours[r] - l. The last row counts every run.
+        """
+        hours = np.asarray((runs - runs[0]) // pd.Timedelta(hours=1), dtype=np.int64)
+        known = np.searchsorted(hours, hours[:, None] - np.arange(leads)[None, :], side='left')
+        return np.vstack([known, np.full((1, leads), len(runs))])
+
+    @staticmethod
+    def _history(values: np.ndarray, cutoffs: np.ndarray) -> np.ndarray:
+        """Sums of values (R, L, ...) over the known cells: row r holds, per lead, the runs
+        before cutoffs[r, lead]; the last row all runs. Returns (R + 1, L, ...)"""
+        zeros = np.zeros((1,) + values.shape[1:])
+        running = np.concatenate([zeros, np.cumsum(values, axis=0)])
+        return running[cutoffs, np.arange(values.shape[1])[None, :]]
+
+    def _inverse_mse_weights(self, errors: np.ndarray, fit_mask: np.ndarray, cutoffs: np.ndarray,
+                             per_lead: bool) -> np.ndarray:
+        """(R + 1, M) or (R + 1, M, L) normalised inverse-MSE weights"""
+        squared = np.where(fit_mask[None], errors ** 2, 0.0)                     # (M, R, L)
+        sse = self._history(np.moveaxis(squared, 0, -1), cutoffs)                # (R + 1, L, M)
+        n = self._history(fit_mask.astype('float64'), cutoffs)                   # (R + 1, L)
+        if per_lead:
+            sse = np.moveaxis(sse, 1, 2)                                         # (R + 1, M, L)
+        else:
+            sse, n = sse.sum(axis=1), n.sum(axis=1)
+        n = n[:, None]
+
+        # No history (first run) or a perfect model: fall back to equal weights / that model
+        perfect = (sse == 0) & (n > 0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            inverse = n / sse
+            inverse[~np.isfinite(inverse)] = np.nan
+            weights = inverse / np.nansum(inverse, axis=1, keepdims=True)
+            weights = np.where(perfect.any(axis=1, keepdims=True), perfect / perfect.sum(axis=1, keepdims=True), weights)
+        equal = np.full_like(weights, 1.0 / weights.shape[1])
+        return np.where(np.isnan(weights), equal, weights)
+
+    def _stacked_ridge_weights(self, errors: np.ndarray, fit_mask: np.ndarray, cutoffs: np.ndarray) -> np.ndarray:
+        """(R + 1, M) sum-to-one least-squares weights, one batched solve over all runs.
+
+        Minimising ||actual - F w||^2 with sum(w) = 1 only depends on the error
+        cross-products S = E'E: w = S^-1 1 / (1' S^-1 1). The ridge term
+        alpha * trace(S) / M keeps S invertible for near-identical models and
+        pulls the weights towards 1/M.
+        """
+        M = errors.shape[0]
+        E = np.where(fit_mask[None], errors, 0.0)
+        cross = self._history(np.einsum('mrl,nrl->rlmn', E, E), cutoffs).sum(axis=1)  # (R + 1, M, M)
+        penalty = self.alpha * np.trace(cross, axis1=1, axis2=2) / M             # (R + 1,)
+        lhs = cross + penalty[:, None, None] * np.eye(M)[None]
+
+        weights = np.full((len(cross), M), 1.0 / M)
+        solvable = penalty > 0
+        raw = np.linalg.solve(lhs[solvable], np.ones((solvable.sum(), M, 1)))[..., 0]
+        weights[solvable] = raw / raw.sum(axis=1, keepdims=True)
+        return weights
+
+    def combine(self, cube: PredictionCube) -> Tuple[np.ndarray, np.ndarray]:
+        """Walk-forward combined forecast (runs, leads) and the weights (runs + 1, models[, leads])"""
+        forecast, actual = cube.forecast, cube.actual
+        available = ~np.isnan(forecast)                                          # (M, R, L)
+        fit_mask = available.all(axis=0) & ~np.isnan(actual)                     # (R, L)
+
+        errors = forecast - actual[None]
+        cutoffs = self._cutoffs(cube.runs, forecast.shape[-1])
+        if self.method == 'stacked_ridge':
+            weights = self._stacked_ridge_weights(errors, fit_mask, cutoffs)
+        else:
+            weights = self._inverse_mse_weights(errors, fit_mask, cutoffs, per_lead=self.method == 'per_lead')
+
+        # Weights of run r come from row r (hours before its start); broadcast to (M, R, L)
+        run_weights = np.moveaxis(weights[:-1], 0, 1)
+        if run_weights.ndim == 2:
+            run_weights = run_weights[..., None]
+        run_weights = np.broadcast_to(run_weights, forecast.shape)
+
+        weighted = np.where(available, run_weights * np.nan_to_num(forecast), 0.0).sum(axis=0)
+        used = np.where(available, run_weights, 0.0).sum(axis=0)
+        total = run_weights.sum(axis=0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            combined = weighted * total / used
+            fallback = np.where(available, forecast, 0.0).sum(axis=0) / available.sum(axis=0)
+        combined = np.where(np.isclose(used, 0.0), fallback, combined)
+
+        self.weights_ = weights[-1]
+        self.models_ = list(cube.models)
+        return combined, weights
+
+    def get_weights(self) -> pd.DataFrame:
+        """Weights fitted on the whole archive (what a new forecast would use)"""
+        if self.weights_ is None:
+            raise ValueError("Combiner has not been fitted, call combine() first")
+        if self.weights_.ndim == 1:
+            return pd.DataFrame({'weight': self.weights_}, index=pd.Index(self.models_, name='model_name'))
+        return pd.DataFrame(self.weights_.T, columns=pd.Index(self.models_, name='model_name')).rename_axis('lead_hour')
+
+
+def _run_metrics(actual: np.ndarray, predicted: np.ndarray) -> Dict[str, np.ndarray]:
+    """rmse/mae/mape per run (row), same definitions as MetricsCalculator"""
+    valid = ~np.isnan(actual) & ~np.isnan(predicted)
+    errors = np.where(valid, actual - predicted, 0.0)
+    n = valid.sum(axis=1)
+    nonzero = valid & (actual != 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rmse = np.sqrt((errors ** 2).sum(axis=1) / n)
+        mae = np.abs(errors).sum(axis=1) / n
+        ape = np.where(nonzero, np.abs(errors / np.where(nonzero, actual, 1.0)), 0.0)
+        mape = ape.sum(axis=1) / nonzero.sum(axis=1) * 100
+    return {'rmse': rmse, 'mae': mae, 'mape': mape}
+
+
+def evaluate_ensembles(archive: pd.DataFrame,
+                       methods: Optional[List[str]] = None,
+                       alpha: float = 0.1,
+                       experiment_logger=None,
+                       experiment_id: Optional[int] = None) -> pd.DataFrame:
+    """Combined forecasts for every method, as rows shaped like the rolling results.
+
+    With an experiment_logger the combinations are also registered in logs.db as
+    virtual models (model runs, metrics and hourly predictions), so they show up
+    in every report next to the real models.
+    """
+    methods = methods or list(COMBINATION_METHODS)
+    cube = PredictionCube.from_archive(archive)
+    if len(cube.models) < 2:
+        raise ValueError(f"Need at least two models to combine, found {cube.models}")
+
+    # Window metadata per forecast run (identical for every model in a window)
+    meta = archive.sort_values('run_id').groupby('forecast_start')[
+        ['window_id', 'train_start', 'train_end', 'forecast_end']
+    ].last().reindex(cube.runs)
+
+    rows = []
+    for method in methods:
+        start_time = time.time()
+        combiner = ForecastCombiner(method, alpha)
+        combined, _ = combiner.combine(cube)
+        metrics = _run_metrics(cube.actual, combined)
+        execution_time = time.time() - start_time
+
+        for r, forecast_start in enumerate(cube.runs):
+            row = {
+                'window_id': meta['window_id'].iloc[r],
+                'model_name': combiner.name,
+                'model_variant': method,
+                'train_start': meta['train_start'].iloc[r],
+                'train_end': meta['train_end'].iloc[r],
+                'forecast_start': forecast_start,
+                'forecast_end': meta['forecast_end'].iloc[r],
+                'execution_time': execution_time / len(cube.runs),
+                'status': 'completed',
+                **{name: float(values[r]) for name, values in metrics.items()}
+            }
+            rows.append(row)
+
+            if experiment_logger is not None:
+                _register_run(experiment_logger, experiment_id, row, cube, r, combined[r])
+
+        logger.info(
+            f"🧩 {combiner.name}: mean RMSE {np.nanmean(metrics['rmse']):.6f} over {len(cube.runs)} runs "
+            f"in {execution_time:.2f}s"
+        )
+
+    return pd.DataFrame(rows)
+
+
+def _register_run(experiment_logger, experiment_id: Optional[int], row: Dict, cube: PredictionCube,
+                  r: int, combined: np.ndarray):
+    """Store one combined forecast as a completed model run"""
+    window_id = row['window_id']
+    run_id = experiment_logger.log_model_run(
+        model_name=row['model_name'],
+        model_variant=row['model_variant'],
+        train_start=str(row['train_start']),
+        train_end=str(row['train_end']),
+        forecast_start=row['forecast_start'].isoformat(),
+        forecast_end=str(row['forecast_end']),
+        window_id=None if pd.isna(window_id) else int(window_id),
+        execution_time=row['execution_time'],
+        experiment_id=experiment_id
+    )
+    experiment_logger.log_model_results(
+        model_run_id=run_id,
+        metrics={name: row[name] for name in ('rmse', 'mae', 'mape')}
+    )
+    index = row['forecast_start'] + pd.to_timedelta(np.arange(len(combined)), unit='h')
+    keep = ~np.isnan(combined)
+    experiment_logger.log_predictions(
+        model_run_id=run_id,
+        forecast_start=row['forecast_start'].isoformat(),
+        y_true=pd.Series(cube.actual[r], index=index)[keep],
+        y_pred=pd.Series(combined, index=index)[keep]
+    )
+    experiment_logger.update_model_run_status(run_id, "completed")
+
+
+def ensembles_from_logs(logs_db_path: Path,
+                        experiment_id: Optional[int] = None,
+                        model_names: Optional[List[str]] = None,
+                        methods: Optional[List[str]] = None,
+                        register: bool = False,
+                        alpha: float = 0.1) -> pd.DataFrame:
+    """Evaluate (and optionally register) combinations of the runs already in logs.db"""
+    from core.logging_manager import ExperimentLogger
+
+    experiment_logger = ExperimentLogger(logs_db_path)
+    archive = experiment_logger.get_prediction_archive(experiment_id, model_names)
+    archive = archive[~archive['model_name'].str.startswith('ensemble_')]
+    return evaluate_ensembles(archive, methods, alpha,
+                              experiment_logger=experiment_logger if register else None,
+                              experiment_id=experiment_id)
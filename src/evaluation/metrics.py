@@ -85,6 +85,46 @@ class MetricsCalculator:
             self.logger.warning(f"Error calculating MAPE: {e}")
             return np.nan
     
+    def calculate_pinball_loss(self, y_true: pd.Series, y_quantile: pd.Series, quantile: float) -> float:
+        """Calculate pinball (quantile) loss for one quantile forecast"""
+        try:
+            common_idx = y_true.index.intersection(y_quantile.index)
+            if len(common_idx) == 0:
+                return np.nan
+            
+            y_true_aligned = y_true.loc[common_idx].dropna()
+            y_quantile_aligned = y_quantile.loc[common_idx].dropna()
+            
+            final_common_idx = y_true_aligned.index.intersection(y_quantile_aligned.index)
+            if len(final_common_idx) == 0:
+                return np.nan
+            
+            diff = y_true_aligned.loc[final_common_idx] - y_quantile_aligned.loc[final_common_idx]
+            
+            return float(np.mean(np.maximum(quantile * diff, (quantile - 1) * diff)))
+            
+        except Exception as e:
+            self.logger.warning(f"Error calculating pinball loss: {e}")
+            return np.nan
+    
+    def calculate_quantile_metrics(self, y_true: pd.Series, quantiles: pd.DataFrame) -> Dict[str, float]:
+        """Pinball loss per quantile column (p10, p50, ...), their mean and the outer interval coverage"""
+        levels = {column: int(column[1:]) / 100 for column in quantiles.columns}
+        metrics = {
+            f'pinball_{column}': self.calculate_pinball_loss(y_true, quantiles[column], q)
+            for column, q in levels.items()
+        }
+        metrics['pinball_mean'] = float(np.nanmean(list(metrics.values()))) if metrics else np.nan
+        
+        if len(levels) >= 2:
+            lower, upper = min(levels, key=levels.get), max(levels, key=levels.get)
+            df = pd.concat([y_true.rename('actual'), quantiles[[lower, upper]]], axis=1, join='inner').dropna()
+            if len(df) > 0:
+                inside = (df['actual'] >= df[lower]) & (df['actual'] <= df[upper])
+                metrics[f'coverage_{lower}_{upper}'] = float(inside.mean())
+        
+        return metrics
+    
     def calculate_all_metrics(self, y_true: pd.Series, y_pred: pd.Series) -> Dict[str, float]:
         """Calculate all standard metrics"""
         return {
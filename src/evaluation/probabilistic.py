@@ -0,0 +1,165 @@
+import pandas as pd
+import numpy as np
+from typing import Optional, Sequence, Tuple
+from dataclasses import replace
+from pathlib import Path
+import logging
+
+from models.factory import BaseModel, ModelResult
+from core.data_manager import DataSplit
+
+
+class ResidualBootstrap:
+    """Empirical residual pools (actual - predicted) stratified by lead hour and hour of day.
+
+    Leads are grouped in buckets of `lead_bucket` hours (24 = one pool per forecast
+    day), so a 168h horizon has 7 x 24 strata. A stratum with fewer than
+    `min_samples` residuals falls back to its lead bucket, then to all residuals.
+
+    All pools live in one array sorted by stratum; sampling a (paths x leads)
+    matrix is a single gather: offset[stratum] + floor(u * count[stratum]).
+    """
+
+    def __init__(self,
+                 residuals: np.ndarray,
+                 lead_hours: np.ndarray,
+                 hours_of_day: np.ndarray,
+                 lead_bucket: int = 24,
+                 min_samples: int = 30):
+        residuals = np.asarray(residuals, dtype='float64')
+        keep = np.isfinite(residuals)
+        if not keep.any():
+            raise ValueError("No residuals to bootstrap from")
+
+        self.lead_bucket = lead_bucket
+        self.min_samples = min_samples
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+        residuals = residuals[keep]
+        buckets = np.asarray(lead_hours, dtype=int)[keep] // lead_bucket
+        hours = np.asarray(hours_of_day, dtype=int)[keep] % 24
+        self.n_buckets = int(buckets.max()) + 1
+
+        # Level 0: (bucket, hour), level 1: bucket, level 2: everything
+        fine = buckets * 24 + hours
+        order = np.argsort(fine, kind='stable')
+        fine_counts = np.bincount(fine, minlength=self.n_buckets * 24)
+        bucket_order = np.argsort(buckets, kind='stable')
+        bucket_counts = np.bincount(buckets, minlength=self.n_buckets)
+
+        n = len(residuals)
+        self._pool = np.concatenate([residuals[order], residuals[bucket_order], residuals])
+        self._fine = (np.concatenate([[0], np.cumsum(fine_counts)[:-1]]), fine_counts)
+        self._bucket = (n + np.concatenate([[0], np.cumsum(bucket_counts)[:-1]]), bucket_counts)
+        self._global = (2 * n, n)
+
+    @classmethod
+    def from_archive(cls,
+                     archive: pd.DataFrame,
+                     model_name: Optional[str] = None,
+                     before: Optional[pd.Timestamp] = None,
+                     **kwargs) -> 'ResidualBootstrap':
+        """Residuals from ExperimentLogger.get_prediction_archive().
+
+        `before` keeps only residuals of target hours before that moment (naive =
+        UTC), so a backtest window never sees errors whose actuals were not known
+        at its start, also not those of earlier runs whose horizon reaches past it.
+        """
+        if model_name is not None:
+            archive = archive[archive['model_name'] == model_name]
+        if before is not None:
+            before = pd.Timestamp(before)
+            before = before.tz_localize('UTC') if before.tz is None else before.tz_convert('UTC')
+            archive = archive[pd.to_datetime(archive['target_datetime'], utc=True) < before]
+        archive = archive.dropna(subset=['predicted', 'actual', 'lead_hour'])
+        if archive.empty:
+            raise ValueError(f"No archived residuals for model '{model_name}'")
+
+        return cls(
+            residuals=(archive['actual'] - archive['predicted']).to_numpy(),
+            lead_hours=archive['lead_hour'].to_numpy(),
+            hours_of_day=pd.DatetimeIndex(archive['target_datetime']).hour.to_numpy(),
+            **kwargs
+        )
+
+    @classmethod
+    def from_logs(cls,
+                  logs_db_path: Path,
+                  model_name: str,
+                  experiment_id: Optional[int] = None,
+                  before: Optional[pd.Timestamp] = None,
+                  **kwargs) -> 'ResidualBootstrap':
+        """Residuals of one model from the prediction archive in logs.db"""
+        from core.logging_manager import ExperimentLogger
+
+        archive = ExperimentLogger(logs_db_path).get_prediction_archive(experiment_id, [model_name])
+        return cls.from_archive(archive, model_name, before, **kwargs)
+
+    def _strata(self, lead_hours: np.ndarray, hours_of_day: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Pool offset and size per lead, after the min_samples fallback"""
+        buckets = np.minimum(np.asarray(lead_hours, dtype=int) // self.lead_bucket, self.n_buckets - 1)
+        fine = buckets * 24 + np.asarray(hours_of_day, dtype=int) % 24
+
+        offset, count = self._fine[0][fine], self._fine[1][fine]
+        use_bucket = count < self.min_samples
+        offset = np.where(use_bucket, self._bucket[0][buckets], offset)
+        count = np.where(use_bucket, self._bucket[1][buckets], count)
+        use_global = count < self.min_samples
+        offset = np.where(use_global, self._global[0], offset)
+        count = np.where(use_global, self._global[1], count)
+        return offset, count
+
+    def sample(self,
+               lead_hours: np.ndarray,
+               hours_of_day: np.ndarray,
+               n_paths: int = 1000,
+               rng: Optional[np.random.Generator] = None) -> np.ndarray:
+        """(n_paths x leads) residual matrix, one draw per cell from its stratum"""
+        rng = rng or np.random.default_rng()
+        offset, count = self._strata(lead_hours, hours_of_day)
+        draws = (rng.random((n_paths, len(offset))) * count).astype(np.int64)
+        return self._pool[offset + draws]
+
+
+class ProbabilisticForecaster:
+    """Quantile forecasts for any BaseModel: point forecast + bootstrapped residual paths"""
+
+    def __init__(self,
+                 bootstrap: ResidualBootstrap,
+                 quantiles: Sequence[float] = (0.1, 0.5, 0.9),
+                 n_paths: int = 1000,
+                 random_state: Optional[int] = 42):
+        self.bootstrap = bootstrap
+        self.quantiles = tuple(quantiles)
+        self.n_paths = n_paths
+        self.rng = np.random.default_rng(random_state)
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    @staticmethod
+    def quantile_column(q: float) -> str:
+        return f"p{int(round(q * 100))}"
+
+    def sample_paths(self, point_forecast: pd.Series) -> np.ndarray:
+        """(n_paths x horizon) simulated price paths around the point forecast"""
+        index = pd.DatetimeIndex(point_forecast.index)
+        residuals = self.bootstrap.sample(np.arange(len(index)), index.hour.to_numpy(), self.n_paths, self.rng)
+        return point_forecast.to_numpy(dtype='float64')[None, :] + residuals
+
+    def predict_quantiles(self, point_forecast: pd.Series) -> pd.DataFrame:
+        """One column per quantile (p10, p50, p90, ...), indexed like the point forecast"""
+        paths = self.sample_paths(point_forecast)
+        values = np.quantile(paths, self.quantiles, axis=0)
+        return pd.DataFrame(values.T, index=point_forecast.index,
+                            columns=[self.quantile_column(q) for q in self.quantiles])
+
+    def fit_predict(self, model: BaseModel, data_split: DataSplit) -> ModelResult:
+        """Run the model as usual and attach the quantile forecasts to its result"""
+        result = model.fit_predict(data_split)
+        if not result.success:
+            return result
+
+        quantiles = self.predict_quantiles(result.predictions)
+        self.logger.info(
+            f"📊 {result.model_name}: {len(self.quantiles)} quantiles from {self.n_paths} paths x {len(quantiles)} hours"
+        )
+        return replace(result, quantiles=quantiles)
@@ -0,0 +1,220 @@
+import pandas as pd
+import numpy as np
+from typing import Dict, List, Optional, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+import logging
+import warnings
+
+# Profiles are in local clock hours
+LOCAL_TZ = "Europe/Amsterdam"
+
+# Hour-of-day consumption shapes (relative weights, scaled to the daily consumption)
+DEFAULT_PROFILES = {
+    'flat': np.ones(24),
+    'residential': np.array([0.5, 0.4, 0.4, 0.4, 0.4, 0.5, 0.8, 1.1, 1.0, 0.8, 0.7, 0.7,
+                             0.7, 0.7, 0.7, 0.8, 1.0, 1.4, 1.8, 1.8, 1.5, 1.2, 0.9, 0.7]),
+    'business': np.array([0.3, 0.3, 0.3, 0.3, 0.3, 0.4, 0.7, 1.2, 1.6, 1.7, 1.7, 1.6,
+                          1.5, 1.6, 1.6, 1.5, 1.3, 1.0, 0.7, 0.5, 0.4, 0.3, 0.3, 0.3]),
+    'ev_night': np.array([1.6, 1.6, 1.5, 1.4, 1.2, 0.9, 0.6, 0.4, 0.3, 0.3, 0.3, 0.3,
+                          0.3, 0.3, 0.3, 0.3, 0.4, 0.6, 0.9, 1.2, 1.4, 1.5, 1.6, 1.6]),
+}
+
+
+@dataclass
+class PredictionCube:
+    """Backtest archive as dense arrays: forecast (models, runs, leads), actual (runs, leads).
+
+    hour_of_day (runs, leads) is the Europe/Amsterdam clock hour of every target.
+    """
+    models: List[str]
+    runs: pd.DatetimeIndex
+    forecast: np.ndarray
+    actual: np.ndarray
+    hour_of_day: np.ndarray
+
+    @classmethod
+    def from_archive(cls, archive: pd.DataFrame, max_lead: Optional[int] = None) -> 'PredictionCube':
+        """Pivot ExperimentLogger.get_prediction_archive() output without per-run loops.
+
+        A model is one (model_name, model_variant); it is labelled by its name, or
+        'name:variant' when a name was logged with several variants. A run is one
+        forecast_start; if a model was run several times for the same start
+        (repeated experiments) the last logged value wins.
+        """
+        archive = archive.dropna(subset=['lead_hour'])
+        archive = archive[archive['lead_hour'] >= 0]
+        if max_lead is not None:
+            archive = archive[archive['lead_hour'] < max_lead]
+        if archive.empty:
+            raise ValueError("Prediction archive is empty")
+
+        models_key = archive['model_name'].astype(str)
+        if 'model_variant' in archive:
+            variants = archive['model_variant'].fillna('').astype(str)
+            shared = variants.groupby(models_key).transform('nunique') > 1
+            models_key = models_key.where(~shared, models_key + ':' + variants)
+        model_codes, models = pd.factorize(models_key, sort=True)
+        run_codes, runs = pd.factorize(pd.to_datetime(archive['forecast_start'], utc=True), sort=True)
+        leads = archive['lead_hour'].to_numpy(dtype=int)
+        horizon = int(leads.max()) + 1
+
+        forecast = np.full((len(models), len(runs), horizon), np.nan)
+        forecast[model_codes, run_codes, leads] = archive['predicted'].to_numpy(dtype='float64')
+        actual = np.full((len(runs), horizon), np.nan)
+        known = archive['actual'].notna().to_numpy()
+        actual[run_codes[known], leads[known]] = archive['actual'].to_numpy(dtype='float64')[known]
+
+        runs = pd.DatetimeIndex(runs)
+        targets = runs.values[:, None] + np.arange(horizon)[None, :] * np.timedelta64(1, 'h')
+        hour_of_day = (pd.DatetimeIndex(targets.ravel()).tz_localize('UTC').tz_convert(LOCAL_TZ)
+                       .hour.to_numpy().reshape(len(runs), horizon))
+        return cls(models=list(models), runs=pd.DatetimeIndex(runs), forecast=forecast,
+                   actual=actual, hour_of_day=hour_of_day)
+
+
+class SavingsSimulator:
+    """Euro savings of price-responsive consumption, for every model at once.
+
+    Consumption follows a profile and is shifted by the tertile rule of the
+    cost-savings notebook: +flexibility in the cheapest third of the planning
+    horizon, -flexibility in the most expensive third, rescaled so the energy over
+    the horizon is unchanged. Costs are always settled at actual prices.
+
+    Strategies compared per (model, planning horizon, profile):
+      - flat: no shifting (the profile as is)
+      - day_ahead: shifting on the published day-ahead prices only (first 24h),
+        the rest of the horizon stays flat
+      - model: shifting on the model's forecast over the whole planning horizon
+      - oracle: shifting on actual prices (upper bound)
+    All of it is one broadcast over (horizons, models, profiles, runs, leads).
+    """
+
+    def __init__(self,
+                 profiles: Optional[Dict[str, Sequence[float]]] = None,
+                 horizons: Sequence[int] = (24, 48, 168),
+                 daily_consumption: float = 25.0,
+                 flexibility: float = 0.2,
+                 day_ahead_hours: int = 24):
+        profiles = profiles or DEFAULT_PROFILES
+        self.profile_names = list(profiles)
+        shapes = np.array([np.asarray(profiles[name], dtype='float64') for name in self.profile_names])
+        if shapes.shape[1] != 24:
+            raise ValueError("Profiles must have 24 hourly weights")
+        self.profiles = shapes / shapes.sum(axis=1, keepdims=True) * daily_consumption
+        self.horizons = sorted(int(h) for h in horizons)
+        self.flexibility = flexibility
+        self.day_ahead_hours = day_ahead_hours
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def _shift_factor(self, prices: np.ndarray, window: np.ndarray) -> np.ndarray:
+        """Tertile rule per row over the hours in `window`; 1 elsewhere and where prices are NaN"""
+        masked = np.where(window, prices, np.nan)
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)  # rows without any hour in the window
+            low, high = np.nanquantile(masked, [0.33, 0.66], axis=-1, keepdims=True)
+        factor = np.where(masked <= low, 1 + self.flexibility, 1.0)
+        factor = np.where(masked >= high, 1 - self.flexibility, factor)
+        return np.where(np.isnan(masked), 1.0, factor)
+
+    @staticmethod
+    def _cost(base: np.ndarray, actual: np.ndarray, factor: np.ndarray,
+              shift: np.ndarray, settle: np.ndarray) -> np.ndarray:
+        """Settled cost of base * factor, rescaled to keep the energy inside `shift`.
+
+        base (P, R, L); factor/shift/settle (..., R, L). The rescale factor is a
+        per-row scalar, so everything reduces to contractions over the lead axis
+        and the (..., P, R, L) consumption array is never materialized.
+        """
+        contract = lambda weights: np.einsum('prl,...rl->...pr', base, weights)
+        shifted_cost = contract(np.where(shift, factor * actual, 0.0))
+        shifted_energy = contract(np.where(shift, factor, 0.0))
+        energy = contract(shift.astype('float64'))
+        unshifted_cost = contract(np.where(settle & ~shift, actual, 0.0))
+        scale = np.divide(energy, shifted_energy, out=np.ones_like(energy), where=shifted_energy > 0)
+        return scale * shifted_cost + unshifted_cost
+
+    def simulate(self, cube: PredictionCube) -> Dict[str, np.ndarray]:
+        """Cost arrays: flat/day_ahead/oracle (horizons, profiles, runs), model (horizons, models, profiles, runs)"""
+        leads = cube.actual.shape[1]
+        lead = np.arange(leads)
+        valid = ~np.isnan(cube.actual)                                             # (R, L)
+        actual = np.where(valid, cube.actual, 0.0)
+        base = self.profiles[:, cube.hour_of_day]                                  # (P, R, L)
+
+        horizons = np.array([min(h, leads) for h in self.horizons])
+        window = (lead[None, :] < horizons[:, None])[:, None, :] & valid[None]      # (K, R, L)
+        no_shift = np.zeros_like(window)
+
+        flat = self._cost(base, actual, np.ones(window.shape), no_shift, window)
+        oracle = self._cost(base, actual, self._shift_factor(cube.actual[None], window), window, window)
+
+        # Day-ahead: shift within the published hours only, flat after that
+        published = window & (lead < self.day_ahead_hours)[None, None, :]
+        day_ahead = self._cost(base, actual, self._shift_factor(cube.actual[None], published), published, window)
+
+        # Models: (K, M, R, L) factors, hours without a forecast are not shifted
+        shift = window[:, None] & ~np.isnan(cube.forecast)[None]
+        settle = np.broadcast_to(window[:, None], shift.shape)
+        model = self._cost(base, actual, self._shift_factor(cube.forecast[None], shift), shift, settle)
+
+        return {'flat': flat, 'day_ahead': day_ahead, 'oracle': oracle, 'model': model}
+
+    def evaluate(self, cube: PredictionCube) -> pd.DataFrame:
+        """Totals over all runs, one row per (model, horizon, profile)"""
+        costs = self.simulate(cube)
+        K, M, P = len(self.horizons), len(cube.models), len(self.profile_names)
+        shape = (K, M, P)
+
+        def total(values, with_models=False):
+            summed = np.nansum(values, axis=-1)
+            return (summed if with_models else np.broadcast_to(summed[:, None, :], shape)).ravel()
+
+        k, m, p = np.meshgrid(np.arange(K), np.arange(M), np.arange(P), indexing='ij')
+        result = pd.DataFrame({
+            'model_name': np.array(cube.models)[m.ravel()],
+            'horizon_hours': np.array(self.horizons)[k.ravel()],
+            'profile': np.array(self.profile_names)[p.ravel()],
+            'runs': len(cube.runs),
+            'flat_cost': total(costs['flat']),
+            'day_ahead_cost': total(costs['day_ahead']),
+            'model_cost': total(costs['model'], with_models=True),
+            'oracle_cost': total(costs['oracle']),
+        })
+        result['savings_vs_flat'] = result['flat_cost'] - result['model_cost']
+        result['savings_vs_day_ahead'] = result['day_ahead_cost'] - result['model_cost']
+        potential = result['flat_cost'] - result['oracle_cost']
+        result['capture_ratio'] = result['savings_vs_flat'] / potential.where(potential != 0)
+
+        self.logger.info(
+            f"💶 Simulated savings for {M} models x {K} horizons x {P} profiles over {len(cube.runs)} runs"
+        )
+        return result
+
+    def rank_models(self, results: pd.DataFrame, metric: str = 'savings_vs_flat') -> pd.DataFrame:
+        """Models ordered by euros saved (summed over profiles), per planning horizon"""
+        ranking = results.groupby(['horizon_hours', 'model_name'])[[metric, 'capture_ratio']].agg(
+            {metric: 'sum', 'capture_ratio': 'mean'}
+        )
+        ranking['rank'] = ranking.groupby(level='horizon_hours')[metric].rank(ascending=False, method='min')
+        return ranking.sort_values(['horizon_hours', 'rank'])
+
+    @classmethod
+    def from_logs(cls,
+                  logs_db_path: Path,
+                  experiment_id: Optional[int] = None,
+                  model_names: Optional[List[str]] = None,
+                  rolling_only: bool = True,
+                  **kwargs) -> pd.DataFrame:
+        """Evaluate the archived runs in logs.db.
+
+        rolling_only keeps the rolling-window runs, like Experiment.run_ensembles: the
+        single run can share its forecast_start with a window and overwrite it.
+        """
+        from core.logging_manager import ExperimentLogger
+
+        archive = ExperimentLogger(logs_db_path).get_prediction_archive(experiment_id, model_names)
+        if rolling_only:
+            archive = archive[archive['window_id'].notna()]
+        simulator = cls(**kwargs)
+        return simulator.evaluate(PredictionCube.from_archive(archive, max_lead=max(simulator.horizons)))
@@ -112,6 +112,7 @@ class RollingWindowValidator:
                     window_id=window_id,
                     execution_time=model_result.execution_time
                 )
+                self.logger_manager.log_run_profile(run_id, model_result.profile)
                 
                 if model_result.success:
                     # Calculate metrics
@@ -120,6 +121,12 @@ class RollingWindowValidator:
                         model_result.predictions
                     )
                     
+                    if model_result.quantiles is not None:
+                        metrics.update(self.metrics_calculator.calculate_quantile_metrics(
+                            data_split.y_test,
+                            model_result.quantiles
+                        ))
+                    
                     detailed_rmse = self.metrics_calculator.calculate_detailed_rmse(
                         data_split.y_test,
                         model_result.predictions
@@ -142,6 +149,14 @@ class RollingWindowValidator:
                         detailed_metrics={'rmse_detailed': detailed_rmse}
                     )
                     
+                    # Keep the hourly predictions for cost-based evaluation (evaluation/savings.py)
+                    self.logger_manager.log_predictions(
+                        model_run_id=run_id,
+                        forecast_start=data_split.forecast_start.isoformat(),
+                        y_true=data_split.y_test,
+                        y_pred=model_result.predictions
+                    )
+                    
                     # Log model details
                     self.logger_manager.log_model_details(
                         model_run_id=run_id,
@@ -239,8 +254,12 @@ class RollingWindowValidator:
         
         return df
     
-    def analyze_performance_trends(self, results_df: pd.DataFrame) -> Dict:
-        """Analyze performance trends across rolling windows"""
+    def analyze_performance_trends(self, results_df: pd.DataFrame, experiment_id: Optional[int] = None) -> Dict:
+        """Analyze performance trends across rolling windows.
+        
+        With an experiment_id the per-window RMSE is read from the logs.db summary
+        (metric_window_summary) of that experiment instead of the results frame.
+        """
         if results_df.empty:
             return {}
         
@@ -253,10 +272,8 @@ class RollingWindowValidator:
         }
         
         # Success rate by model
-        for model in analysis['models_tested']:
-            model_results = results_df[results_df['model_name'] == model]
-            success_count = (model_results['status'] == 'completed').sum()
-            total_count = len(model_results)
+        status = (results_df['status'] == 'completed').groupby(results_df['model_name'], sort=False).agg(['sum', 'size'])
+        for model, (success_count, total_count) in status.iterrows():
             analysis['success_rate'][model] = {
                 'success_count': success_count,
                 'total_count': total_count,
@@ -264,30 +281,34 @@ class RollingWindowValidator:
             }
         
         # Performance trends
-        for model in analysis['models_tested']:
-            model_results = results_df[
-                (results_df['model_name'] == model) & 
-                (results_df['status'] == 'completed')
-            ].sort_values('window_id')
-            
-            if len(model_results) > 1:
-                rmse_values = model_results['rmse'].dropna()
-                if len(rmse_values) >= 2:
-                    first_rmse = rmse_values.iloc[0]
-                    last_rmse = rmse_values.iloc[-1]
-                    
-                    degradation_pct = ((last_rmse - first_rmse) / first_rmse) * 100 if first_rmse != 0 else 0
-                    
-                    analysis['performance_trends'][model] = {
-                        'first_window_rmse': first_rmse,
-                        'last_window_rmse': last_rmse,
-                        'degradation_percent': degradation_pct,
-                        'trend': 'SEVERE' if degradation_pct > 100 else 
-                                'SIGNIFICANT' if degradation_pct > 50 else
-                                'MODERATE' if degradation_pct > 20 else
-                                'STABLE' if abs(degradation_pct) <= 20 else 'IMPROVING',
-                        'rmse_values': rmse_values.tolist(),
-                        'windows_completed': len(rmse_values)
-                    }
+        for model, rmse_values in self._window_rmse(results_df, analysis['models_tested'], experiment_id).items():
+            if len(rmse_values) >= 2:
+                first_rmse = rmse_values.iloc[0]
+                last_rmse = rmse_values.iloc[-1]
+                
+                degradation_pct = ((last_rmse - first_rmse) / first_rmse) * 100 if first_rmse != 0 else 0
+                
+                analysis['performance_trends'][model] = {
+                    'first_window_rmse': first_rmse,
+                    'last_window_rmse': last_rmse,
+                    'degradation_percent': degradation_pct,
+                    'trend': 'SEVERE' if degradation_pct > 100 else 
+                            'SIGNIFICANT' if degradation_pct > 50 else
+                            'MODERATE' if degradation_pct > 20 else
+                            'STABLE' if abs(degradation_pct) <= 20 else 'IMPROVING',
+                    'rmse_values': rmse_values.tolist(),
+                    'windows_completed': len(rmse_values)
+                }
+        
+        return analysis
+    
+    def _window_rmse(self, results_df: pd.DataFrame, models: List[str], experiment_id: Optional[int]) -> Dict[str, pd.Series]:
+        """RMSE per completed rolling window (ordered by window_id) for each model"""
+        if experiment_id is not None:
+            windows = self.logger_manager.get_window_metrics(experiment_id, model_names=models, metric_names=['rmse'])
+            windows = windows[windows['window_id'] > 0].rename(columns={'metric_value': 'rmse'})
+        else:
+            windows = results_df[results_df['status'] == 'completed']
         
-        return analysis
\ No newline at end of file
+        windows = windows.dropna(subset=['rmse']).sort_values('window_id', kind='stable')
+        return {model: group['rmse'] for model, group in windows.groupby('model_name', sort=False)}
\ No newline at end of file
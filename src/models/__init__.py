@@ -1,5 +1,20 @@
+import importlib
+
 from .factory import ModelFactory
-from .naive import NaiveModel
-from .sarimax import SarimaxModel
 
-__all__ = ['ModelFactory', 'NaiveModel', 'SarimaxModel']
\ No newline at end of file
+# Model classes are imported on first access: `import models` must not pull in
+# statsmodels / scikit-learn for runs that only use the naive model
+_LAZY_MODELS = {
+    'NaiveModel': '.naive',
+    'SarimaxModel': '.sarimax',
+    'GradientBoostingModel': '.gradient_boosting',
+    'RidgeDirectModel': '.ridge_direct',
+    'SarimaxServer': '.sarimax_serving',
+}
+
+def __getattr__(name):
+    if name in _LAZY_MODELS:
+        return getattr(importlib.import_module(_LAZY_MODELS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+__all__ = ['ModelFactory', 'NaiveModel', 'SarimaxModel', 'GradientBoostingModel', 'RidgeDirectModel', 'SarimaxServer']
@@ -1,13 +1,16 @@
 import logging
-from typing import Dict, List, Optional, Type
+import importlib
+from typing import Dict, List, Optional, Type, Union
 from abc import ABC, abstractmethod
 import pandas as pd
 import numpy as np
 from dataclasses import dataclass
+from contextlib import nullcontext
 import time
 
 from config.experiment_config import ExperimentConfig, ModelConfig
 from core.data_manager import DataSplit
+from utils.profiling import ProfileSettings, RunProfiler
 
 @dataclass
 class ModelResult:
@@ -22,6 +25,8 @@ class ModelResult:
     convergence_info: Optional[Dict] = None
     model_summary: Optional[str] = None
     error_message: Optional[str] = None
+    quantiles: Optional[pd.DataFrame] = None  # p10/p50/p90... columns, see evaluation/probabilistic.py
+    profile: Optional[Dict] = None  # per-phase seconds / peak memory, see utils/profiling.py
     
     @property
     def success(self) -> bool:
@@ -34,7 +39,13 @@ class BaseModel(ABC):
         self.config = config
         self.logger = logging.getLogger(f"{self.__class__.__name__}")
         self.is_fitted = False
+        self.profile_settings = ProfileSettings()
+        self._profiler = None
         
+    def phase(self, name: str):
+        """Time a sub-phase (e.g. 'scale', 'optimize') of the current run; no-op outside fit_predict"""
+        return self._profiler.phase(name) if self._profiler is not None else nullcontext()
+    
     @abstractmethod
     def fit(self, data_split: DataSplit) -> 'BaseModel':
         """Fit the model"""
@@ -46,22 +57,29 @@ class BaseModel(ABC):
         pass
     
     def fit_predict(self, data_split: DataSplit) -> ModelResult:
-        """Fit model and make predictions with timing and error handling"""
+        """Fit model and make predictions with timing, profiling and error handling"""
         start_time = time.time()
+        self._profiler = RunProfiler(self.profile_settings, run_name=self.config.name)
         
         try:
-            # Fit model
-            self.fit(data_split)
-            
-            # Make predictions
-            predictions = self.predict(data_split)
-            
-            execution_time = time.time() - start_time
+            with self._profiler.run():
+                # Fit model
+                with self.phase('fit'):
+                    self.fit(data_split)
+                
+                # Make predictions
+                with self.phase('predict'):
+                    predictions = self.predict(data_split)
+                
+                # Get model information
+                with self.phase('diagnostics'):
+                    diagnostics = self.get_diagnostics() if hasattr(self, 'get_diagnostics') else None
+                    convergence_info = self.get_convergence_info() if hasattr(self, 'get_convergence_info') else None
+                    model_summary = self.get_summary() if hasattr(self, 'get_summary') else None
             
-            # Get model information
-            diagnostics = self.get_diagnostics() if hasattr(self, 'get_diagnostics') else None
-            convergence_info = self.get_convergence_info() if hasattr(self, 'get_convergence_info') else None
-            model_summary = self.get_summary() if hasattr(self, 'get_summary') else None
+            # As before, execution_time covers fit + predict only
+            execution_time = time.time() - start_time - self._profiler.profile.phases.get('diagnostics', 0.0)
+            self._profiler.profile.iterations = (convergence_info or {}).get('iterations')
             
             return ModelResult(
                 predictions=predictions,
@@ -72,7 +90,8 @@ class BaseModel(ABC):
                 hyperparameters=self.config.hyperparameters,
                 diagnostics=diagnostics,
                 convergence_info=convergence_info,
-                model_summary=model_summary
+                model_summary=model_summary,
+                profile=self._profiler.profile.to_dict()
             )
             
         except Exception as e:
@@ -86,32 +105,52 @@ class BaseModel(ABC):
                 execution_time=execution_time,
                 parameters={},
                 hyperparameters=self.config.hyperparameters,
-                error_message=str(e)
+                error_message=str(e),
+                profile=self._profiler.profile.to_dict()
             )
+        
+        finally:
+            self._profiler = None
+
+# Entry points ('module:Class', relative to this package) are only imported when a
+# model is created, so statsmodels / scikit-learn load only for models that run
+DEFAULT_MODELS = {
+    'naive': '.naive:NaiveModel',
+    'sarimax_no_exog': '.sarimax:SarimaxModel',
+    'sarimax_with_exog': '.sarimax:SarimaxModel',
+    'gradient_boosting': '.gradient_boosting:GradientBoostingModel',
+    'ridge_direct': '.ridge_direct:RidgeDirectModel',
+}
 
 class ModelFactory:
     """Factory for creating and managing models"""
     
-    def __init__(self, model_configs: Dict[str, ModelConfig]):
+    def __init__(self, model_configs: Dict[str, ModelConfig], profile_settings: Optional[ProfileSettings] = None):
         self.model_configs = model_configs
+        self.profile_settings = profile_settings or ProfileSettings()
         self.logger = logging.getLogger(self.__class__.__name__)
         self._model_registry = {}
         self._register_default_models()
     
     def _register_default_models(self):
-        """Register default model types"""
-        from .naive import NaiveModel
-        from .sarimax import SarimaxModel
-        
-        self._model_registry['naive'] = NaiveModel
-        self._model_registry['sarimax_no_exog'] = SarimaxModel
-        self._model_registry['sarimax_with_exog'] = SarimaxModel
+        """Register default model types (lazy entry points)"""
+        self._model_registry.update(DEFAULT_MODELS)
     
-    def register_model(self, model_name: str, model_class: Type[BaseModel]):
-        """Register a new model type"""
+    def register_model(self, model_name: str, model_class: Union[Type[BaseModel], str]):
+        """Register a new model type: a class or a lazy 'module:Class' entry point"""
         self._model_registry[model_name] = model_class
         self.logger.info(f"✅ Registered model type: {model_name}")
     
+    def _resolve_model_class(self, model_name: str) -> Type[BaseModel]:
+        """Import a lazy entry point on first use and cache the class"""
+        entry = self._model_registry[model_name]
+        if isinstance(entry, str):
+            module_name, class_name = entry.split(':')
+            module = importlib.import_module(module_name, __package__ if module_name.startswith('.') else None)
+            entry = getattr(module, class_name)
+            self._model_registry[model_name] = entry
+        return entry
+    
     def create_model(self, model_name: str) -> BaseModel:
         """Create a model instance"""
         if model_name not in self.model_configs:
@@ -124,8 +163,10 @@ class ModelFactory:
         if not config.enabled:
             raise ValueError(f"Model '{model_name}' is disabled")
         
-        model_class = self._model_registry[model_name]
-        return model_class(config)
+        model_class = self._resolve_model_class(model_name)
+        model = model_class(config)
+        model.profile_settings = self.profile_settings
+        return model
     
     def create_all_models(self) -> Dict[str, BaseModel]:
         """Create all enabled models"""
@@ -0,0 +1,254 @@
+import pandas as pd
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+
+try:
+    from sklearn.ensemble import HistGradientBoostingRegressor
+    SKLEARN_AVAILABLE = True
+except ImportError:
+    SKLEARN_AVAILABLE = False
+
+from .factory import BaseModel
+from config.experiment_config import GradientBoostingConfig
+from core.data_manager import DataSplit
+from utils.row_signatures import origin_signatures
+
+NS_PER_HOUR = 3_600_000_000_000
+BASE_FEATURES = ['lead', 'target_hour', 'target_dow', 'y_origin', 'y_same_hour_day',
+                 'y_same_hour_week', 'y_mean_24h']
+
+# Training rows per forecast origin are identical across rolling windows (they only
+# depend on y and X in the hours around the origin), so they are kept between model
+# instances: fingerprint -> (origin keys, input signature per origin, design, target)
+_DESIGN_CACHE: Dict[Tuple, Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]] = {}
+
+# Rows of an origin read y/X from origin - LOOKBACK_HOURS up to origin + horizon
+LOOKBACK_HOURS = 167
+
+
+def _hour_keys(index) -> np.ndarray:
+    return pd.DatetimeIndex(index).asi8 // NS_PER_HOUR
+
+
+def build_direct_design(y: np.ndarray, X: Optional[np.ndarray], base_key: int,
+                        origins: np.ndarray, horizon: int) -> Tuple[np.ndarray, np.ndarray]:
+    """(origin x lead) design matrix without Python loops.
+
+    y/X live on a contiguous hourly grid whose first row is hour `base_key`;
+    origins are grid positions. Row i*horizon + (h-1) describes origin i at lead h.
+    Target values past the end of y are NaN.
+    """
+    n = len(y)
+    leads = np.arange(1, horizon + 1)
+    target = origins[:, None] + leads[None, :]
+
+    def gather(values, positions):
+        inside = (positions >= 0) & (positions < len(values))
+        out = np.full(positions.shape + values.shape[1:], np.nan)
+        out[inside] = values[positions[inside]]
+        return out
+
+    # Trailing 24h mean at the origin from NaN-aware cumulative sums
+    valid = ~np.isnan(y)
+    csum = np.concatenate(([0.0], np.cumsum(np.where(valid, y, 0.0))))
+    ccount = np.concatenate(([0], np.cumsum(valid)))
+    lo = np.clip(origins - 23, 0, n)
+    hi = np.clip(origins + 1, 0, n)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean_24h = (csum[hi] - csum[lo]) / (ccount[hi] - ccount[lo])
+
+    target_keys = base_key + target
+    columns = [
+        np.broadcast_to(leads, target.shape),
+        target_keys % 24,
+        (target_keys // 24 + 3) % 7,  # 1970-01-01 was a Thursday
+        np.broadcast_to(gather(y, origins)[:, None], target.shape),
+        gather(y, target - 24 * np.ceil(leads / 24).astype(int)[None, :]),
+        gather(y, target - 168 * np.ceil(leads / 168).astype(int)[None, :]),
+        np.broadcast_to(mean_24h[:, None], target.shape),
+    ]
+
+    width = len(columns) + (X.shape[1] if X is not None else 0)
+    design = np.empty((len(origins), horizon, width), dtype=np.float32)
+    for j, column in enumerate(columns):
+        design[:, :, j] = column
+    if X is not None:
+        design[:, :, len(columns):] = gather(X, target)
+    return design.reshape(-1, width), gather(y, target).reshape(-1)
+
+
+class GradientBoostingModel(BaseModel):
+    """Direct multi-horizon gradient boosting: one model for all lead hours"""
+
+    def __init__(self, config: GradientBoostingConfig):
+        super().__init__(config)
+        if not SKLEARN_AVAILABLE:
+            raise ImportError("scikit-learn is required for the gradient boosting model")
+
+        self.use_exogenous = config.use_exogenous
+        self.origin_stride = config.origin_stride
+        self.model = None
+        self.feature_names: List[str] = []
+        self.fitted_parameters = {}
+        self.design_stats = {}
+
+    def _grid(self, data_split: DataSplit, include_test: bool):
+        """y and X on one contiguous hourly grid (test targets masked out)"""
+        y_train = data_split.y_train
+        end = data_split.y_test.index.max() if include_test else y_train.index.max()
+        grid = pd.date_range(y_train.index.min(), end, freq="h")
+        y = y_train.reindex(grid).to_numpy(dtype="float64")
+
+        X = None
+        if self.use_exogenous and data_split.X_train is not None:
+            X_all = data_split.X_train
+            if include_test and data_split.X_test is not None:
+                X_all = pd.concat([X_all, data_split.X_test])
+            X_all = X_all[~X_all.index.duplicated(keep="first")]
+            X = X_all.reindex(grid).apply(pd.to_numeric, errors="coerce").to_numpy(dtype="float64")
+        return grid, y, X
+
+    def _fingerprint(self, data_split: DataSplit, horizon: int) -> Tuple:
+        columns = tuple(data_split.X_train.columns) if self.use_exogenous and data_split.X_train is not None else ()
+        return (columns, horizon, self.origin_stride)
+
+    def _training_design(self, data_split: DataSplit, horizon: int) -> Tuple[np.ndarray, np.ndarray]:
+        grid, y, X = self._grid(data_split, include_test=False)
+        keys = _hour_keys(grid)
+        # Origins on an absolute stride so windows shifted by whole days share them
+        last = len(grid) - 1
+        origins = np.arange(last % self.origin_stride, last, self.origin_stride)
+        origins = origins[origins >= 23]
+        origin_keys = keys[origins]
+
+        fingerprint = self._fingerprint(data_split, horizon)
+        signatures = origin_signatures(keys, y, X, origins, LOOKBACK_HOURS, horizon)
+        cached_keys, cached_signatures, cached_design, cached_target = _DESIGN_CACHE.get(
+            fingerprint, (np.empty(0, dtype="int64"), np.empty(0, dtype=np.uint64), None, None)
+        )
+        # Reuse only origins whose target rows lie fully inside this window's training data
+        # and whose input rows (y and exog) are unchanged
+        position = np.clip(np.searchsorted(cached_keys, origin_keys), 0, max(len(cached_keys) - 1, 0))
+        reusable = (len(cached_keys) > 0) & (origins + horizon <= last)
+        if len(cached_keys):
+            reusable &= (cached_keys[position] == origin_keys) & (cached_signatures[position] == signatures)
+
+        new_design, new_target = build_direct_design(y, X, int(keys[0]), origins[~reusable], horizon)
+        width = new_design.shape[1]
+        design = np.empty((len(origins) * horizon, width), dtype=np.float32)
+        target = np.empty(len(origins) * horizon)
+        rows = np.arange(len(origins) * horizon).reshape(len(origins), horizon)
+        design[rows[~reusable].ravel()] = new_design
+        target[rows[~reusable].ravel()] = new_target
+        if reusable.any():
+            cached_rows = position[reusable]
+            source_rows = (cached_rows[:, None] * horizon + np.arange(horizon)[None, :]).ravel()
+            design[rows[reusable].ravel()] = cached_design[source_rows]
+            target[rows[reusable].ravel()] = cached_target[source_rows]
+
+        # Only origins whose targets are complete are worth keeping for the next window
+        complete = origins + horizon <= last
+        keep_rows = rows[complete].ravel()
+        _DESIGN_CACHE.clear()
+        _DESIGN_CACHE[fingerprint] = (origin_keys[complete], signatures[complete],
+                                      design[keep_rows], target[keep_rows])
+
+        self.design_stats = {
+            'origins': int(len(origins)),
+            'reused_origins': int(reusable.sum()),
+            'design_rows': int(len(design)),
+            'design_megabytes': round(design.nbytes / 1e6, 2)
+        }
+        mask = ~np.isnan(target)
+        return design[mask], target[mask]
+
+    def fit(self, data_split: DataSplit) -> 'GradientBoostingModel':
+        """Fit one histogram gradient boosting model over all (origin, lead) pairs"""
+        horizon = len(data_split.y_test)
+        with self.phase('design'):
+            design, target = self._training_design(data_split, horizon)
+        if len(target) == 0:
+            raise ValueError("Not enough training data for a direct multi-horizon design")
+
+        exog_columns = list(data_split.X_train.columns) if self.use_exogenous and data_split.X_train is not None else []
+        self.feature_names = BASE_FEATURES + exog_columns
+
+        # HistGradientBoosting bins the features once and uses all cores (OpenMP)
+        self.model = HistGradientBoostingRegressor(
+            max_iter=self.config.max_iter,
+            learning_rate=self.config.learning_rate,
+            max_leaf_nodes=self.config.max_leaf_nodes,
+            min_samples_leaf=self.config.min_samples_leaf,
+            l2_regularization=self.config.l2_regularization,
+            random_state=self.config.random_state
+        )
+        with self.phase('optimize'):
+            self.model.fit(design, target)
+
+        self.fitted_parameters = {
+            'n_iter': int(self.model.n_iter_),
+            'train_rows': int(len(target)),
+            'n_features': len(self.feature_names),
+            **self.design_stats
+        }
+        self.is_fitted = True
+        self.logger.info(
+            f"✅ Gradient boosting fitted on {len(target)} (origin, lead) rows "
+            f"({self.design_stats['reused_origins']}/{self.design_stats['origins']} origins reused)"
+        )
+        return self
+
+    def predict(self, data_split: DataSplit) -> pd.Series:
+        """Forecast all lead hours from the last training hour in one call"""
+        if not self.is_fitted:
+            raise ValueError("Model must be fitted before making predictions")
+
+        grid, y, X = self._grid(data_split, include_test=True)
+        origin = grid.get_loc(data_split.y_train.index.max())
+        y[origin + 1:] = np.nan  # never let test actuals leak into the features
+        design, _ = build_direct_design(y, X, int(_hour_keys(grid)[0]), np.array([origin]), len(data_split.y_test))
+
+        predictions = pd.Series(
+            self.model.predict(design),
+            index=grid[origin + 1:origin + 1 + len(data_split.y_test)],
+            name='gradient_boosting_predictions'
+        ).reindex(data_split.y_test.index)
+
+        self.logger.info(f"✅ Generated {len(predictions)} gradient boosting predictions")
+        return predictions
+
+    def get_diagnostics(self) -> Optional[Dict]:
+        """Get model diagnostics"""
+        if not self.is_fitted:
+            return None
+
+        return {
+            'model_type': 'gradient_boosting_direct',
+            'n_iter': int(self.model.n_iter_),
+            'features': self.feature_names,
+            'use_exogenous': self.use_exogenous,
+            **self.design_stats
+        }
+
+    def get_convergence_info(self) -> Optional[Dict]:
+        """Get convergence information"""
+        if not self.is_fitted:
+            return None
+
+        return {
+            'iterations': int(self.model.n_iter_),
+            'max_iterations': self.config.max_iter,
+            'early_stopped': int(self.model.n_iter_) < self.config.max_iter
+        }
+
+    def get_summary(self) -> Optional[str]:
+        """Get model summary"""
+        if not self.is_fitted:
+            return None
+
+        return f"""Direct Multi-Horizon Gradient Boosting Summary:
+        - Boosting iterations: {self.model.n_iter_}
+        - Training rows (origin x lead): {self.fitted_parameters['train_rows']}
+        - Origin stride: {self.origin_stride} hours
+        - Features: {len(self.feature_names)} ({', '.join(self.feature_names[:10])}{', ...' if len(self.feature_names) > 10 else ''})
+        """
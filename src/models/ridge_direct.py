@@ -0,0 +1,232 @@
+import pandas as pd
+import numpy as np
+from typing import Dict, Optional, Tuple
+
+from .factory import BaseModel
+from config.experiment_config import RidgeDirectConfig
+from core.data_manager import DataSplit
+from utils.row_signatures import origin_signatures
+
+NS_PER_HOUR = 3_600_000_000_000
+
+# Sufficient statistics of the last fit, so the next rolling window only adds the
+# new origins and downdates the dropped ones. fingerprint -> (origin keys, input signature
+# per origin, GramState, first grid hour, y, E); the arrays rebuild the rows that are downdated.
+_GRAM_CACHE: Dict[Tuple, Tuple] = {}
+
+
+class GramState:
+    """Shared sufficient statistics for all lead hours.
+
+    Lead h regresses y[o+h] on [z(o), e(o+h)]: z are origin features (intercept and
+    price lags, identical for every lead), e the exogenous columns at the target hour.
+    Z'Z is shared by all leads; the cross and exogenous blocks are kept per lead.
+    """
+
+    def __init__(self, n_origin_features: int, n_exog: int, horizon: int):
+        p1, p2, H = n_origin_features, n_exog, horizon
+        self.n = 0
+        self.zz = np.zeros((p1, p1))
+        self.ze = np.zeros((H, p1, p2))
+        self.ee = np.zeros((H, p2, p2))
+        self.zy = np.zeros((p1, H))
+        self.ey = np.zeros((H, p2))
+
+    def update(self, Z: np.ndarray, y: np.ndarray, E: np.ndarray, origins: np.ndarray, sign: float = 1.0):
+        """Add (sign=+1) or downdate (sign=-1) a batch of origins: a sum of rank-one updates.
+
+        Z: (k, p1) origin features; y (n,) and E (n, p2) on the hourly grid, origins
+        are grid positions. Targets and exogenous rows are gathered one lead at a
+        time, so at most a (k, p2) slice is materialised instead of (k, H, p2).
+        """
+        self.n += sign * len(Z)
+        self.zz += sign * (Z.T @ Z)
+        for h in range(self.zy.shape[1]):
+            target = origins + h + 1
+            E_h, y_h = E[target], y[target]
+            self.ze[h] += sign * (Z.T @ E_h)
+            self.ee[h] += sign * (E_h.T @ E_h)
+            self.zy[:, h] += sign * (Z.T @ y_h)
+            self.ey[h] += sign * (E_h.T @ y_h)
+
+    def solve(self, alpha: float) -> np.ndarray:
+        """Ridge coefficients for every lead at once, shape (H, p1 + p2).
+
+        The penalty is applied as if the features were standardized (intercept
+        unpenalized); means and variances come from the Gram matrices themselves.
+        """
+        H, p1, p2 = self.ze.shape
+        G = np.empty((H, p1 + p2, p1 + p2))
+        G[:, :p1, :p1] = self.zz
+        G[:, :p1, p1:] = self.ze
+        G[:, p1:, :p1] = np.transpose(self.ze, (0, 2, 1))
+        G[:, p1:, p1:] = self.ee
+        b = np.concatenate([self.zy.T, self.ey], axis=1)
+
+        n = max(self.n, 1)
+        diag = np.diagonal(G, axis1=1, axis2=2)
+        mean = G[:, 0, :] / n  # column 0 is the intercept
+        variance = np.maximum(diag / n - mean ** 2, 0.0)
+        penalty = alpha * n * variance
+        penalty[:, 0] = 0.0
+
+        # Jacobi scaling keeps the batched solve well conditioned (prices vs. MW)
+        scale = 1.0 / np.sqrt(np.where(diag > 0, diag, 1.0))
+        A = G * scale[:, :, None] * scale[:, None, :]
+        idx = np.arange(p1 + p2)
+        A[:, idx, idx] += penalty * scale ** 2 + 1e-10
+        u = np.linalg.solve(A, (b * scale)[:, :, None])[:, :, 0]
+        return u * scale
+
+
+class RidgeDirectModel(BaseModel):
+    """Direct multi-horizon ridge regression: one linear model per lead hour"""
+
+    def __init__(self, config: RidgeDirectConfig):
+        super().__init__(config)
+        self.alpha = config.alpha
+        self.price_lags = np.array(sorted(config.price_lags), dtype=int)
+        self.use_exogenous = config.use_exogenous
+        self.coefficients = None
+        self.fitted_parameters = {}
+        self.update_stats = {}
+
+    def _arrays(self, data_split: DataSplit):
+        y_train = data_split.y_train
+        grid = pd.date_range(y_train.index.min(), y_train.index.max(), freq="h")
+        y = y_train.reindex(grid).to_numpy(dtype="float64")
+        E = np.empty((len(grid), 0))
+        if self.use_exogenous and data_split.X_train is not None:
+            E = data_split.X_train.reindex(grid).apply(pd.to_numeric, errors="coerce").to_numpy(dtype="float64")
+        return grid, y, E
+
+    @staticmethod
+    def _horizon(data_split: DataSplit) -> int:
+        """Lead hours up to the last test hour (a test set with a missing hour keeps its span)"""
+        last_train, last_test = data_split.y_train.index.max(), data_split.y_test.index.max()
+        return max(len(data_split.y_test), int((last_test - last_train) // pd.Timedelta(hours=1)))
+
+    def _origin_features(self, y: np.ndarray, origins: np.ndarray) -> np.ndarray:
+        Z = np.empty((len(origins), 1 + len(self.price_lags)))
+        Z[:, 0] = 1.0
+        Z[:, 1:] = y[origins[:, None] - self.price_lags[None, :]]
+        return Z
+
+    def _valid_origins(self, y: np.ndarray, E: np.ndarray, horizon: int) -> np.ndarray:
+        """Origins whose lags, all targets and all exogenous rows are present"""
+        bad = np.isnan(y) | np.isnan(E).any(axis=1)
+        cbad = np.concatenate(([0], np.cumsum(bad)))
+        origins = np.arange(self.price_lags.max(), len(y) - horizon)
+        lags_ok = ~np.isnan(y[origins[:, None] - self.price_lags[None, :]]).any(axis=1)
+        future_ok = (cbad[origins + horizon + 1] - cbad[origins + 1]) == 0
+        return origins[lags_ok & future_ok]
+
+    def _update(self, state: GramState, y, E, origins, sign: float = 1.0):
+        state.update(self._origin_features(y, origins), y, E, origins, sign)
+
+    def fit(self, data_split: DataSplit) -> 'RidgeDirectModel':
+        """Solve all lead-hour systems from shared Gram matrices"""
+        horizon = self._horizon(data_split)
+        grid, y, E = self._arrays(data_split)
+        origins = self._valid_origins(y, E, horizon)
+        if len(origins) <= len(self.price_lags) + E.shape[1]:
+            raise ValueError(f"Only {len(origins)} complete forecast origins, too few for ridge_direct")
+
+        grid_keys = grid.asi8 // NS_PER_HOUR
+        keys = grid_keys[origins]
+        # Rows of an origin read y from origin - max lag and y/E up to origin + horizon
+        signatures = origin_signatures(grid_keys, y, E, origins, int(self.price_lags.max()), horizon)
+        columns = tuple(data_split.X_train.columns) if E.shape[1] else ()
+        fingerprint = (columns, tuple(self.price_lags), horizon)
+
+        cached = _GRAM_CACHE.get(fingerprint)
+        state, added, removed = None, len(origins), 0
+        with self.phase('gram'):
+            if cached is not None:
+                cached_keys, cached_signatures, cached_state, cached_first, cached_y_grid, cached_E = cached
+                keep = np.isin(cached_keys, keys)
+                # Overlapping origins must have read the same y/exog rows, otherwise start over
+                same = np.array_equal(cached_signatures[keep], signatures[np.isin(keys, cached_keys)])
+                to_add = ~np.isin(keys, cached_keys)
+                if same and keep.sum() > len(keys) // 2:
+                    state = cached_state
+                    if (~keep).any():
+                        # Dropped origins are downdated with the rows they were added with
+                        stale = (cached_keys[~keep] - cached_first).astype(int)
+                        self._update(state, cached_y_grid, cached_E, stale, sign=-1.0)
+                    if to_add.any():
+                        self._update(state, y, E, origins[to_add])
+                    added, removed = int(to_add.sum()), int((~keep).sum())
+
+            if state is None:
+                state = GramState(1 + len(self.price_lags), E.shape[1], horizon)
+                self._update(state, y, E, origins)
+
+        _GRAM_CACHE.clear()
+        _GRAM_CACHE[fingerprint] = (keys, signatures, state, grid_keys[0], y, E)
+
+        with self.phase('solve'):
+            self.coefficients = state.solve(self.alpha)
+        self.y_train = data_split.y_train
+        self.update_stats = {'origins': int(len(origins)), 'added_origins': added, 'removed_origins': removed}
+        self.fitted_parameters = {
+            'alpha': self.alpha,
+            'n_lags': int(len(self.price_lags)),
+            'n_exog': int(E.shape[1]),
+            **self.update_stats
+        }
+        self.is_fitted = True
+        self.logger.info(
+            f"✅ Ridge direct fitted for {horizon} leads on {len(origins)} origins "
+            f"(+{added}/-{removed} rank-one updates)"
+        )
+        return self
+
+    def predict(self, data_split: DataSplit) -> pd.Series:
+        """Apply the per-lead coefficients to the last training origin"""
+        if not self.is_fitted:
+            raise ValueError("Model must be fitted before making predictions")
+
+        # One coefficient row per fitted lead, on the hourly grid after the last training hour
+        horizon = len(self.coefficients)
+        grid, y, _ = self._arrays(data_split)
+        forecast_index = pd.date_range(grid[-1] + pd.Timedelta(hours=1), periods=horizon, freq="h")
+        z = self._origin_features(y, np.array([len(y) - 1]))[0]
+        p1 = len(z)
+
+        predictions = self.coefficients[:, :p1] @ z
+        if self.coefficients.shape[1] > p1:
+            E_test = data_split.X_test.reindex(forecast_index).apply(pd.to_numeric, errors="coerce").to_numpy(dtype="float64")
+            predictions = predictions + np.einsum("hj,hj->h", self.coefficients[:, p1:], E_test)
+
+        predictions = pd.Series(
+            predictions, index=forecast_index, name='ridge_direct_predictions'
+        ).reindex(data_split.y_test.index)
+        self.logger.info(f"✅ Generated {len(predictions)} ridge direct predictions")
+        return predictions
+
+    def get_diagnostics(self) -> Optional[Dict]:
+        """Get model diagnostics"""
+        if not self.is_fitted:
+            return None
+
+        return {
+            'model_type': 'ridge_direct',
+            'alpha': self.alpha,
+            'price_lags': self.price_lags.tolist(),
+            'use_exogenous': self.use_exogenous,
+            **self.update_stats
+        }
+
+    def get_summary(self) -> Optional[str]:
+        """Get model summary"""
+        if not self.is_fitted:
+            return None
+
+        return f"""Direct Ridge Regression Summary:
+        - Lead hours: {self.coefficients.shape[0]} (one linear model each)
+        - Coefficients per lead: {self.coefficients.shape[1]}
+        - Alpha: {self.alpha}
+        - Origins: {self.update_stats['origins']} (+{self.update_stats['added_origins']}/-{self.update_stats['removed_origins']} updated)
+        """
+
@@ -132,28 +132,31 @@ class SarimaxModel(BaseModel):
             X_train.index = pd.DatetimeIndex(X_train.index, freq='h')
             
             # Scale features
-            self.scaler = StandardScaler()
-            exog_train = pd.DataFrame(
-                self.scaler.fit_transform(X_train),
-                index=X_train.index,
-                columns=X_train.columns
-            )
+            with self.phase('scale'):
+                self.scaler = StandardScaler()
+                exog_train = pd.DataFrame(
+                    self.scaler.fit_transform(X_train),
+                    index=X_train.index,
+                    columns=X_train.columns
+                )
         
         # Create and fit SARIMAX model
         with warnings.catch_warnings():
             warnings.filterwarnings("ignore", category=ConvergenceWarning)
             
-            self.model = SARIMAX(
-                y_train,
-                exog=exog_train,
-                order=self.order,
-                seasonal_order=self.seasonal_order
-            )
+            with self.phase('build'):
+                self.model = SARIMAX(
+                    y_train,
+                    exog=exog_train,
+                    order=self.order,
+                    seasonal_order=self.seasonal_order
+                )
             
-            self.fitted_model = self.model.fit(
-                disp=False,
-                maxiter=self.max_iterations
-            )
+            with self.phase('optimize'):
+                self.fitted_model = self.model.fit(
+                    disp=False,
+                    maxiter=self.max_iterations
+                )
         
         # Store fitted parameters
         if hasattr(self.fitted_model, 'params'):
@@ -194,6 +197,11 @@ class SarimaxModel(BaseModel):
         self.logger.info(f"✅ Generated {len(predictions)} SARIMAX predictions")
         return predictions
     
+    def to_server(self, **kwargs) -> 'SarimaxServer':
+        """Serve mode: Kalman updates on new data instead of refitting (see sarimax_serving)"""
+        from .sarimax_serving import SarimaxServer
+        return SarimaxServer.from_model(self, **kwargs)
+    
     def get_diagnostics(self) -> Optional[Dict]:
         """Get model diagnostics"""
         if not self.is_fitted or self.fitted_model is None:
@@ -0,0 +1,174 @@
+import pickle
+import logging
+import warnings
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+try:
+    from statsmodels.tsa.statespace.sarimax import SARIMAX
+    from statsmodels.tools.sm_exceptions import ConvergenceWarning
+    STATSMODELS_AVAILABLE = True
+except ImportError:
+    STATSMODELS_AVAILABLE = False
+
+
+class SarimaxServer:
+    """Serve mode for a fitted SARIMAX model.
+
+    New observations only run the Kalman filter forward with the fitted (fixed)
+    parameters via `results.extend`, so a fresh forecast costs milliseconds instead
+    of a full re-estimation. Standardized one-step innovations are monitored; when
+    they drift away from N(0, 1) the server flags that a refit is due.
+    """
+
+    def __init__(self,
+                 results,
+                 scaler=None,
+                 exog_columns: Optional[List[str]] = None,
+                 drift_window: int = 168,
+                 rms_threshold: float = 1.5,
+                 mean_threshold: float = 3.0):
+        if not STATSMODELS_AVAILABLE:
+            raise ImportError("statsmodels is required for SARIMAX serving")
+        self.results = results
+        self.scaler = scaler
+        self.exog_columns = list(exog_columns) if exog_columns else []
+        self.drift_window = drift_window
+        self.rms_threshold = rms_threshold
+        self.mean_threshold = mean_threshold
+
+        self.last_timestamp = pd.Timestamp(results.model._index[-1])
+        self.innovations = pd.Series(dtype="float64")
+        self.needs_refit = False
+        self.drift_reason: Optional[str] = None
+        self.updates = 0
+        self.fitted_at = datetime.now(timezone.utc).isoformat()
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    @classmethod
+    def from_model(cls, model, **kwargs) -> 'SarimaxServer':
+        """Take over the state of a fitted SarimaxModel"""
+        if not model.is_fitted or model.fitted_model is None:
+            raise ValueError("Model must be fitted before it can be served")
+        exog_columns = list(model.scaler.feature_names_in_) if model.scaler is not None else None
+        return cls(model.fitted_model, scaler=model.scaler, exog_columns=exog_columns, **kwargs)
+
+    def _exog(self, X: Optional[pd.DataFrame], index: pd.DatetimeIndex) -> Optional[pd.DataFrame]:
+        if not self.exog_columns:
+            return None
+        if X is None:
+            raise ValueError(f"Exogenous data required for columns {self.exog_columns}")
+        X = X.reindex(index)[self.exog_columns]
+        if X.isna().any().any():
+            raise ValueError("Exogenous data has gaps for the requested hours")
+        values = self.scaler.transform(X) if self.scaler is not None else X.to_numpy()
+        return pd.DataFrame(values, index=index, columns=self.exog_columns)
+
+    def update(self, y_new: pd.Series, X_new: Optional[pd.DataFrame] = None) -> Dict:
+        """Filter new hourly observations with fixed parameters (no re-estimation)"""
+        y_new = y_new[y_new.index > self.last_timestamp].sort_index()
+        if y_new.empty:
+            return self.drift_status()
+
+        expected = self.last_timestamp + pd.Timedelta(hours=1)
+        if y_new.index[0] != expected:
+            raise ValueError(f"New observations must start at {expected}, got {y_new.index[0]}")
+        index = pd.date_range(expected, y_new.index[-1], freq="h")
+        y_new = y_new.reindex(index)  # gaps stay NaN: the filter skips missing hours
+
+        self.results = self.results.extend(y_new, exog=self._exog(X_new, index))
+        self.last_timestamp = index[-1]
+        self.updates += 1
+
+        innovations = pd.Series(
+            np.asarray(self.results.filter_results.standardized_forecasts_error)[0], index=index
+        ).dropna()
+        if not self.innovations.empty:
+            innovations = pd.concat([self.innovations, innovations])
+        self.innovations = innovations.iloc[-self.drift_window:]
+        status = self._check_drift()
+        self.logger.info(
+            f"🔄 Kalman update with {len(index)} new hours (up to {self.last_timestamp}), "
+            f"innovation RMS {status['rms']:.2f}"
+        )
+        return status
+
+    def _check_drift(self) -> Dict:
+        status = self.drift_status()
+        if status['observations'] < min(24, self.drift_window):
+            return status
+        reasons = []
+        if status['rms'] > self.rms_threshold:
+            reasons.append(f"innovation RMS {status['rms']:.2f} > {self.rms_threshold}")
+        if abs(status['mean_z']) > self.mean_threshold:
+            reasons.append(f"innovation bias z={status['mean_z']:.2f}")
+        if reasons and not self.needs_refit:
+            self.needs_refit = True
+            self.drift_reason = "; ".join(reasons)
+            self.logger.warning(f"⚠️ Drift detected, re-estimation scheduled: {self.drift_reason}")
+        return self.drift_status()
+
+    def drift_status(self) -> Dict:
+        """Innovation statistics over the drift window (standardized, ~N(0,1) when the model holds)"""
+        z = self.innovations.to_numpy()
+        n = len(z)
+        return {
+            'observations': n,
+            'rms': float(np.sqrt(np.mean(z ** 2))) if n else 0.0,
+            'mean_z': float(np.mean(z) * np.sqrt(n)) if n else 0.0,
+            'needs_refit': self.needs_refit,
+            'reason': self.drift_reason
+        }
+
+    def forecast(self, steps: int = 168, X_future: Optional[pd.DataFrame] = None) -> pd.Series:
+        """Forecast from the latest filtered state"""
+        index = pd.date_range(self.last_timestamp + pd.Timedelta(hours=1), periods=steps, freq="h")
+        predictions = self.results.forecast(steps=steps, exog=self._exog(X_future, index))
+        return pd.Series(np.asarray(predictions), index=index, name='sarimax_predictions')
+
+    def refit(self, y: pd.Series, X: Optional[pd.DataFrame] = None, maxiter: int = 100) -> 'SarimaxServer':
+        """Full re-estimation on a new history, warm-started from the current parameters"""
+        y = y.copy()
+        y.index = pd.DatetimeIndex(y.index, freq='h')
+        exog = self._exog(X, y.index)
+        model = SARIMAX(
+            y,
+            exog=exog,
+            order=self.results.model.order,
+            seasonal_order=self.results.model.seasonal_order
+        )
+        with warnings.catch_warnings():
+            warnings.filterwarnings("ignore", category=ConvergenceWarning)
+            results = model.fit(start_params=self.results.params, disp=False, maxiter=maxiter)
+
+        self.results = results
+        self.last_timestamp = pd.Timestamp(y.index[-1])
+        self.innovations = pd.Series(dtype="float64")
+        self.needs_refit = False
+        self.drift_reason = None
+        self.updates = 0
+        self.fitted_at = datetime.now(timezone.utc).isoformat()
+        self.logger.info(f"✅ SARIMAX re-estimated on {len(y)} hours up to {self.last_timestamp}")
+        return self
+
+    def save(self, path: Union[str, Path]):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        state = dict(self.__dict__)
+        state.pop('logger', None)
+        with open(path, "wb") as f:
+            pickle.dump(state, f)
+        self.logger.info(f"💾 SARIMAX serving state saved to {path}")
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> 'SarimaxServer':
+        with open(path, "rb") as f:
+            state = pickle.load(f)
+        server = cls.__new__(cls)
+        server.__dict__.update(state)
+        server.logger = logging.getLogger(cls.__name__)
+        return server
@@ -0,0 +1,9 @@
+from .charging_windows import (
+    ChargingWindows, cheapest_windows, compare_windows, price_matrix, simulate_daily_decisions,
+    summarize_windows, window_sums
+)
+from .device_scheduler import DeviceProfile, DeviceScheduler, ScheduleResult, load_device_profiles
+
+__all__ = ['ChargingWindows', 'cheapest_windows', 'compare_windows', 'price_matrix',
+           'simulate_daily_decisions', 'summarize_windows', 'window_sums',
+           'DeviceProfile', 'DeviceScheduler', 'ScheduleResult', 'load_device_profiles']
@@ -0,0 +1,185 @@
+import logging
+from dataclasses import dataclass
+from typing import Iterable, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+def price_matrix(prices: pd.Series, origins: Sequence, horizon: int, offset: int = 1) -> np.ndarray:
+    """(origins x horizon) matrix of an hourly series: row i holds hours origin_i + offset ... + horizon - 1.
+
+    Hours missing from the series are NaN. One reindex on a contiguous grid, no loop.
+    """
+    origins = pd.DatetimeIndex(origins)
+    if prices.index.tz is not None and origins.tz is None:
+        origins = origins.tz_localize(prices.index.tz)
+    start = min(origins.min(), prices.index.min())
+    end = max(origins.max() + pd.Timedelta(hours=offset + horizon), prices.index.max())
+    grid = pd.date_range(start, end, freq="h")
+    values = prices[~prices.index.duplicated(keep="last")].reindex(grid).to_numpy(dtype="float64")
+
+    positions = grid.get_indexer(origins)
+    if (positions < 0).any():
+        raise ValueError("Origins must lie on the hourly grid of the price series")
+    target = positions[:, None] + offset + np.arange(horizon)[None, :]
+    return values[target]
+
+
+def window_sums(prices: np.ndarray, duration: int) -> np.ndarray:
+    """Sum of every consecutive `duration`-hour block per row, via cumulative sums.
+
+    Returns (n_rows, horizon - duration + 1); blocks that contain a NaN hour are +inf
+    so they are never selected.
+    """
+    prices = np.atleast_2d(np.asarray(prices, dtype="float64"))
+    n, horizon = prices.shape
+    if duration < 1 or duration > horizon:
+        return np.full((n, 0), np.inf)
+
+    missing = np.isnan(prices)
+    zeros = np.zeros((n, 1))
+    csum = np.concatenate([zeros, np.cumsum(np.where(missing, 0.0, prices), axis=1)], axis=1)
+    cmissing = np.concatenate([zeros, np.cumsum(missing, axis=1)], axis=1)
+    sums = csum[:, duration:] - csum[:, :-duration]
+    gaps = cmissing[:, duration:] - cmissing[:, :-duration]
+    return np.where(gaps > 0, np.inf, sums)
+
+
+@dataclass
+class ChargingWindows:
+    """Cheapest consecutive window per origin and duration.
+
+    start and cost are (n_origins, n_durations); start is the hour offset within
+    the horizon (-1 and +inf cost when no complete window exists).
+    """
+    durations: np.ndarray
+    start: np.ndarray
+    cost: np.ndarray
+
+    def for_duration(self, duration: int) -> pd.DataFrame:
+        j = int(np.flatnonzero(self.durations == duration)[0])
+        return pd.DataFrame({'start': self.start[:, j], 'cost': self.cost[:, j]})
+
+
+def cheapest_windows(prices: np.ndarray,
+                     durations: Iterable[int] = (4,),
+                     earliest: int = 0,
+                     latest: Optional[int] = None) -> ChargingWindows:
+    """Optimal k-hour block for every origin and every k in one pass per k.
+
+    Blocks start at offsets [earliest, latest]; ties go to the earliest start,
+    like the day-by-day scan in the charging-window notebook.
+    """
+    prices = np.atleast_2d(np.asarray(prices, dtype="float64"))
+    durations = np.array(sorted(set(int(d) for d in durations)), dtype=int)
+    n = prices.shape[0]
+    start = np.full((n, len(durations)), -1, dtype=int)
+    cost = np.full((n, len(durations)), np.inf)
+
+    for j, duration in enumerate(durations):
+        sums = window_sums(prices, duration)
+        last = sums.shape[1] - 1 if latest is None else min(latest, sums.shape[1] - 1)
+        if last < earliest:
+            continue
+        candidates = sums[:, earliest:last + 1]
+        best = np.argmin(candidates, axis=1)
+        best_cost = candidates[np.arange(n), best]
+        found = np.isfinite(best_cost)
+        start[found, j] = best[found] + earliest
+        cost[:, j] = best_cost
+
+    return ChargingWindows(durations=durations, start=start, cost=cost)
+
+
+def _realized_cost(prices: np.ndarray, start: np.ndarray, duration: int) -> np.ndarray:
+    """Actual cost of charging at the given start offsets (NaN when no window was chosen)"""
+    sums = window_sums(prices, duration)
+    realized = np.full(len(start), np.nan)
+    valid = (start >= 0) & (start < sums.shape[1])
+    realized[valid] = sums[np.flatnonzero(valid), start[valid]]
+    realized[np.isinf(realized)] = np.nan
+    return realized
+
+
+def compare_windows(forecast: np.ndarray,
+                    actual: np.ndarray,
+                    durations: Iterable[int] = (4,),
+                    earliest: int = 0,
+                    latest: Optional[int] = None,
+                    origins: Optional[Sequence] = None) -> pd.DataFrame:
+    """Predicted versus actual optimal windows for all origins and durations.
+
+    One row per (origin, duration) with the overlap in hours, the actual cost of
+    the predicted window, the optimum in hindsight (regret = difference) and the
+    cost of charging immediately at `earliest` as a naive baseline.
+    """
+    forecast = np.atleast_2d(np.asarray(forecast, dtype="float64"))
+    actual = np.atleast_2d(np.asarray(actual, dtype="float64"))
+    if forecast.shape != actual.shape:
+        raise ValueError(f"Forecast {forecast.shape} and actual {actual.shape} matrices must have the same shape")
+
+    predicted = cheapest_windows(forecast, durations, earliest, latest)
+    optimal = cheapest_windows(actual, durations, earliest, latest)
+    n = forecast.shape[0]
+    index = pd.Index(origins, name='origin') if origins is not None else pd.RangeIndex(n, name='origin')
+
+    frames = []
+    for j, duration in enumerate(predicted.durations):
+        pred_start, actual_start = predicted.start[:, j], optimal.start[:, j]
+        both = (pred_start >= 0) & (actual_start >= 0)
+        matching = np.where(both, np.maximum(0, duration - np.abs(pred_start - actual_start)), 0)
+        realized = _realized_cost(actual, pred_start, duration)
+        best = np.where(np.isfinite(optimal.cost[:, j]), optimal.cost[:, j], np.nan)
+        baseline = _realized_cost(actual, np.full(n, earliest), duration)
+
+        frames.append(pd.DataFrame({
+            'duration': duration,
+            'pred_window_start': pred_start,
+            'actual_window_start': actual_start,
+            'matching_hours': matching,
+            'accuracy_percentage': 100.0 * matching / duration,
+            'pred_total_cost': np.where(np.isfinite(predicted.cost[:, j]), predicted.cost[:, j], np.nan),
+            'realized_cost': realized,
+            'actual_total_cost': best,
+            'regret': realized - best,
+            'baseline_cost': baseline,
+            'savings_vs_baseline': baseline - realized,
+        }, index=index))
+
+    result = pd.concat(frames).reset_index()
+    logger.info(
+        f"🔋 Compared charging windows for {n} origins x {len(predicted.durations)} durations "
+        f"(mean overlap {result['accuracy_percentage'].mean():.1f}%)"
+    )
+    return result
+
+
+def summarize_windows(comparison: pd.DataFrame) -> pd.DataFrame:
+    """Per-duration summary of compare_windows output"""
+    grouped = comparison.groupby('duration')
+    return pd.DataFrame({
+        'origins': grouped.size(),
+        'mean_accuracy': grouped['accuracy_percentage'].mean(),
+        'exact_matches': grouped['matching_hours'].apply(lambda m: int((m == m.name).sum())),
+        'mean_regret': grouped['regret'].mean(),
+        'total_regret': grouped['regret'].sum(),
+        'total_savings_vs_baseline': grouped['savings_vs_baseline'].sum(),
+    })
+
+
+def simulate_daily_decisions(forecasts: pd.DataFrame,
+                             actual_prices: pd.Series,
+                             durations: Iterable[int] = (4,),
+                             earliest: int = 0,
+                             latest: Optional[int] = None) -> pd.DataFrame:
+    """Charging decisions for many forecast origins at once.
+
+    forecasts: one row per origin (DatetimeIndex), columns are lead hours 1..H.
+    The matching actual matrix is gathered from the hourly price series.
+    """
+    actual = price_matrix(actual_prices, forecasts.index, forecasts.shape[1])
+    return compare_windows(forecasts.to_numpy(dtype="float64"), actual, durations,
+                           earliest=earliest, latest=latest, origins=forecasts.index)
@@ -7,7 +7,6 @@ from pathlib import Path
 from datetime import datetime, timedelta
 from typing import Optional, Tuple, Dict, List
 import numpy as np
-from pmdarima import auto_arima
 from utils.validation_utils import run_validation_experiment
 
 # Logging
@@ -305,6 +304,8 @@ def run_auto_arima_optimization(training_data: pd.DataFrame, exog_vars: List[str
     Run complete auto-ARIMA optimization with validation integration
     Returns the best configuration found
     """
+    # pmdarima is slow to import and only needed here, not for the other helpers
+    from pmdarima import auto_arima
     
     ensure_log_tables()
     
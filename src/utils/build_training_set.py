@@ -1,3 +1,4 @@
+import sys
 import pandas as pd
 import sqlite3
 import logging
@@ -17,6 +18,13 @@ ACTUALS_TABLE = "master_warp"
 PREDICTIONS_TABLE = "master_predictions"
 HORIZON = 168
 
+SRC_ROOT = Path(__file__).resolve().parents[1]
+if str(SRC_ROOT) not in sys.path:
+    sys.path.append(str(SRC_ROOT))
+
+from utils.calendar_features import CALENDAR_FEATURES, add_calendar_features
+from utils.vintage_store import VintageStore
+
 # YOUR ORIGINAL DESIRED COLUMN ORDER (the one that worked!)
 desired_order = [
     'Price', 'target_datetime', 'Load', 'shortwave_radiation', 'temperature_2m',
@@ -70,7 +78,7 @@ def build_training_set(train_start, train_end, run_date, lag_hours=168):
     logger.info(f"🧠 Actuals van {train_start} t/m {original_train_end} (extended to {extended_train_end} for lagging)")
     logger.info(f"📅 Forecast van run_date {run_date}, normalized to {run_date_normalized} for DB lookup, target range: {forecast_start} → {forecast_end}")
 
-    conn = sqlite3.connect(DB_PATH)
+    conn = sqlite3.connect(DB_PATH, timeout=60)
 
     try:
         # === Load actuals - BUT ONLY THE COLUMNS WE NEED ===
@@ -116,18 +124,12 @@ def build_training_set(train_start, train_end, run_date, lag_hours=168):
         df_predictions = None
         
         try:
-            # Check if predictions table exists and has data for this run_date
-            pred_count_query = f"""
-            SELECT COUNT(*) as count 
-            FROM {PREDICTIONS_TABLE} 
-            WHERE run_date = '{run_date_normalized}'
-            AND target_datetime >= '{forecast_start}'
-            AND target_datetime <= '{forecast_end}'
-            """
-            pred_count = pd.read_sql_query(pred_count_query, conn)['count'].iloc[0]
-            logger.info(f"📊 Forecast rows available: {pred_count}")
+            # Latest forecast per target hour issued at or before run_date (index-backed as-of lookup)
+            store = VintageStore(conn, PREDICTIONS_TABLE)
+            vintage = store.latest_vintage(run_date)
+            logger.info(f"📊 Latest forecast vintage at {run_date}: {vintage}")
             
-            if pred_count > 0:
+            if vintage is not None:
                 # Check which columns exist in predictions table
                 pred_columns_query = f"PRAGMA table_info({PREDICTIONS_TABLE})"
                 pred_available_columns = pd.read_sql_query(pred_columns_query, conn)['name'].tolist()
@@ -137,22 +139,19 @@ def build_training_set(train_start, train_end, run_date, lag_hours=168):
                 logger.info(f"📋 Common columns for predictions: {len(common_cols)} - {common_cols}")
                 
                 if common_cols:
-                    # Load predictions with same column structure as actuals
-                    pred_columns_str = ", ".join(common_cols)
-                    predictions_query = f"""
-                    SELECT {pred_columns_str}
-                    FROM {PREDICTIONS_TABLE} 
-                    WHERE run_date = '{run_date_normalized}'
-                    AND target_datetime >= '{forecast_start}'
-                    AND target_datetime <= '{forecast_end}'
-                    ORDER BY target_datetime
-                    """
-                    
-                    df_predictions = pd.read_sql_query(predictions_query, conn)
+                    # Load predictions with same column structure as actuals (forecast_end inclusive)
+                    df_predictions = store.as_of(run_date, forecast_start, horizon=HORIZON + 1, columns=common_cols)
+                    df_predictions = df_predictions[common_cols]
                     df_predictions["target_datetime"] = pd.to_datetime(df_predictions["target_datetime"], utc=True)
                     
                     logger.info(f"✅ Predictions loaded: {df_predictions.shape[0]} rows with {df_predictions.shape[1]} columns")
                     
+                    # === CALENDAR COLUMNS ARE KNOWN IN ADVANCE: COMPUTE, DON'T LAG ===
+                    calendar_cols = [col for col in existing_desired_cols if col in CALENDAR_FEATURES]
+                    if calendar_cols:
+                        df_predictions = add_calendar_features(df_predictions, columns=calendar_cols, overwrite=False)
+                        logger.info(f"📅 Calendar columns from calendar service: {calendar_cols}")
+
                     # === HANDLE MISSING COLUMNS WITH 168-HOUR LAG ===
                     missing_cols = [col for col in existing_desired_cols if col not in df_predictions.columns]
                     logger.info(f"🔧 Missing columns in predictions: {missing_cols}")
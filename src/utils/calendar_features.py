@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# Calendar feature service: one place that computes every dim_datetime column
+# for arbitrary UTC ranges, so history and future regressors are identical.
+
+import logging
+from functools import lru_cache
+from typing import Iterable, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+LOCAL_TZ = "Europe/Amsterdam"
+COUNTRY = "NL"
+
+CALENDAR_COLUMNS = [
+    "datetime", "hour", "day_of_week", "month", "day_of_year", "date",
+    "hour_sin", "hour_cos", "weekday_sin", "weekday_cos", "yearday_sin", "yearday_cos",
+    "local_datetime", "is_dst", "is_holiday", "is_weekend", "is_non_working_day",
+]
+# Columns that are pure functions of the timestamp (safe to use as future regressors)
+CALENDAR_FEATURES = [col for col in CALENDAR_COLUMNS if col not in ("datetime", "date", "local_datetime")]
+
+
+@lru_cache(maxsize=32)
+def holiday_dates(years: Tuple[int, ...], country: str = COUNTRY) -> np.ndarray:
+    """Holiday dates (datetime64[D]) for the given years, looked up once per (years, country)"""
+    import holidays
+
+    dates = sorted(holidays.country_holidays(country, years=list(years)).keys())
+    return np.array(dates, dtype="datetime64[D]")
+
+
+@lru_cache(maxsize=64)
+def _standard_offset(year: int, tz: str = LOCAL_TZ) -> pd.Timedelta:
+    return pd.Timestamp(f"{year}-01-01", tz=tz).utcoffset()
+
+
+def _to_utc(ts) -> pd.Timestamp:
+    ts = pd.Timestamp(ts)
+    return ts.tz_localize("UTC") if ts.tz is None else ts.tz_convert("UTC")
+
+
+def compute_calendar(index: pd.DatetimeIndex, tz: str = LOCAL_TZ, country: str = COUNTRY) -> pd.DataFrame:
+    """All calendar columns for a UTC DatetimeIndex, without per-row Python calls"""
+    index = pd.DatetimeIndex(index)
+    index = index.tz_localize("UTC") if index.tz is None else index.tz_convert("UTC")
+
+    df = pd.DataFrame({"datetime": index})
+    df["hour"] = index.hour
+    df["day_of_week"] = index.dayofweek
+    df["month"] = index.month
+    df["day_of_year"] = index.dayofyear
+    df["date"] = index.date
+
+    df["hour_sin"] = np.sin(2 * np.pi * df["hour"] / 24)
+    df["hour_cos"] = np.cos(2 * np.pi * df["hour"] / 24)
+    df["weekday_sin"] = np.sin(2 * np.pi * df["day_of_week"] / 7)
+    df["weekday_cos"] = np.cos(2 * np.pi * df["day_of_week"] / 7)
+    df["yearday_sin"] = np.sin(2 * np.pi * df["day_of_year"] / 365.25)
+    df["yearday_cos"] = np.cos(2 * np.pi * df["day_of_year"] / 365.25)
+
+    # DST: local UTC offset differs from the zone's standard (January) offset
+    local = index.tz_convert(tz)
+    offset = local.tz_localize(None) - index.tz_localize(None)
+    years = local.year
+    standard = pd.TimedeltaIndex([_standard_offset(int(y), tz) for y in years.unique()])
+    standard_per_row = standard[pd.Index(years.unique()).get_indexer(years)]
+    df["local_datetime"] = local
+    df["is_dst"] = np.asarray(offset != standard_per_row)
+
+    # Holidays on the UTC date, as dim_datetime always did
+    utc_days = index.tz_localize(None).to_numpy().astype("datetime64[D]")
+    all_years = tuple(sorted(set(index.year)))
+    df["is_holiday"] = np.isin(utc_days, holiday_dates(all_years, country)) if len(index) else []
+    df["is_holiday"] = df["is_holiday"].astype(bool)
+    df["is_weekend"] = df["day_of_week"].isin([5, 6]).astype(bool)
+    df["is_non_working_day"] = (df["is_weekend"] | df["is_holiday"]).astype(bool)
+    return df[CALENDAR_COLUMNS]
+
+
+@lru_cache(maxsize=16)
+def _cached_range(start_ns: int, end_ns: int, freq: str, tz: str, country: str) -> pd.DataFrame:
+    index = pd.date_range(pd.Timestamp(start_ns, tz="UTC"), pd.Timestamp(end_ns, tz="UTC"),
+                          freq=freq, inclusive="left")
+    return compute_calendar(index, tz, country)
+
+
+def calendar_features(start, end, freq: str = "h", tz: str = LOCAL_TZ, country: str = COUNTRY) -> pd.DataFrame:
+    """Calendar rows for [start, end) in UTC, memoized by range (a copy is returned)"""
+    start, end = _to_utc(start), _to_utc(end)
+    return _cached_range(start.value, end.value, freq, tz, country).copy()
+
+
+def calendar_for_times(times: Iterable, tz: str = LOCAL_TZ, country: str = COUNTRY) -> pd.DataFrame:
+    """Calendar rows for arbitrary (hourly) timestamps, one row per distinct timestamp.
+
+    The covering hourly range is computed (and memoized) once; off-grid timestamps
+    are computed directly.
+    """
+    index = pd.DatetimeIndex(pd.to_datetime(pd.Series(times), utc=True).dropna().unique()).sort_values()
+    if len(index) == 0:
+        return compute_calendar(index, tz, country)
+
+    covering = calendar_features(index.min().floor("h"), index.max().floor("h") + pd.Timedelta(hours=1),
+                                 tz=tz, country=country).set_index("datetime", drop=False)
+    on_grid = index.isin(covering.index)
+    parts = [covering.loc[index[on_grid]]]
+    if not on_grid.all():
+        parts.append(compute_calendar(index[~on_grid], tz, country).set_index("datetime", drop=False))
+    result = pd.concat(parts).sort_index()
+    return result.reset_index(drop=True)
+
+
+def calendar_spine(*times, time_column: str = "target_datetime") -> pd.DataFrame:
+    """Calendar rows for the union of several timestamp collections, keyed on time_column"""
+    parts = [pd.Series(pd.to_datetime(pd.Series(t), utc=True)) for t in times if t is not None and len(t)]
+    combined = pd.concat(parts, ignore_index=True) if parts else pd.Series(dtype="datetime64[ns, UTC]")
+    return calendar_for_times(combined).rename(columns={"datetime": time_column})
+
+
+def add_calendar_features(df: pd.DataFrame, time_column: str = "target_datetime",
+                          columns: Iterable[str] = None, overwrite: bool = True) -> pd.DataFrame:
+    """Attach calendar columns to df by its UTC time column (default: all CALENDAR_FEATURES)"""
+    columns = list(columns) if columns is not None else CALENDAR_FEATURES
+    if df.empty:
+        return df
+
+    times = pd.to_datetime(df[time_column], utc=True)
+    calendar = calendar_for_times(times).set_index("datetime")
+    aligned = calendar.reindex(pd.DatetimeIndex(times))
+
+    df = df.copy()
+    for col in columns:
+        if overwrite or col not in df.columns:
+            df[col] = aligned[col].to_numpy()
+        else:
+            df[col] = df[col].where(df[col].notna(), aligned[col].to_numpy())
+    return df
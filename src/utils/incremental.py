@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+
+import sqlite3
+import logging
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+WATERMARK_TABLE = "build_watermarks"
+
+def ensure_watermark_table(conn: sqlite3.Connection):
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {WATERMARK_TABLE} (
+            target_table TEXT NOT NULL,
+            source_table TEXT NOT NULL,
+            source_column TEXT NOT NULL,
+            watermark TEXT,
+            updated_at TEXT NOT NULL,
+            PRIMARY KEY (target_table, source_table)
+        )
+    """)
+    conn.commit()
+
+def table_exists(conn: sqlite3.Connection, table_name: str) -> bool:
+    cur = conn.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?", (table_name,))
+    return cur.fetchone() is not None
+
+def table_columns(conn: sqlite3.Connection, table_name: str) -> list:
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({table_name})").fetchall()]
+
+def _watermark_expression(column: str):
+    """'col' means MAX(col); 'MIN(col)' is for tables that are replaced as a rolling window"""
+    if column.upper().startswith("MIN(") and column.endswith(")"):
+        return column[4:-1], f"MIN({column[4:-1]})"
+    return column, f"MAX({column})"
+
+def source_watermark(conn: sqlite3.Connection, table_name: str, column: str):
+    """High-watermark of a source table's change column, or None if it is missing/empty"""
+    name, expression = _watermark_expression(column)
+    if not table_exists(conn, table_name) or name not in table_columns(conn, table_name):
+        return None
+    value = conn.execute(f"SELECT {expression} FROM {table_name}").fetchone()[0]
+    return pd.to_datetime(value, utc=True) if value is not None else None
+
+def get_watermarks(conn: sqlite3.Connection, target_table: str) -> dict:
+    ensure_watermark_table(conn)
+    rows = conn.execute(
+        f"SELECT source_table, watermark FROM {WATERMARK_TABLE} WHERE target_table = ?",
+        (target_table,)
+    ).fetchall()
+    return {source: pd.to_datetime(value, utc=True) if value else None for source, value in rows}
+
+def set_watermarks(conn: sqlite3.Connection, target_table: str, sources: dict, watermarks: dict):
+    """Store the source watermarks a target table was built from (sources: table -> change column)"""
+    ensure_watermark_table(conn)
+    now = datetime.now(timezone.utc).isoformat()
+    with conn:
+        conn.executemany(
+            f"INSERT OR REPLACE INTO {WATERMARK_TABLE} VALUES (?, ?, ?, ?, ?)",
+            [
+                (target_table, source, column,
+                 str(watermarks[source]) if watermarks.get(source) is not None else None, now)
+                for source, column in sources.items()
+            ]
+        )
+
+def plan_incremental(conn: sqlite3.Connection, target_table: str, sources: dict,
+                     overlap: timedelta = timedelta(days=1), full_rebuild: bool = False):
+    """Decide which part of target_table has to be rebuilt.
+
+    sources maps each input table to the column that grows when new data arrives
+    (a timestamp, or run_date for forecast vintages). Every hour at or after the
+    oldest previous watermark minus overlap is treated as changed.
+
+    Returns (since, current): since is None for a full rebuild, pd.NaT when no
+    source moved since the last build, otherwise the first hour to recompute.
+    """
+    current = {source: source_watermark(conn, source, column) for source, column in sources.items()}
+
+    if full_rebuild or not table_exists(conn, target_table):
+        return None, current
+
+    previous = get_watermarks(conn, target_table)
+    if set(previous) != set(sources):
+        logger.info(f"ℹ️ Geen volledige watermarks voor {target_table}, volledige rebuild")
+        return None, current
+
+    changed = [s for s in sources if current[s] != previous[s]]
+    if not changed:
+        return pd.NaT, current
+    if any(previous[s] is None for s in changed):
+        # A source appeared or was emptied since the last build
+        return None, current
+
+    since = min(previous[s] for s in changed) - overlap
+    return since.floor("D"), current
+
+def upsert_since(conn: sqlite3.Connection, table_name: str, df: pd.DataFrame, key_column: str, since):
+    """Replace all rows with key_column >= since by df, adding any new columns to the table first"""
+    existing = table_columns(conn, table_name)
+    with conn:
+        for col in df.columns:
+            if col not in existing:
+                conn.execute(f'ALTER TABLE {table_name} ADD COLUMN "{col}"')
+        # Integer keys (hour_key) compare as numbers, timestamps as their text layout
+        bound = int(since) if isinstance(since, (int, np.integer)) else str(since)
+        conn.execute(f"DELETE FROM {table_name} WHERE {key_column} >= ?", (bound,))
+    df.to_sql(table_name, conn, if_exists="append", index=False)
+    conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table_name}_{key_column} ON {table_name}({key_column})")
+    conn.commit()
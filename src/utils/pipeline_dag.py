@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+# Small dependency-aware pipeline runner for the WARP.db scripts.
+# Stages declare the tables they read and write; edges follow from those
+# declarations (plus explicit depends_on). Independent stages run concurrently
+# and a stage is skipped when the fingerprint of its input tables is unchanged.
+# A stage fails when its function raises; the stage scripts re-raise after
+# logging and connect with a 60 s busy timeout, so concurrent writers wait for
+# each other instead of failing with "database is locked".
+
+import time
+import hashlib
+import sqlite3
+import logging
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import pandas as pd
+
+from utils.incremental import table_columns
+from utils.time_keys import HOUR_KEY
+
+logger = logging.getLogger(__name__)
+
+STATE_TABLE = "pipeline_stage_state"
+# Rows at the end of a table whose content goes into its hash (writers append or rewrite recent hours)
+TAIL_ROWS = 5000
+
+
+@dataclass
+class Stage:
+    """One pipeline step; external sources (APIs) have no inputs and always run"""
+    name: str
+    func: Callable[[], Any]
+    inputs: List[str] = field(default_factory=list)
+    outputs: List[str] = field(default_factory=list)
+    depends_on: List[str] = field(default_factory=list)
+    always_run: bool = False
+
+
+@dataclass
+class StageResult:
+    name: str
+    status: str  # 'success', 'skipped', 'failed', 'upstream_failed'
+    duration: float = 0.0
+    input_hash: Optional[str] = None
+    error: Optional[str] = None
+
+
+def table_hash(conn: sqlite3.Connection, table_name: str) -> str:
+    """Fingerprint of a table from cheap metadata; missing tables hash to a fixed marker.
+
+    Covers the columns, COUNT(*), MAX(rowid), MAX(hour_key) and the content of
+    the last TAIL_ROWS rows, so appends, replaces and the rewrites of recent
+    hours done by the writers all change it without reading the table into
+    pandas. An in-place edit of older rows does not: run with force=True then.
+    """
+    exists = conn.execute(
+        "SELECT name FROM sqlite_master WHERE type='table' AND name=?", (table_name,)
+    ).fetchone()
+    if not exists:
+        return "missing"
+    columns = table_columns(conn, table_name)
+    digest = hashlib.sha1(",".join(columns).encode())
+    key = f", MAX({HOUR_KEY})" if HOUR_KEY in columns else ""
+    stats = conn.execute(f"SELECT COUNT(*), MAX(rowid){key} FROM {table_name}").fetchone()
+    digest.update(repr(stats).encode())
+    if stats[1] is not None:
+        tail = conn.execute(f"SELECT * FROM {table_name} WHERE rowid > ?", (stats[1] - TAIL_ROWS,)).fetchall()
+        digest.update(repr(tail).encode())
+    return digest.hexdigest()
+
+
+class PipelineDAG:
+    """Runs stages in dependency order on a thread pool"""
+
+    def __init__(self, stages: List[Stage], db_path: Path, max_workers: int = 4):
+        self.stages = {stage.name: stage for stage in stages}
+        if len(self.stages) != len(stages):
+            raise ValueError("Stage names must be unique")
+        self.db_path = Path(db_path)
+        self.max_workers = max_workers
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.dependencies = self._resolve_dependencies()
+
+    def _resolve_dependencies(self) -> Dict[str, set]:
+        producers = {}
+        for stage in self.stages.values():
+            for table in stage.outputs:
+                producers.setdefault(table, set()).add(stage.name)
+
+        deps = {}
+        for stage in self.stages.values():
+            upstream = set(stage.depends_on)
+            for table in stage.inputs:
+                upstream |= producers.get(table, set())
+            upstream.discard(stage.name)
+            unknown = upstream - set(self.stages)
+            if unknown:
+                raise ValueError(f"Stage '{stage.name}' depends on unknown stages: {sorted(unknown)}")
+            deps[stage.name] = upstream
+
+        self._check_acyclic(deps)
+        return deps
+
+    @staticmethod
+    def _check_acyclic(deps: Dict[str, set]):
+        remaining = {name: set(up) for name, up in deps.items()}
+        while remaining:
+            ready = [name for name, up in remaining.items() if not up]
+            if not ready:
+                raise ValueError(f"Pipeline has a cycle between: {sorted(remaining)}")
+            for name in ready:
+                del remaining[name]
+            for up in remaining.values():
+                up.difference_update(ready)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=60)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _ensure_state_table(self):
+        with self._connect() as conn:
+            # WAL lets concurrent stages read while another stage writes
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS {STATE_TABLE} (
+                    stage TEXT PRIMARY KEY,
+                    input_hash TEXT,
+                    status TEXT,
+                    duration_seconds REAL,
+                    finished_at TEXT
+                )
+            """)
+
+    def _stored_hash(self, name: str) -> Optional[str]:
+        with self._connect() as conn:
+            row = conn.execute(
+                f"SELECT input_hash FROM {STATE_TABLE} WHERE stage = ? AND status = 'success'", (name,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def _save_state(self, result: StageResult):
+        with self._connect() as conn:
+            conn.execute(
+                f"INSERT OR REPLACE INTO {STATE_TABLE} VALUES (?, ?, ?, ?, ?)",
+                (result.name, result.input_hash, result.status, result.duration,
+                 datetime.now(timezone.utc).isoformat())
+            )
+
+    def _input_hash(self, stage: Stage) -> str:
+        digest = hashlib.sha1(stage.name.encode())
+        with self._connect() as conn:
+            for table in sorted(stage.inputs):
+                digest.update(f"{table}:{table_hash(conn, table)}".encode())
+        return digest.hexdigest()
+
+    def _outputs_exist(self, stage: Stage) -> bool:
+        with self._connect() as conn:
+            for table in stage.outputs:
+                if not conn.execute(
+                    "SELECT name FROM sqlite_master WHERE type='table' AND name=?", (table,)
+                ).fetchone():
+                    return False
+        return True
+
+    def _run_stage(self, stage: Stage, force: bool) -> StageResult:
+        start = time.perf_counter()
+        input_hash = None if stage.always_run else self._input_hash(stage)
+
+        if not force and input_hash is not None and input_hash == self._stored_hash(stage.name) \
+                and self._outputs_exist(stage):
+            return StageResult(stage.name, "skipped", time.perf_counter() - start, input_hash)
+
+        self.logger.info(f"▶️ {stage.name}")
+        try:
+            stage.func()
+        except Exception as e:
+            self.logger.error(f"❌ {stage.name} failed: {e}", exc_info=True)
+            return StageResult(stage.name, "failed", time.perf_counter() - start, input_hash, str(e))
+        return StageResult(stage.name, "success", time.perf_counter() - start, input_hash)
+
+    def _select(self, targets: Optional[List[str]]) -> set:
+        """Targets plus everything upstream of them"""
+        if not targets:
+            return set(self.stages)
+        selected, todo = set(), list(targets)
+        while todo:
+            name = todo.pop()
+            if name not in self.stages:
+                raise ValueError(f"Unknown stage: {name}")
+            if name not in selected:
+                selected.add(name)
+                todo.extend(self.dependencies[name])
+        return selected
+
+    def run(self, targets: Optional[List[str]] = None, force: bool = False) -> List[StageResult]:
+        """Run the selected stages; a failed stage marks its downstream stages 'upstream_failed'"""
+        self._ensure_state_table()
+        wall_start = time.perf_counter()
+        selected = self._select(targets)
+        pending = {name: self.dependencies[name] & selected for name in selected}
+        results: Dict[str, StageResult] = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            running = {}
+            while pending or running:
+                for name in [n for n, up in pending.items() if up <= results.keys()]:
+                    del pending[name]
+                    if any(results[up].status in ("failed", "upstream_failed") for up in self.dependencies[name] & selected):
+                        results[name] = StageResult(name, "upstream_failed")
+                        continue
+                    running[executor.submit(self._run_stage, self.stages[name], force)] = name
+
+                if not running:
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    result = future.result()
+                    results[running.pop(future)] = result
+                    if result.status != "skipped":
+                        self._save_state(result)
+
+        ordered = [results[name] for name in self._topological_order() if name in results]
+        self.logger.info("\n" + self.format_report(ordered, time.perf_counter() - wall_start))
+        return ordered
+
+    def _topological_order(self) -> List[str]:
+        order, remaining = [], {name: set(up) for name, up in self.dependencies.items()}
+        while remaining:
+            ready = sorted(name for name, up in remaining.items() if not up)
+            order.extend(ready)
+            for name in ready:
+                del remaining[name]
+            for up in remaining.values():
+                up.difference_update(ready)
+        return order
+
+    @staticmethod
+    def timing_report(results: List[StageResult]) -> pd.DataFrame:
+        return pd.DataFrame([
+            {"stage": r.name, "status": r.status, "seconds": round(r.duration, 2), "error": r.error}
+            for r in results
+        ])
+
+    @classmethod
+    def format_report(cls, results: List[StageResult], wall_seconds: Optional[float] = None) -> str:
+        report = cls.timing_report(results)
+        total = report["seconds"].sum() if len(report) else 0.0
+        lines = ["📊 Pipeline timing report", "-" * 50]
+        for row in report.itertuples():
+            lines.append(f"{row.stage:<28} {row.status:<16} {row.seconds:>8.2f}s")
+        lines.append("-" * 50)
+        lines.append(f"{'sum of stage time':<45} {total:>8.2f}s")
+        if wall_seconds is not None:
+            lines.append(f"{'wall clock':<45} {wall_seconds:>8.2f}s")
+        return "\n".join(lines)
@@ -0,0 +1,163 @@
+import cProfile
+import logging
+import pstats
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import pandas as pd
+
+try:
+    from pyinstrument import Profiler as PyinstrumentProfiler
+    PYINSTRUMENT_AVAILABLE = True
+except ImportError:
+    PYINSTRUMENT_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ProfileSettings:
+    """What BaseModel.fit_predict records besides the phase timings (which are always on)"""
+    track_memory: bool = False                # opt-in: tracemalloc peak per phase (Python + numpy
+                                              # allocations); slows allocation-heavy fits noticeably
+    profile_dir: Optional[Path] = None        # opt-in: one profiler dump per model run
+    profiler: str = "cprofile"                # "cprofile" (.prof, pstats) or "pyinstrument" (.html)
+
+
+@dataclass
+class RunProfile:
+    """Per-phase wall time and peak memory of one model run"""
+    phases: Dict[str, float] = field(default_factory=dict)
+    peak_memory: Dict[str, float] = field(default_factory=dict)
+    iterations: Optional[int] = None
+    profile_path: Optional[str] = None
+
+    @property
+    def peak_memory_mb(self) -> Optional[float]:
+        return max(self.peak_memory.values()) if self.peak_memory else None
+
+    def to_dict(self) -> Dict:
+        return {
+            'phases': {name: round(seconds, 6) for name, seconds in self.phases.items()},
+            'peak_memory_mb': {name: round(mb, 3) for name, mb in self.peak_memory.items()},
+            'iterations': self.iterations,
+            'profile_path': self.profile_path,
+        }
+
+
+class RunProfiler:
+    """Phase timer for one model run, with optional tracemalloc and cProfile/pyinstrument.
+
+    Phases nest: a 'scale' phase opened inside 'fit' is recorded as 'fit.scale'.
+    The peak memory of a phase is the highest traced memory (allocations made
+    since the run started that are still alive) while the phase was open, in MB.
+    """
+
+    def __init__(self, settings: Optional[ProfileSettings] = None, run_name: str = "run"):
+        self.settings = settings or ProfileSettings()
+        self.run_name = run_name
+        self.profile = RunProfile()
+        self._stack: List[str] = []
+        self._started_tracemalloc = False
+        self._profiler = None
+
+    @contextmanager
+    def run(self):
+        """Wrap the whole run: starts tracemalloc and the optional profiler"""
+        if self.settings.track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        self._start_profiler()
+        try:
+            yield self
+        finally:
+            self._stop_profiler()
+            if self._started_tracemalloc:
+                tracemalloc.stop()
+                self._started_tracemalloc = False
+
+    @contextmanager
+    def phase(self, name: str):
+        path = ".".join(self._stack + [name])
+        self._stack.append(name)
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            # There is one peak counter: remember the parent's peak so far before resetting it
+            _, parent_peak = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.profile.phases[path] = self.profile.phases.get(path, 0.0) + time.perf_counter() - start
+            if tracing:
+                _, peak = tracemalloc.get_traced_memory()
+                peak_mb = peak / 1024 ** 2
+                self.profile.peak_memory[path] = max(self.profile.peak_memory.get(path, 0.0), peak_mb)
+                # Enclosing phases keep the max of their own stretches and their children
+                for parent in self._parents(path):
+                    self.profile.peak_memory[parent] = max(self.profile.peak_memory.get(parent, 0.0),
+                                                           peak_mb, parent_peak / 1024 ** 2)
+            self._stack.pop()
+
+    @staticmethod
+    def _parents(path: str) -> List[str]:
+        parts = path.split(".")
+        return [".".join(parts[:i]) for i in range(1, len(parts))]
+
+    def _start_profiler(self):
+        if self.settings.profile_dir is None:
+            return
+        if self.settings.profiler == "pyinstrument":
+            if not PYINSTRUMENT_AVAILABLE:
+                logger.warning("⚠️ pyinstrument not installed, falling back to cProfile")
+            else:
+                self._profiler = PyinstrumentProfiler()
+                self._profiler.start()
+                return
+        self._profiler = cProfile.Profile()
+        self._profiler.enable()
+
+    def _stop_profiler(self):
+        if self._profiler is None:
+            return
+        profile_dir = Path(self.settings.profile_dir)
+        profile_dir.mkdir(parents=True, exist_ok=True)
+        stem = f"{self.run_name}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}"
+
+        if isinstance(self._profiler, cProfile.Profile):
+            self._profiler.disable()
+            path = profile_dir / f"{stem}.prof"
+            self._profiler.dump_stats(path)
+        else:
+            self._profiler.stop()
+            path = profile_dir / f"{stem}.html"
+            path.write_text(self._profiler.output_html())
+        self.profile.profile_path = str(path)
+        self._profiler = None
+
+
+def rank_hotspots(profile_paths: Iterable, sort: str = "tottime", top: int = 25) -> pd.DataFrame:
+    """Merge cProfile dumps (e.g. all runs of an experiment) and rank functions by `sort`"""
+    paths = [str(p) for p in profile_paths if p and str(p).endswith(".prof") and Path(p).exists()]
+    if not paths:
+        return pd.DataFrame(columns=['function', 'calls', 'tottime', 'cumtime', 'tottime_share'])
+
+    stats = pstats.Stats(*paths)
+    rows = []
+    for (filename, line, function), (_, calls, tottime, cumtime, _) in stats.stats.items():
+        rows.append({
+            'function': f"{Path(filename).name}:{line}({function})",
+            'calls': calls,
+            'tottime': tottime,
+            'cumtime': cumtime,
+        })
+
+    hotspots = pd.DataFrame(rows)
+    hotspots['tottime_share'] = hotspots['tottime'] / hotspots['tottime'].sum()
+    return hotspots.sort_values(sort, ascending=False).head(top).reset_index(drop=True)
@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+# Content signatures for caches that reuse per-origin work between rolling windows
+# (models/gradient_boosting.py design rows, models/ridge_direct.py Gram updates).
+# A row hash covers (hour key, y, exog); the signature of an origin is the wrapping
+# uint64 sum of the row hashes in the window of grid rows it reads.
+
+from typing import Optional
+
+import numpy as np
+
+
+def row_hashes(keys: np.ndarray, y: np.ndarray, X: Optional[np.ndarray] = None) -> np.ndarray:
+    """uint64 hash per grid row of (hour key, y, X); NaNs hash alike, arithmetic wraps mod 2**64"""
+    values = y[:, None] if X is None or X.shape[1] == 0 else np.column_stack([y, X])
+    bits = np.where(np.isnan(values), np.nan, values).view(np.uint64)
+    h = keys.astype(np.uint64) * np.uint64(0x9E3779B97F4A7C15)
+    for j in range(bits.shape[1]):
+        h = (h ^ bits[:, j]) * np.uint64(0xBF58476D1CE4E5B9)
+        h ^= h >> np.uint64(31)
+    return h
+
+
+def origin_signatures(keys: np.ndarray, y: np.ndarray, X: Optional[np.ndarray],
+                      origins: np.ndarray, lookback: int, horizon: int) -> np.ndarray:
+    """Signature of grid rows origin - lookback .. origin + horizon (clipped to the grid) per origin"""
+    csum = np.concatenate([np.zeros(1, dtype=np.uint64), np.cumsum(row_hashes(keys, y, X), dtype=np.uint64)])
+    lo = np.clip(origins - lookback, 0, len(y))
+    hi = np.clip(origins + horizon + 1, 0, len(y))
+    return csum[hi] - csum[lo]
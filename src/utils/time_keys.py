@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+# Canonical time key: whole hours since 1970-01-01 00:00 UTC as int32.
+# Tables carry it next to their timestamp column ('hour_key'); joins and range
+# filters use the key and datetimes are only materialized at the edges.
+
+import sqlite3
+import logging
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+HOUR_KEY = "hour_key"
+NS_PER_HOUR = 3_600_000_000_000
+
+# Timestamp column per table, for adding/backfilling keys on existing databases
+TABLE_TIME_COLUMNS = {
+    "raw_entsoe_obs": "Timestamp",
+    "transform_entsoe_obs": "Timestamp",
+    "raw_meteo_obs": "date",
+    "transform_weather_obs": "date",
+    "raw_meteo_stations": "date",
+    "transform_weather_national": "date",
+    "raw_meteo_forecast_now": "date",
+    "transform_meteo_forecast_now": "date",
+    "process_weather_preds": "target_datetime",
+    "dim_datetime": "datetime",
+    "master_warp": "target_datetime",
+    "master_predictions": "target_datetime",
+    "training_set": "target_datetime",
+}
+
+
+def _days_from_civil(year, month, day):
+    """Days since 1970-01-01 for proleptic Gregorian dates (vectorized)"""
+    year = year - (month <= 2)
+    era = np.floor_divide(year, 400)
+    yoe = year - era * 400
+    doy = (153 * (month + np.where(month > 2, -3, 9)) + 2) // 5 + day - 1
+    doe = yoe * 365 + yoe // 4 - yoe // 100 + doy
+    return era * 146097 + doe - 719468
+
+
+def _decode_strings(values: np.ndarray):
+    """Digit-wise decoding of 'YYYY-MM-DD HH:MM:SS[+HH:MM]' strings; None if the layout differs"""
+    chars = values.astype("U26")
+    lengths = np.char.str_len(chars)
+    width = int(lengths[0])
+    if width not in (19, 25) or (lengths != width).any():
+        return None
+    codes = chars.view(np.uint32).reshape(len(chars), 26)[:, :width].astype(np.int64) - ord("0")
+    digit_cols = [0, 1, 2, 3, 5, 6, 8, 9, 11, 12, 14, 15, 17, 18]
+    if width == 25:
+        digit_cols += [20, 21, 23, 24]
+    digits = codes[:, digit_cols]
+    layout_ok = (
+        ((digits >= 0) & (digits <= 9)).all()
+        and (codes[:, [4, 7]] == ord("-") - ord("0")).all()
+        and np.isin(codes[:, 10], [ord(" ") - ord("0"), ord("T") - ord("0")]).all()
+        and (codes[:, [13, 16]] == ord(":") - ord("0")).all()
+    )
+    if width == 25:
+        layout_ok = layout_ok and (codes[:, 22] == ord(":") - ord("0")).all() \
+            and np.isin(codes[:, 19], [ord("+") - ord("0"), ord("-") - ord("0")]).all()
+    if not layout_ok:
+        return None
+
+    number = lambda cols: sum(codes[:, c] * 10 ** (len(cols) - 1 - i) for i, c in enumerate(cols))
+    keys = _days_from_civil(number([0, 1, 2, 3]), number([5, 6]), number([8, 9])) * 24 + number([11, 12])
+    if width == 25:
+        # Whole-hour offsets only (true for all data here); otherwise fall back to parsing
+        if (number([23, 24]) != 0).any():
+            return None
+        sign = np.where(codes[:, 19] == ord("-") - ord("0"), -1, 1)
+        keys = keys - sign * number([20, 21])
+    return keys
+
+
+def hour_keys(timestamps) -> pd.arrays.IntegerArray:
+    """Hours since epoch (nullable Int64, floored) for timestamp strings or datetimes.
+
+    Strings in the layouts pandas writes to SQLite are decoded with NumPy instead
+    of being parsed; naive timestamps are taken as UTC. Anything else falls back
+    to pd.to_datetime. Missing or malformed timestamps get <NA> (NULL in SQLite).
+    """
+    values = pd.Series(timestamps).to_numpy()
+    if values.dtype == object and len(values) and all(isinstance(v, str) for v in values[:1]):
+        try:
+            keys = _decode_strings(values)
+        except (TypeError, ValueError):
+            keys = None
+        if keys is not None:
+            return pd.array(keys, dtype="Int64")
+
+    parsed = pd.to_datetime(pd.Series(timestamps), utc=True, format="ISO8601", errors="coerce")
+    missing = parsed.isna().to_numpy()
+    ns = np.where(missing, 0, parsed.array.asi8)
+    return pd.arrays.IntegerArray(ns // NS_PER_HOUR, missing)
+
+
+def to_hour_key(timestamps) -> pd.arrays.IntegerArray:
+    """Nullable int32 hour keys (enough until the year 246,953)"""
+    return hour_keys(timestamps).astype("Int32")
+
+
+def hour_key(ts) -> int:
+    """Key of a single timestamp (naive = UTC)"""
+    ts = pd.Timestamp(ts)
+    ts = ts.tz_localize("UTC") if ts.tz is None else ts.tz_convert("UTC")
+    return int(ts.value // NS_PER_HOUR)
+
+
+def from_hour_key(keys) -> pd.DatetimeIndex:
+    """Materialize UTC datetimes from hour keys (no string parsing)"""
+    keys = np.asarray(keys, dtype=np.int64)
+    return pd.DatetimeIndex(pd.to_datetime(keys * NS_PER_HOUR, utc=True))
+
+
+def sql_hour_key(time_column: str) -> str:
+    """SQLite expression for the key of a text timestamp column (NULL if SQLite cannot read it)"""
+    seconds = f"CAST(strftime('%s', {time_column}) AS INTEGER)"
+    # Floor division, also before 1970
+    return f"({seconds} / 3600 - ({seconds} % 3600 < 0))"
+
+
+def add_hour_key(df: pd.DataFrame, time_column: str, key_column: str = HOUR_KEY) -> pd.DataFrame:
+    """Add the key column for df[time_column] (in place, also returned).
+
+    Writers call this before to_sql, so stored rows always carry their key.
+    """
+    df[key_column] = to_hour_key(df[time_column]) if len(df) else pd.Series(dtype="Int32")
+    return df
+
+
+def index_hour_key(conn: sqlite3.Connection, table_name: str, key_column: str = HOUR_KEY):
+    """Index the key column; to_sql(if_exists='replace') drops the previous index"""
+    conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table_name}_{key_column} ON {table_name}({key_column})")
+    conn.commit()
+
+
+def has_hour_key(conn: sqlite3.Connection, table_name: str, key_column: str = HOUR_KEY) -> bool:
+    return key_column in [row[1] for row in conn.execute(f"PRAGMA table_info({table_name})").fetchall()]
+
+
+def read_keyed(conn: sqlite3.Connection, table_name: str, time_column: str = None, since=None,
+               key_column: str = HOUR_KEY) -> pd.DataFrame:
+    """All rows of a table, or those from the hour of `since` on, including the key column.
+
+    Filters on the indexed key. A table that predates hour keys (see
+    ensure_hour_key) gets its keys in memory only; nothing is written.
+    """
+    if has_hour_key(conn, table_name, key_column):
+        if since is None:
+            return pd.read_sql_query(f"SELECT * FROM {table_name}", conn)
+        return pd.read_sql_query(f"SELECT * FROM {table_name} WHERE {key_column} >= ?", conn,
+                                 params=(hour_key(since),))
+
+    logger.warning(f"⚠️ {table_name} heeft nog geen {key_column}, draai de migratie (utils/time_keys.py)")
+    df = add_hour_key(pd.read_sql_query(f"SELECT * FROM {table_name}", conn),
+                      time_column or TABLE_TIME_COLUMNS[table_name], key_column)
+    if since is not None:
+        df = df[(df[key_column] >= hour_key(since)).fillna(False)].reset_index(drop=True)
+    return df
+
+
+def ensure_hour_key(conn: sqlite3.Connection, table_name: str, time_column: str = None,
+                    key_column: str = HOUR_KEY) -> int:
+    """One-off migration: add, fill and index the key column of a table written before hour keys.
+
+    Tables that already have the column are left alone (their writers fill it),
+    so after the migration this only makes sure the index exists. The keys are
+    computed by SQLite itself; only values its date functions cannot read go
+    through hour_keys.
+    Returns the number of rows that got a key.
+    """
+    time_column = time_column or TABLE_TIME_COLUMNS[table_name]
+    columns = [row[1] for row in conn.execute(f"PRAGMA table_info({table_name})").fetchall()]
+    if not columns:
+        return 0
+    if key_column in columns:
+        index_hour_key(conn, table_name, key_column)
+        return 0
+
+    with conn:
+        conn.execute(f'ALTER TABLE {table_name} ADD COLUMN "{key_column}" INTEGER')
+        filled = conn.execute(
+            f"UPDATE {table_name} SET {key_column} = {sql_hour_key(time_column)} "
+            f"WHERE typeof({time_column}) = 'text'"
+        ).rowcount
+        rows = conn.execute(
+            f"SELECT rowid, {time_column} FROM {table_name} WHERE {key_column} IS NULL AND {time_column} IS NOT NULL"
+        ).fetchall()
+        if rows:
+            keys = hour_keys(pd.Series([r[1] for r in rows], dtype=object))
+            conn.executemany(
+                f"UPDATE {table_name} SET {key_column} = ? WHERE rowid = ?",
+                [(None if pd.isna(k) else int(k), r[0]) for k, r in zip(keys, rows)]
+            )
+    index_hour_key(conn, table_name, key_column)
+    logger.info(f"🔑 {key_column} toegevoegd aan {table_name} ({filled} rijen)")
+    return filled
+
+
+def backfill_hour_keys(conn: sqlite3.Connection):
+    """Migrate every known table that exists in the database"""
+    existing = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='table'").fetchall()}
+    for table, column in TABLE_TIME_COLUMNS.items():
+        if table in existing:
+            ensure_hour_key(conn, table, column)
+
+
+if __name__ == "__main__":
+    # python src/utils/time_keys.py [path/to/WARP.db]
+    import sys
+    from pathlib import Path
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - time_keys - %(levelname)s - %(message)s')
+    db_path = sys.argv[1] if len(sys.argv) > 1 else Path(__file__).resolve().parents[1] / "data" / "WARP.db"
+    conn = sqlite3.connect(db_path)
+    try:
+        backfill_hour_keys(conn)
+    finally:
+        conn.close()
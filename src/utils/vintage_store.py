@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# Vintage store for exogenous forecasts in master_predictions, keyed by
+# (run_date, target_datetime). An as-of lookup returns, per target hour, the latest
+# forecast issued at or before the issue time, so backtests cannot see the future.
+
+import sqlite3
+import logging
+from typing import List, Optional
+
+import pandas as pd
+
+from utils.incremental import table_columns, table_exists
+
+logger = logging.getLogger(__name__)
+
+PREDICTIONS_TABLE = "master_predictions"
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S+00:00"  # how pandas writes UTC timestamps to SQLite
+
+
+def to_db_time(ts) -> str:
+    """UTC timestamp in the text layout the tables use (sorts chronologically)"""
+    ts = pd.Timestamp(ts)
+    ts = ts.tz_localize("UTC") if ts.tz is None else ts.tz_convert("UTC")
+    return ts.strftime(TIME_FORMAT)
+
+
+class VintageStore:
+    """As-of access to forecast vintages, backed by a (target_datetime, run_date) index"""
+
+    def __init__(self, conn: sqlite3.Connection, table: str = PREDICTIONS_TABLE):
+        self.conn = conn
+        self.table = table
+        self.index_name = f"idx_{table}_target_run"
+        self._indexed = False
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def ensure_index(self):
+        """Covering index for the as-of query: per target a range seek to MAX(run_date)"""
+        if self._indexed:
+            return
+        if not table_exists(self.conn, self.table):
+            raise ValueError(f"Table '{self.table}' does not exist")
+        self.conn.execute(
+            f"CREATE INDEX IF NOT EXISTS {self.index_name} ON {self.table} (target_datetime, run_date)"
+        )
+        self.conn.execute(
+            f"CREATE INDEX IF NOT EXISTS idx_{self.table}_run ON {self.table} (run_date)"
+        )
+        self.conn.commit()
+        self._indexed = True
+
+    def vintages(self, until=None) -> pd.DatetimeIndex:
+        """Distinct issue times (optionally only those at or before `until`)"""
+        self.ensure_index()
+        query = f"SELECT DISTINCT run_date FROM {self.table} WHERE run_date IS NOT NULL"
+        params = ()
+        if until is not None:
+            query += " AND run_date <= ?"
+            params = (to_db_time(until),)
+        rows = self.conn.execute(query + " ORDER BY run_date", params).fetchall()
+        return pd.DatetimeIndex(pd.to_datetime([r[0] for r in rows], utc=True))
+
+    def latest_vintage(self, issue_time) -> Optional[pd.Timestamp]:
+        self.ensure_index()
+        value = self.conn.execute(
+            f"SELECT MAX(run_date) FROM {self.table} WHERE run_date <= ?", (to_db_time(issue_time),)
+        ).fetchone()[0]
+        return pd.Timestamp(value).tz_convert("UTC") if value else None
+
+    def as_of(self,
+              issue_time,
+              target_start=None,
+              horizon: int = 168,
+              columns: Optional[List[str]] = None,
+              single_vintage: bool = False) -> pd.DataFrame:
+        """Forecasts known at `issue_time` for targets [target_start, target_start + horizon h).
+
+        Per target hour the latest run_date <= issue_time is used; with
+        single_vintage=True all targets come from the one latest run instead.
+        """
+        self.ensure_index()
+        target_start = pd.Timestamp(issue_time) if target_start is None else pd.Timestamp(target_start)
+        target_end = target_start + pd.Timedelta(hours=horizon)
+        available = table_columns(self.conn, self.table)
+        selected = available if columns is None else [c for c in columns if c in available]
+        for key in ("run_date", "target_datetime"):
+            if key not in selected:
+                selected = selected + [key]
+        select = ", ".join(f"p.{col}" for col in selected)
+        params = [to_db_time(target_start), to_db_time(target_end), to_db_time(issue_time)]
+
+        if single_vintage:
+            query = f"""
+                SELECT {select} FROM {self.table} p
+                WHERE p.target_datetime >= ? AND p.target_datetime < ?
+                  AND p.run_date = (SELECT MAX(run_date) FROM {self.table} WHERE run_date <= ?)
+                ORDER BY p.target_datetime
+            """
+        else:
+            query = f"""
+                SELECT {select} FROM {self.table} p
+                JOIN (
+                    SELECT target_datetime, MAX(run_date) AS run_date
+                    FROM {self.table}
+                    WHERE target_datetime >= ? AND target_datetime < ? AND run_date <= ?
+                    GROUP BY target_datetime
+                ) latest
+                ON p.target_datetime = latest.target_datetime AND p.run_date = latest.run_date
+                ORDER BY p.target_datetime
+            """
+
+        df = pd.read_sql_query(query, self.conn, params=params)
+        df = df.drop_duplicates("target_datetime", keep="last")
+        df["target_datetime"] = pd.to_datetime(df["target_datetime"], utc=True)
+        df["run_date"] = pd.to_datetime(df["run_date"], utc=True)
+        self.logger.info(
+            f"📅 As-of {issue_time}: {len(df)} target hours from "
+            f"{df['run_date'].nunique()} vintage(s)"
+        )
+        return df
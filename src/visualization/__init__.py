@@ -1,3 +1,4 @@
 from .results import ResultsVisualizer
+from .downsampling import TraceStore, downsample, lttb_indices, minmax_indices
 
-__all__ = ['ResultsVisualizer']
\ No newline at end of file
+__all__ = ['ResultsVisualizer', 'TraceStore', 'downsample', 'lttb_indices', 'minmax_indices']
\ No newline at end of file
@@ -0,0 +1,199 @@
+import pandas as pd
+import numpy as np
+import logging
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+DOWNSAMPLING_METHODS = ('lttb', 'minmax', 'minmax_lttb')
+
+# minmax_lttb: min-max preselects this many points per output point before LTTB
+MINMAX_RATIO = 4
+
+
+def _bucket_matrix(start: int, stop: int, n_buckets: int) -> np.ndarray:
+    """(n_buckets, width) positions of `n_buckets` near-equal buckets over [start, stop).
+
+    Shorter buckets are padded with their own first position, which never
+    changes an argmin/argmax (the first occurrence wins).
+    """
+    edges = np.linspace(start, stop, n_buckets + 1).astype(np.int64)
+    sizes = np.diff(edges)
+    offsets = np.arange(sizes.max())
+    return edges[:-1, None] + np.where(offsets[None, :] < sizes[:, None], offsets[None, :], 0)
+
+
+def minmax_indices(y: np.ndarray, n_out: int) -> np.ndarray:
+    """Positions of the min and max of n_out / 2 buckets, plus the first and last point"""
+    n = len(y)
+    if n <= n_out:
+        return np.arange(n)
+
+    buckets = _bucket_matrix(1, n - 1, max((n_out - 2) // 2, 1))
+    values = y[buckets]
+    rows = np.arange(len(buckets))
+    picked = np.concatenate([buckets[rows, values.argmin(axis=1)], buckets[rows, values.argmax(axis=1)]])
+    return np.unique(np.concatenate([[0], picked, [n - 1]]))
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets (Steinarsson 2013): positions of n_out points.
+
+    The triangle area of candidate j with the previously selected point a and the
+    next bucket's average c is |xa (yj - cy) + ya (cx - xj) + (xj cy - cx yj)|,
+    linear in (xa, ya). The coefficients of every candidate are computed at once;
+    only the argmax per bucket (which depends on the previous pick) is sequential.
+    """
+    n = len(x)
+    if n <= n_out or n_out < 3:
+        return np.arange(n)
+
+    buckets = _bucket_matrix(1, n - 1, n_out - 2)                               # (B, W)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+
+    # Average of each bucket from cumulative sums; the bucket after the last one is the last point
+    cx, cy = np.concatenate([[0.0], np.cumsum(x)]), np.concatenate([[0.0], np.cumsum(y)])
+    counts = np.diff(edges)
+    avg_x = np.append((cx[edges[1:]] - cx[edges[:-1]]) / counts, x[-1])
+    avg_y = np.append((cy[edges[1:]] - cy[edges[:-1]]) / counts, y[-1])
+    next_x, next_y = avg_x[1:, None], avg_y[1:, None]
+
+    xj, yj = x[buckets], y[buckets]
+    p, q, r = yj - next_y, next_x - xj, xj * next_y - next_x * yj
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(len(buckets)):
+        a = buckets[i, np.abs(x[a] * p[i] + y[a] * q[i] + r[i]).argmax()]
+        selected[i + 1] = a
+    return selected
+
+
+def _numeric_x(index: pd.Index) -> np.ndarray:
+    """Float x positions (hours for datetimes), relative to the first point"""
+    if isinstance(index, pd.DatetimeIndex):
+        values = index.asi8.astype('float64') / 3.6e12
+    else:
+        values = np.asarray(index, dtype='float64')
+    return values - values[0] if len(values) else values
+
+
+def downsample(series: pd.Series, n_out: Optional[int] = 2000, method: str = 'minmax_lttb') -> pd.Series:
+    """At most n_out points of a line trace that keep its visual shape.
+
+    - lttb: Largest-Triangle-Three-Buckets, best shape per point
+    - minmax: min and max per bucket, keeps every peak (fully vectorized)
+    - minmax_lttb: min-max preselection of MINMAX_RATIO * n_out points, then LTTB
+    Missing values are dropped; None or a short series returns the series as is.
+    """
+    if method not in DOWNSAMPLING_METHODS:
+        raise ValueError(f"Unknown downsampling method '{method}', choose from {DOWNSAMPLING_METHODS}")
+    if n_out is None or len(series) <= n_out:
+        return series
+
+    series = series.dropna()
+    if not series.index.is_monotonic_increasing:
+        series = series.sort_index()
+    if len(series) <= n_out:
+        return series
+
+    y = series.to_numpy(dtype='float64')
+    if method == 'minmax':
+        return series.iloc[minmax_indices(y, n_out)]
+
+    x = _numeric_x(series.index)
+    if method == 'minmax_lttb' and len(series) > MINMAX_RATIO * n_out:
+        candidates = minmax_indices(y, MINMAX_RATIO * n_out)
+        return series.iloc[candidates[lttb_indices(x[candidates], y[candidates], n_out)]]
+    return series.iloc[lttb_indices(x, y, n_out)]
+
+
+def downsample_scatter(x: pd.Series, y: pd.Series, n_out: Optional[int] = 2000):
+    """Thin a scatter (e.g. residuals vs predicted) to the min/max y per x bucket, keeping the envelope"""
+    if n_out is None or len(x) <= n_out:
+        return x, y
+    order = np.argsort(x.to_numpy(), kind='stable')
+    keep = order[minmax_indices(y.to_numpy(dtype='float64')[order], n_out)]
+    return x.iloc[keep], y.iloc[keep]
+
+
+class TraceStore:
+    """Full-resolution data behind downsampled Plotly traces, for zoom-aware re-fetching.
+
+    Traces are keyed by their `meta` attribute. On zoom, `relayout` replaces the
+    data of every stored trace by a downsample of the visible range only, so
+    zooming in shows more and more detail up to the raw hourly points:
+
+        store = visualizer.trace_store
+        # Dash
+        @app.callback(Output('graph', 'figure'), Input('graph', 'relayoutData'), State('graph', 'figure'))
+        def zoom(relayout_data, figure):
+            return store.relayout(go.Figure(figure), relayout_data)
+        # Jupyter (needs ipywidgets)
+        widget = store.attach(fig)
+    """
+
+    def __init__(self, n_out: Optional[int] = 2000, method: str = 'minmax_lttb'):
+        self.n_out = n_out
+        self.method = method
+        self._series: Dict[str, pd.Series] = {}
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._series
+
+    def add(self, key: str, series: pd.Series) -> pd.Series:
+        """Keep the full series and return its downsampled version for the initial figure"""
+        series = series.dropna()
+        if not series.index.is_monotonic_increasing:
+            series = series.sort_index()
+        self._series[key] = series
+        return downsample(series, self.n_out, self.method)
+
+    def _bound(self, key: str, value):
+        index = self._series[key].index
+        if value is None or not isinstance(index, pd.DatetimeIndex):
+            return value
+        bound = pd.Timestamp(value)
+        if index.tz is not None and bound.tz is None:
+            bound = bound.tz_localize(index.tz)
+        return bound
+
+    def window(self, key: str, x0=None, x1=None) -> pd.Series:
+        """Downsampled data of one trace between x0 and x1 (None = open end)"""
+        series = self._series[key]
+        visible = series.loc[self._bound(key, x0):self._bound(key, x1)]
+        return downsample(visible, self.n_out, self.method)
+
+    @staticmethod
+    def _xrange(relayout_data: Optional[Dict]):
+        """(x0, x1) from Plotly relayout data; (None, None) for autorange/reset"""
+        relayout_data = relayout_data or {}
+        if 'xaxis.range[0]' in relayout_data:
+            return relayout_data['xaxis.range[0]'], relayout_data.get('xaxis.range[1]')
+        if 'xaxis.range' in relayout_data:
+            return tuple(relayout_data['xaxis.range'])
+        return None, None
+
+    def relayout(self, fig, relayout_data: Optional[Dict] = None):
+        """Refill every stored trace of `fig` for the x range in relayout_data"""
+        x0, x1 = self._xrange(relayout_data)
+        for trace in fig.data:
+            if trace.meta in self._series:
+                visible = self.window(trace.meta, x0, x1)
+                trace.x, trace.y = visible.index, visible.to_numpy()
+        return fig
+
+    def attach(self, fig):
+        """FigureWidget that re-fetches full resolution when its x axis is zoomed"""
+        import plotly.graph_objects as go
+
+        widget = go.FigureWidget(fig)
+
+        def on_zoom(layout, xrange):
+            with widget.batch_update():
+                self.relayout(widget, {'xaxis.range': xrange} if xrange else None)
+
+        widget.layout.on_change(on_zoom, 'xaxis.range')
+        return widget
@@ -4,19 +4,31 @@
 
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
 import logging
 from typing import Dict, List, Optional, Any, Tuple
-from IPython.display import display, HTML
 
 from models.factory import ModelResult
 from evaluation.metrics import MetricsCalculator
+from .downsampling import TraceStore, downsample, downsample_scatter
+
+def _pyplot():
+    """matplotlib is only the fallback renderer: import it on first use, not with the package"""
+    import matplotlib.pyplot as plt
+    return plt
 
 class ResultsVisualizer:
-    """Visualization utilities for experiment results"""
+    """Visualization utilities for experiment results.
+    
+    Line traces are downsampled to at most `max_points` points each (None keeps
+    every point); the full data stays in `trace_store` for re-fetching on zoom.
+    """
     
-    def __init__(self, use_plotly: bool = True):
+    def __init__(self, use_plotly: bool = True, max_points: Optional[int] = 2000,
+                 downsample_method: str = 'minmax_lttb'):
         self.use_plotly = use_plotly
+        self.max_points = max_points
+        self.downsample_method = downsample_method
+        self.trace_store = TraceStore(max_points, downsample_method)
         self.logger = logging.getLogger(self.__class__.__name__)
         self.metrics_calculator = MetricsCalculator()
         
@@ -67,6 +79,9 @@ class ResultsVisualizer:
             'xgboost': 'solid'
         }
     
+    def _downsample(self, series: pd.Series) -> pd.Series:
+        return downsample(series, self.max_points, self.downsample_method)
+    
     def create_comparison_plot(self, 
                              actual_values: pd.Series,
                              model_results: Dict[str, ModelResult],
@@ -101,22 +116,26 @@ class ResultsVisualizer:
         
         # Add training data if provided
         if show_training and training_data is not None:
+            training_plot = self.trace_store.add('training', training_data)
             fig.add_trace(self.go.Scatter(
-                x=training_data.index,
-                y=training_data.values,
+                x=training_plot.index,
+                y=training_plot.values,
                 mode='lines',
                 name='Training Data',
                 line=dict(color='lightgray', width=1),
-                opacity=0.7
+                opacity=0.7,
+                meta='training'
             ))
         
         # Add actual values
+        actual_plot = self.trace_store.add('actual', actual_values)
         fig.add_trace(self.go.Scatter(
-            x=actual_values.index,
-            y=actual_values.values,
+            x=actual_plot.index,
+            y=actual_plot.values,
             mode='lines',
             name='Actual',
-            line=dict(color='black', width=3)
+            line=dict(color='black', width=3),
+            meta='actual'
         ))
         
         # Add model predictions
@@ -129,12 +148,15 @@ class ResultsVisualizer:
                 color = self.model_colors.get(model_name, f'hsl({i * 360 / len(model_results)}, 70%, 50%)')
                 dash = self.line_styles.get(model_name, 'solid')
                 
+                # RMSE above is on the full series, only the drawn points are reduced
+                predictions_plot = self.trace_store.add(model_name, result.predictions)
                 fig.add_trace(self.go.Scatter(
-                    x=result.predictions.index,
-                    y=result.predictions.values,
+                    x=predictions_plot.index,
+                    y=predictions_plot.values,
                     mode='lines',
                     name=f'{model_name.replace("_", " ").title()} (RMSE: {rmse:.4f})',
-                    line=dict(color=color, dash=dash, width=2)
+                    line=dict(color=color, dash=dash, width=2),
+                    meta=model_name
                 ))
         
         # Update layout
@@ -163,16 +185,19 @@ class ResultsVisualizer:
                                     title: str = "Model Comparison",
                                     show_training: bool = True):
         """Create Matplotlib comparison plot"""
+        plt = _pyplot()
         
         fig, ax = plt.subplots(figsize=(15, 8))
         
         # Add training data
         if show_training and training_data is not None:
-            ax.plot(training_data.index, training_data.values, 
+            training_plot = self._downsample(training_data)
+            ax.plot(training_plot.index, training_plot.values, 
                    color='lightgray', alpha=0.7, label='Training Data')
         
         # Add actual values
-        ax.plot(actual_values.index, actual_values.values, 
+        actual_plot = self._downsample(actual_values)
+        ax.plot(actual_plot.index, actual_plot.values, 
                color='black', linewidth=2, label='Actual')
         
         # Add model predictions
@@ -181,7 +206,8 @@ class ResultsVisualizer:
                 rmse = self.metrics_calculator.calculate_rmse(actual_values, result.predictions)
                 color = self.model_colors.get(model_name, None)
                 
-                ax.plot(result.predictions.index, result.predictions.values,
+                predictions_plot = self._downsample(result.predictions)
+                ax.plot(predictions_plot.index, predictions_plot.values,
                        color=color, linewidth=1.5,
                        label=f'{model_name.replace("_", " ").title()} (RMSE: {rmse:.4f})')
         
@@ -248,6 +274,7 @@ class ResultsVisualizer:
     
     def create_rolling_validation_plot(self, rolling_results: pd.DataFrame):
         """Create rolling window validation visualization"""
+        plt = _pyplot()
         
         if rolling_results.empty:
             if self.plotly_available:
@@ -263,6 +290,12 @@ class ResultsVisualizer:
         else:
             return self._create_matplotlib_rolling_validation(rolling_results)
     
+    def _completed_windows(self, rolling_results: pd.DataFrame, metrics: List[str]) -> Dict[str, pd.DataFrame]:
+        """Completed windows per model, indexed by window_id (one groupby instead of a mask per model)"""
+        completed = rolling_results.loc[rolling_results['status'] == 'completed', ['model_name', 'window_id'] + metrics]
+        return {model: frame.set_index('window_id')[metrics].sort_index()
+                for model, frame in completed.groupby('model_name', sort=False)}
+    
     def _create_plotly_rolling_validation(self, rolling_results: pd.DataFrame):
         """Create Plotly rolling validation plot"""
         # Create subplots for different metrics
@@ -278,20 +311,18 @@ class ResultsVisualizer:
             vertical_spacing=0.08
         )
         
-        models = rolling_results['model_name'].unique()
+        completed = self._completed_windows(rolling_results, available_metrics)
         
         for i, metric in enumerate(available_metrics, 1):
-            for model in models:
-                model_data = rolling_results[rolling_results['model_name'] == model]
-                successful_data = model_data[model_data['status'] == 'completed']
-                
+            for model, successful_data in completed.items():
                 if not successful_data.empty:
                     color = self.model_colors.get(model, f'hsl({hash(model) % 360}, 70%, 50%)')
+                    metric_plot = self._downsample(successful_data[metric])
                     
                     fig.add_trace(
                         self.go.Scatter(
-                            x=successful_data['window_id'],
-                            y=successful_data[metric],
+                            x=metric_plot.index,
+                            y=metric_plot.values,
                             mode='lines+markers',
                             name=f'{model.replace("_", " ").title()}',
                             line=dict(color=color),
@@ -314,6 +345,7 @@ class ResultsVisualizer:
     
     def _create_matplotlib_rolling_validation(self, rolling_results: pd.DataFrame):
         """Create matplotlib rolling validation plot"""
+        plt = _pyplot()
         metrics = ['rmse', 'mae', 'mape']
         available_metrics = [m for m in metrics if m in rolling_results.columns]
         
@@ -327,18 +359,16 @@ class ResultsVisualizer:
         if len(available_metrics) == 1:
             axes = [axes]
         
-        models = rolling_results['model_name'].unique()
+        completed = self._completed_windows(rolling_results, available_metrics)
         
         for i, metric in enumerate(available_metrics):
             ax = axes[i]
             
-            for model in models:
-                model_data = rolling_results[rolling_results['model_name'] == model]
-                successful_data = model_data[model_data['status'] == 'completed']
-                
+            for model, successful_data in completed.items():
                 if not successful_data.empty:
                     color = self.model_colors.get(model, None)
-                    ax.plot(successful_data['window_id'], successful_data[metric], 
+                    metric_plot = self._downsample(successful_data[metric])
+                    ax.plot(metric_plot.index, metric_plot.values, 
                            marker='o', color=color, 
                            label=f'{model.replace("_", " ").title()}')
             
@@ -353,6 +383,7 @@ class ResultsVisualizer:
     
     def create_model_diagnostics_plot(self, model_results: Dict[str, ModelResult]):
         """Create model diagnostics visualization"""
+        plt = _pyplot()
         
         # Collect diagnostic data
         diagnostic_data = []
@@ -435,6 +466,7 @@ class ResultsVisualizer:
                                 actual_values: pd.Series,
                                 model_results: Dict[str, ModelResult]):
         """Create residuals analysis plots"""
+        plt = _pyplot()
         
         # Create subplots for each model
         n_models = sum(1 for result in model_results.values() if result.success)
@@ -474,8 +506,9 @@ class ResultsVisualizer:
                     # Get the correct axis
                     ax = axes[plot_idx]
                     
-                    # Residuals plot
-                    ax.scatter(pred_aligned, residuals, alpha=0.6, 
+                    # Residuals plot (min/max residual per predicted-value bucket on long backtests)
+                    pred_plot, residuals_plot = downsample_scatter(pred_aligned, residuals, self.max_points)
+                    ax.scatter(pred_plot, residuals_plot, alpha=0.6, 
                               color=self.model_colors.get(model_name, 'blue'))
                     ax.axhline(y=0, color='red', linestyle='--')
                     ax.set_xlabel('Predicted Values')
@@ -0,0 +1,136 @@
+import sys
+import sqlite3
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+SRC_ROOT = Path(__file__).resolve().parents[1] / "src"
+if str(SRC_ROOT) not in sys.path:
+    sys.path.insert(0, str(SRC_ROOT))
+
+from data_ingestion import backfill_entsoe as bf
+
+START, END = pd.Timestamp("2025-01-01", tz="Europe/Amsterdam"), pd.Timestamp("2025-03-01", tz="Europe/Amsterdam")
+
+
+class NoMatchingDataError(Exception):
+    """Same name as the entsoe-py exception for periods without data"""
+
+
+class FakeClient:
+    """entsoe-py look-alike: 15-minute series whose value encodes the series and the timestamp"""
+
+    def __init__(self, fail_methods=(), flaky_calls=0, empty_methods=()):
+        self.fail_methods = set(fail_methods)
+        self.empty_methods = set(empty_methods)
+        self.flaky_calls = flaky_calls
+        self.calls = []
+
+    def _series(self, method, start, end, offset):
+        self.calls.append((method, start))
+        if method in self.fail_methods:
+            raise ConnectionError(f"{method} unavailable")
+        if self.flaky_calls > 0:
+            self.flaky_calls -= 1
+            raise ConnectionError("503 Service Unavailable")
+        if method in self.empty_methods:
+            raise NoMatchingDataError()
+        # Boundary sample included on purpose: save_chunk has to drop it
+        index = pd.date_range(start, end, freq="15min")
+        return pd.Series(offset + index.asi8 / 1e12, index=index)
+
+    def query_load(self, country_code, start, end):
+        return self._series("query_load", start, end, 1).to_frame("Actual Load")
+
+    def query_day_ahead_prices(self, country_code, start, end):
+        return self._series("query_day_ahead_prices", start, end, 2)
+
+    def query_load_forecast(self, country_code, start, end):
+        return self._series("query_load_forecast", start, end, 3).to_frame("Forecasted Load")
+
+    def query_crossborder_flows(self, country_code_from, country_code_to, start, end):
+        return self._series(f"flow_{country_code_from}_{country_code_to}", start, end, 4)
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = sqlite3.connect(tmp_path / "WARP.db")
+    yield conn
+    conn.close()
+
+
+def no_sleep(sleeps):
+    return sleeps.append
+
+
+def test_fetch_with_backoff_retries_with_growing_delays(monkeypatch):
+    monkeypatch.setattr(bf.random, "uniform", lambda low, high: high)
+    attempts, sleeps = [], []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise ConnectionError("timeout")
+        return "ok"
+
+    assert bf.fetch_with_backoff(flaky, base_delay=2.0, sleep=no_sleep(sleeps)) == "ok"
+    assert sleeps == [2.0, 4.0]
+
+    sleeps.clear()
+    with pytest.raises(RuntimeError):
+        bf.fetch_with_backoff(lambda: 1 / 0, retries=4, base_delay=10.0, max_delay=25.0, sleep=no_sleep(sleeps))
+    assert sleeps == [10.0, 20.0, 25.0]
+
+
+def test_fetch_with_backoff_treats_no_data_as_empty():
+    def no_data():
+        raise NoMatchingDataError()
+
+    assert bf.fetch_with_backoff(no_data, sleep=no_sleep([])).empty
+
+
+def test_backfill_resumes_from_checkpoints(conn):
+    sleeps = []
+    summary = bf.run_backfill(FakeClient(fail_methods={"query_load_forecast"}), START, END, conn=conn,
+                              retries=2, sleep=no_sleep(sleeps))
+    # 7 series x 2 months; the failed series is not merged and nothing else is lost
+    assert summary["chunks_total"] == 14
+    assert summary["chunks_failed"] == 2 and summary["chunks_fetched"] == 12
+    assert len(sleeps) == 2
+    assert conn.execute("SELECT name FROM sqlite_master WHERE name = ?", (bf.OUTPUT_TABLE,)).fetchone() is None
+
+    client = FakeClient(flaky_calls=1)
+    summary = bf.run_backfill(client, START, END, conn=conn, sleep=no_sleep(sleeps))
+    assert summary["chunks_skipped"] == 12 and summary["chunks_fetched"] == 2
+    assert {method for method, _ in client.calls} == {"query_load_forecast"}
+
+    raw = pd.read_sql_query(f"SELECT * FROM {bf.OUTPUT_TABLE}", conn)
+    assert len(raw) == (END - START) / pd.Timedelta("15min")
+    assert raw["Timestamp"].is_unique and raw[list(bf.build_series_specs())].notna().all().all()
+
+
+def test_merge_replaces_only_the_backfilled_span(conn):
+    before = pd.DataFrame({
+        "Timestamp": ["2024-12-31 22:45:00+00:00", "2025-01-15 12:00:00+00:00", "2025-03-05 00:00:00+00:00"],
+        "Load": [-1.0, -2.0, -3.0],
+        "Price": [-1.0, -2.0, -3.0],
+    })
+    before["hour_key"] = pd.to_datetime(before["Timestamp"], utc=True).astype("int64") // 3_600_000_000_000
+    before.to_sql(bf.OUTPUT_TABLE, conn, index=False)
+
+    bf.run_backfill(FakeClient(empty_methods={"flow_GB_NL"}), START, END, conn=conn, sleep=no_sleep([]))
+    raw = pd.read_sql_query(f"SELECT * FROM {bf.OUTPUT_TABLE} ORDER BY hour_key, Timestamp", conn)
+
+    # Rows outside the span survive, the stale row inside it is replaced
+    assert set(raw.loc[raw["Load"] < 0, "Timestamp"]) == {"2024-12-31 22:45:00+00:00", "2025-03-05 00:00:00+00:00"}
+    assert raw["Timestamp"].is_unique
+    assert raw["Flow_GB_to_NL"].isna().all()
+    np.testing.assert_array_equal(
+        raw["hour_key"].to_numpy(), pd.to_datetime(raw["Timestamp"], utc=True).astype("int64") // 3_600_000_000_000
+    )
+
+    row = raw[raw["Timestamp"] == "2025-01-15 12:00:00+00:00"].iloc[0]
+    expected = pd.Timestamp("2025-01-15 12:00:00+00:00").value / 1e12
+    assert row["Load"] == pytest.approx(1 + expected) and row["Price"] == pytest.approx(2 + expected)
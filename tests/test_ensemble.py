@@ -0,0 +1,54 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+SRC_ROOT = Path(__file__).resolve().parents[1] / "src"
+if str(SRC_ROOT) not in sys.path:
+    sys.path.insert(0, str(SRC_ROOT))
+
+import core  # noqa: F401  (core before evaluation, avoids a circular import)
+from evaluation.ensemble import COMBINATION_METHODS, ForecastCombiner
+from evaluation.savings import PredictionCube
+
+HORIZON = 168
+
+
+def make_cube(n_runs=20, seed=3):
+    """Daily runs with a 168h horizon, like DataManager.create_rolling_splits: windows overlap"""
+    rng = np.random.default_rng(seed)
+    runs = pd.date_range("2025-01-01", periods=n_runs, freq="D", tz="UTC")
+    targets = runs.values[:, None] + np.arange(HORIZON)[None, :] * np.timedelta64(1, "h")
+    truth = np.sin(np.arange(n_runs * 24 + HORIZON) * 2 * np.pi / 24)
+    hours = (targets - runs.values[0]) // np.timedelta64(1, "h")
+    actual = truth[hours]
+    forecast = np.stack([actual + rng.normal(0, scale, actual.shape) for scale in (0.1, 0.3, 0.5)])
+    return PredictionCube(models=["a", "b", "c"], runs=runs, forecast=forecast, actual=actual,
+                          hour_of_day=hours % 24), targets
+
+
+@pytest.mark.parametrize("method", COMBINATION_METHODS)
+def test_weights_ignore_actuals_after_the_run_start(method):
+    cube, targets = make_cube()
+    _, weights = ForecastCombiner(method).combine(cube)
+
+    r = 10
+    future = targets >= cube.runs[r].tz_localize(None).to_datetime64()
+    # Model 'a' becomes terrible on every hour from run r's start on, in all overlapping runs
+    leaked = PredictionCube(cube.models, cube.runs, cube.forecast.copy(), cube.actual, cube.hour_of_day)
+    leaked.forecast[0][future] += 100.0
+    _, leaked_weights = ForecastCombiner(method).combine(leaked)
+
+    np.testing.assert_allclose(leaked_weights[:r + 1], weights[:r + 1])
+    assert not np.allclose(leaked_weights[-1], weights[-1])
+
+
+def test_first_run_has_equal_weights():
+    cube, _ = make_cube()
+    _, weights = ForecastCombiner("inverse_mse").combine(cube)
+
+    np.testing.assert_allclose(weights[0], 1 / 3)
+    # Run 1 only knows the first 24 leads of run 0; the best model already leads
+    assert weights[1].argmax() == 0
@@ -0,0 +1,35 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+SRC_ROOT = Path(__file__).resolve().parents[1] / "src"
+if str(SRC_ROOT) not in sys.path:
+    sys.path.insert(0, str(SRC_ROOT))
+
+from data_processing.feature_eng import add_lag_features, add_rolling_features
+
+
+@pytest.mark.parametrize("index", [
+    pd.date_range("2025-01-01", periods=200, freq="D"),
+    pd.date_range("2025-01-01", periods=200, freq="15min", tz="UTC"),
+    pd.date_range("2025-01-01", periods=202, freq="h").delete([5, 50]),
+    pd.RangeIndex(200)[::-1],
+])
+def test_helpers_shift_by_rows_in_place(index):
+    rng = np.random.default_rng(1)
+    df = pd.DataFrame({"x": rng.normal(size=len(index)), "label": "a"}, index=index)
+    df.iloc[40, 0] = np.nan
+    expected = df.copy()
+    for lag in (1, 24):
+        expected[f"x_lag_{lag}"] = expected["x"].shift(lag)
+    for window in (3, 24):
+        expected[f"x_rollmean_{window}"] = expected["x"].rolling(window).mean()
+        expected[f"x_rollstd_{window}"] = expected["x"].rolling(window).std()
+
+    result = add_rolling_features(add_lag_features(df, ["x"], [1, 24]), ["x"], [3, 24])
+
+    assert result is df
+    pd.testing.assert_frame_equal(result, expected, rtol=1e-9)
@@ -0,0 +1,54 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+SRC_ROOT = Path(__file__).resolve().parents[1] / "src"
+if str(SRC_ROOT) not in sys.path:
+    sys.path.insert(0, str(SRC_ROOT))
+
+from core.logging_manager import ExperimentLogger
+
+TREND_COLUMNS = ["experiment_id", "model_name", "model_variant", "metric_name", "n_windows", "value_sum",
+                 "value_sq_sum", "min_value", "max_value", "first_window_id", "first_value",
+                 "last_window_id", "last_value"]
+
+
+@pytest.fixture
+def experiment_logger(tmp_path):
+    experiment_logger = ExperimentLogger(tmp_path / "logs.db")
+    experiment_logger.start_experiment("trends", config={})
+    return experiment_logger
+
+
+def log_window(experiment_logger, window_id, rmse, model_name="naive"):
+    run_id = experiment_logger.log_model_run(model_name, model_name, "2025-01-01", "2025-01-28",
+                                             "2025-01-29", "2025-02-04", window_id=window_id)
+    experiment_logger.log_model_results(run_id, {"rmse": rmse, "mae": rmse / 2})
+
+
+def trends(experiment_logger):
+    return experiment_logger.get_metric_trends()[TREND_COLUMNS].sort_values(["model_name", "metric_name"],
+                                                                             ignore_index=True)
+
+
+def test_incremental_trends_match_a_rebuild(experiment_logger):
+    log_window(experiment_logger, None, 100.0)  # the single run, window_id 0
+    for window_id, rmse in [(1, 10.0), (2, 12.0), (3, 11.0)]:
+        log_window(experiment_logger, window_id, rmse)
+        log_window(experiment_logger, window_id, rmse * 2, model_name="sarimax")
+    # Window 2 logged again: its newer value replaces the old one
+    log_window(experiment_logger, 2, 20.0)
+
+    incremental = trends(experiment_logger)
+    experiment_logger.rebuild_metric_summaries()
+    pd.testing.assert_frame_equal(incremental, trends(experiment_logger), check_dtype=False)
+
+    naive = experiment_logger.get_metric_trends(model_names=["naive"], metric_names=["rmse"]).iloc[0]
+    # The single run is not part of the rolling-window trend
+    assert naive["n_windows"] == 3 and naive["first_window_id"] == 1
+    assert naive["mean"] == pytest.approx(np.mean([10.0, 20.0, 11.0]))
+    assert naive["change_pct"] == pytest.approx(10.0)
+    assert 0 in set(experiment_logger.get_window_metrics()["window_id"])
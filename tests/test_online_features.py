@@ -0,0 +1,88 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+SRC_ROOT = Path(__file__).resolve().parents[1] / "src"
+if str(SRC_ROOT) not in sys.path:
+    sys.path.insert(0, str(SRC_ROOT))
+
+from data_processing.feature_matrix import FeatureSpec, build_feature_matrix
+from data_processing.online_features import OnlineFeatureState, load_or_warm_up
+
+SPEC = {
+    "passthrough": ["temperature_2m"],
+    "lags": {"Price": [1, 24, 168]},
+    "rolling": {"Load": {"windows": [3, 24, 168], "stats": ["mean", "std", "min", "max"], "shift": 1}},
+    "diffs": {"Load": [24]},
+    "interactions": [["Load", "temperature_2m"]],
+}
+
+
+@pytest.fixture
+def hourly():
+    rng = np.random.default_rng(7)
+    n = 1500
+    index = pd.date_range("2025-01-01", periods=n, freq="h", tz="UTC")
+    df = pd.DataFrame({
+        "Load": 60_000 + 8_000 * np.sin(np.arange(n) * 2 * np.pi / 24) + rng.normal(0, 500, n),
+        "Price": rng.normal(0.1, 0.03, n),
+        "temperature_2m": rng.normal(10, 5, n),
+    }, index=index)
+    df.iloc[400, 0] = np.nan  # a gap has to propagate through the windows like in pandas
+    return df
+
+
+def assert_same_features(online, batch):
+    assert list(online.columns) == list(batch.columns)
+    assert online.index.equals(batch.index)
+    np.testing.assert_array_equal(np.isnan(online.values), np.isnan(batch.values))
+    np.testing.assert_allclose(online.values, batch.values, rtol=1e-5, equal_nan=True)
+
+
+def test_update_matches_builder(hourly):
+    state = OnlineFeatureState(FeatureSpec.from_dict(SPEC))
+    assert_same_features(state.update(hourly), build_feature_matrix(hourly, SPEC))
+
+
+def test_extend_from_history_matches_builder(hourly, tmp_path):
+    split = 1000
+    matrix = build_feature_matrix(hourly.iloc[:split], SPEC)
+    OnlineFeatureState.from_history(SPEC, hourly.iloc[:split]).save(tmp_path / "state.pkl")
+    state = load_or_warm_up(SPEC, hourly.iloc[:split], tmp_path / "state.pkl")
+
+    for start in range(split, len(hourly), 37):
+        matrix = state.extend(matrix, hourly.iloc[start:start + 37])
+
+    assert_same_features(matrix, build_feature_matrix(hourly, SPEC))
+
+
+def test_extend_appends_in_place(hourly):
+    state = OnlineFeatureState.from_history(SPEC, hourly.iloc[:1000])
+    matrix = state.extend(build_feature_matrix(hourly.iloc[:1000], SPEC), hourly.iloc[1000:1010])
+    extended = state.extend(matrix, hourly.iloc[1010:1020])
+
+    # Same buffer, so the history was not copied again
+    assert extended.values.base is matrix.values.base
+    np.testing.assert_array_equal(extended.values[:len(matrix.values)], matrix.values)
+
+
+def test_update_rejects_rows_out_of_order(hourly):
+    state = OnlineFeatureState.from_history(SPEC, hourly.iloc[:100])
+    with pytest.raises(ValueError):
+        state.update(hourly.iloc[50:60])
+
+
+def test_missing_hours_are_not_skipped(hourly):
+    gappy = hourly.drop(hourly.index[[200, 201, 700]])
+    batch = build_feature_matrix(gappy, SPEC)
+
+    # A lag of n is n hours back, as if the missing hours were NaN rows
+    assert_same_features(batch, build_feature_matrix(gappy.reindex(hourly.index), SPEC).to_frame().loc[gappy.index])
+
+    state = OnlineFeatureState(FeatureSpec.from_dict(SPEC))
+    # The first chunk ends right before the gap, so it also falls between two updates
+    online = [state.update(gappy.iloc[start:start + 200]) for start in range(0, len(gappy), 200)]
+    np.testing.assert_allclose(np.concatenate([m.values for m in online]), batch.values, rtol=1e-5, equal_nan=True)